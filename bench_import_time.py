@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the worker and CLI entry points.
+
+Runs ``python -X importtime`` for each entry point, parses the report and
+fails if an entry point takes longer to import than its budget. Import time
+is what a freshly started worker pod pays before it can poll for tasks.
+
+Usage:
+    python bench_import_time.py
+    python bench_import_time.py --runs 5 --budget worker=800
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+SHARED = ROOT / "libs" / "llm_common"
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+@dataclass
+class EntryPoint:
+    name: str
+    directory: Path
+    module: str
+    budget_ms: float
+
+
+# Budgets leave headroom over the import of temporalio itself, which every
+# worker needs; anything heavier than that should be imported lazily.
+ENTRY_POINTS = [
+    EntryPoint("worker", ROOT / "examples" / "integration", "worker", 1000),
+    EntryPoint("multi_step_chain_worker", ROOT / "examples" / "integration", "multi_step_chain_worker", 1000),
+    EntryPoint("openrouter_client", ROOT / "open-router", "client", 1000),
+    EntryPoint("check_setup", ROOT, "check_setup", 150),
+]
+
+
+def parse_importtime(report: str, module: str) -> tuple[float, list[tuple[str, float]]]:
+    """Return the module's cumulative import time and its heaviest imports (ms).
+
+    Args:
+        report: stderr of ``python -X importtime -c "import <module>"``
+        module: The top-level module that was imported
+
+    Returns:
+        Total milliseconds and (name, milliseconds) for the direct children
+        of ``module``, heaviest first
+    """
+    total = 0.0
+    children: list[tuple[str, float]] = []
+    pending: list[tuple[str, float]] = []
+    for line in report.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        # Each nesting level adds two spaces; a parent is reported after its children
+        depth = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        if depth == 1:
+            pending.append((name, cumulative_ms))
+        elif depth == 0:
+            if name == module:
+                total, children = cumulative_ms, pending
+            pending = []
+    return total, sorted(children, key=lambda child: child[1], reverse=True)
+
+
+def measure(entry: EntryPoint, runs: int) -> tuple[float, list[tuple[str, float]]]:
+    """Import the entry point ``runs`` times in fresh interpreters; keep the fastest."""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {entry.module}"],
+            cwd=entry.directory,
+            # llm_common resolves as after `pip install -e libs/llm_common`
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SHARED), os.getenv("PYTHONPATH")]))},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"importing {entry.module} failed:\n{result.stderr[-2000:]}")
+        measured = parse_importtime(result.stderr, entry.module)
+        if best is None or measured[0] < best[0]:
+            best = measured
+    assert best is not None
+    return best
+
+
+def main():
+    """Measure every entry point and compare against its budget."""
+    parser = argparse.ArgumentParser(description="Check entry point import times against budgets.")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per entry point (fastest is kept)")
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="NAME=MS",
+        help="Override an entry point's budget in milliseconds",
+    )
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to show per entry point")
+    args = parser.parse_args()
+
+    overrides = dict(item.split("=", 1) for item in args.budget)
+    over_budget = []
+
+    print(f"{'entry point':<26} {'import ms':>10} {'budget ms':>10}")
+    print("-" * 48)
+    for entry in ENTRY_POINTS:
+        budget = float(overrides.get(entry.name, entry.budget_ms))
+        total, children = measure(entry, args.runs)
+        status = "✓" if total <= budget else "✗"
+        print(f"{status} {entry.name:<24} {total:10.1f} {budget:10.0f}")
+        for name, ms in children[: args.top]:
+            print(f"    {name:<40} {ms:8.1f}")
+        if total > budget:
+            over_budget.append(entry.name)
+
+    print()
+    if over_budget:
+        print(f"✗ Over budget: {', '.join(over_budget)}")
+        return 1
+    print("✓ All entry points within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,12 @@
 Setup verification script that checks if the environment is ready.
 """
 
-import os
+import asyncio
 import sys
 from pathlib import Path
 
+import env_probe
+
 
 def check_python_version():
     """Check if Python version is compatible."""
@@ -18,55 +20,27 @@ def check_python_version():
         return False
 
 
-def check_dependencies():
-    """Check if required dependencies are installed."""
-    missing = []
-    
-    try:
-        import temporalio
-        print(f"✓ temporalio {temporalio.__version__} installed")
-    except ImportError:
-        print("✗ temporalio not installed")
-        missing.append("temporalio")
-    
-    try:
-        import openai
-        print(f"✓ openai {openai.__version__} installed")
-    except ImportError:
-        print("✗ openai not installed")
-        missing.append("openai")
-    
-    try:
-        import dotenv
-        print("✓ python-dotenv installed")
-    except ImportError:
-        print("✗ python-dotenv not installed")
-        missing.append("python-dotenv")
-    
-    return missing
+def run_probes(timeout=5.0):
+    """Run the dependency, config, Temporal and provider checks concurrently.
 
+    Local checks are cached per environment fingerprint; network checks
+    always run and report their round-trip time.
+    """
+    probes, env_files = env_probe.default_probes(Path(__file__).parent)
+    return asyncio.run(env_probe.run_probes(
+        probes,
+        timeout=timeout,
+        cache=env_probe.ProbeCache(),
+        fingerprint=env_probe.environment_fingerprint(env_files),
+    ))
 
-def check_env_file():
-    """Check if .env file exists and has required keys."""
-    env_path = Path(__file__).parent / ".env"
-    env_example_path = Path(__file__).parent / ".env.example"
-    
-    if not env_path.exists():
-        print("✗ .env file not found")
-        print(f"  Copy {env_example_path} to .env and fill in your values")
-        return False
-    
-    print("✓ .env file exists")
-    
-    # Check if API key is set (just presence, not validity)
-    with open(env_path) as f:
-        content = f.read()
-        if "OPENAI_API_KEY=your_openai_api_key_here" in content or "OPENAI_API_KEY=" not in content:
-            print("  ⚠ OPENAI_API_KEY may not be set in .env")
-            return False
-    
-    print("  ✓ OPENAI_API_KEY appears to be configured")
-    return True
+
+def report(title, results):
+    """Print a group of probe results and return those that failed."""
+    print(title)
+    env_probe.print_results(results)
+    print()
+    return [result for result in results if not result.ok and result.required]
 
 
 def main():
@@ -79,17 +53,20 @@ def main():
     print("1. Checking Python version...")
     python_ok = check_python_version()
     print()
-    
-    print("2. Checking dependencies...")
-    missing = check_dependencies()
-    print()
-    
-    print("3. Checking environment configuration...")
-    env_ok = check_env_file()
-    print()
-    
+
+    # Probe names are "<kind>:<target>", e.g. "package:openai" or "openai:rtt"
+    results = run_probes()
+    groups = {"package": [], "config": [], "network": []}
+    for result in results:
+        kind = result.name.split(":")[0]
+        groups[kind if kind in groups else "network"].append(result)
+
+    missing = report("2. Checking dependencies...", groups["package"])
+    env_ok = not report("3. Checking environment configuration...", groups["config"])
+    network_failed = report("4. Checking connectivity...", groups["network"])
+
     print("=" * 50)
-    if python_ok and not missing and env_ok:
+    if python_ok and not missing and env_ok and not network_failed:
         print("✓ All checks passed! You're ready to run the examples.")
     else:
         print("⚠ Some setup steps are needed:")
@@ -98,7 +75,9 @@ def main():
         if missing:
             print(f"  - Install dependencies: pip install -r requirements.txt")
         if not env_ok:
-            print("  - Set up your .env file with API keys")
+            print("  - Set up your .env file with API keys (copy .env.example to .env)")
+        for result in network_failed:
+            print(f"  - {result.name}: {result.detail}")
     print()
 
 
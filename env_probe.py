@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Concurrent environment probe for setup and health checks.
+
+All checks run concurrently in one interpreter, each with its own timeout:
+
+- packages: located and versioned from installed metadata, without importing
+- configuration: required keys present in the .env files
+- Temporal: TCP connect to the frontend, reported as round-trip time
+- providers: TCP connect RTT, plus an authenticated ``GET /models`` when an
+  API key is configured
+
+Results of the local checks (packages, configuration) are cached in
+``.env_probe_cache.json``, keyed by a fingerprint of the interpreter,
+site-packages and .env files. Network checks always run, because their
+round-trip times are the baseline being measured.
+
+Usage:
+    python env_probe.py
+    python env_probe.py --json --timeout 2
+    python env_probe.py --packages openai,dotenv,temporalio --optional agents --json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import sysconfig
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from importlib import metadata, util
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).parent
+CACHE_PATH = ROOT / ".env_probe_cache.json"
+
+# import name -> distribution name
+REQUIRED_PACKAGES = {"temporalio": "temporalio", "openai": "openai", "dotenv": "python-dotenv"}
+
+PROVIDERS = {
+    "openai": ("https://api.openai.com/v1", "OPENAI_API_KEY"),
+    "openrouter": ("https://openrouter.ai/api/v1", "OPENROUTER_API_KEY"),
+}
+
+# Any of these configures the OpenAI key pool (see llm_common.gateway)
+OPENAI_KEY_VARS = ("OPENAI_API_KEY", "OPENAI_API_KEYS", "OPENAI_GATEWAY_POOL")
+
+# Values the .env templates and setup docs ship with, not real keys
+PLACEHOLDER_VALUES = {
+    "<api-key-here>",
+    "your_api_key_here",
+    "your_openai_api_key_here",
+    "sk-your-api-key-here",
+    "sk-or-v1-your-api-key-here",
+    "sk-or-v1-your-key-here",
+    "sk-or-v1-...",
+}
+
+
+@dataclass
+class ProbeResult:
+    name: str
+    ok: bool
+    detail: str
+    duration_ms: float = 0.0
+    rtt_ms: Optional[float] = None
+    required: bool = True
+
+
+@dataclass
+class Probe:
+    name: str
+    run: Callable[[], Awaitable[ProbeResult]]
+    cacheable: bool = False
+
+
+def check_package(module: str, distribution: str, required: bool = True) -> ProbeResult:
+    """Check that a package is importable without importing it."""
+    name = f"package:{distribution}"
+    if util.find_spec(module) is None:
+        return ProbeResult(name, False, "not installed", required=required)
+    try:
+        return ProbeResult(name, True, metadata.version(distribution), required=required)
+    except metadata.PackageNotFoundError:
+        return ProbeResult(name, True, "installed", required=required)
+
+
+def read_env_file(path: Path) -> dict[str, str]:
+    """Parse KEY=VALUE lines of a .env file."""
+    values = {}
+    if path.exists():
+        for line in path.read_text().splitlines():
+            key, sep, value = line.partition("=")
+            if sep and not key.strip().startswith("#"):
+                values[key.strip()] = value.strip().strip("\"'")
+    return values
+
+
+def is_placeholder(value: str) -> bool:
+    """Whether ``value`` is a template value rather than a real key."""
+    return value in PLACEHOLDER_VALUES or (value.startswith("<") and value.endswith(">"))
+
+
+def check_env_key(env_file: Path, key: str, *alternatives: str) -> ProbeResult:
+    """Check that ``key``, or one of ``alternatives``, is set in ``env_file`` or the environment."""
+    name = f"config:{key}"
+    values = read_env_file(env_file)
+    for candidate in (key, *alternatives):
+        value = values.get(candidate) or os.getenv(candidate, "")
+        if value and not is_placeholder(value):
+            return ProbeResult(name, True, f"{candidate} configured")
+    return ProbeResult(name, False, f"{' / '.join((key, *alternatives))} not set in {env_file.name} or environment")
+
+
+def first_openai_key(env: dict[str, str]) -> Optional[str]:
+    """The key set by OPENAI_API_KEY or first in OPENAI_API_KEYS, if any.
+
+    A key pool from OPENAI_GATEWAY_POOL may point at other base URLs, so its
+    keys are not validated against the OpenAI API.
+    """
+    keys = [key.strip() for key in env.get("OPENAI_API_KEYS", "").split(",") if key.strip()]
+    return env.get("OPENAI_API_KEY") or (keys[0] if keys else None)
+
+
+async def tcp_rtt(name: str, host: str, port: int) -> ProbeResult:
+    """Measure the TCP connect time to ``host:port`` (about one round trip)."""
+    started = time.perf_counter()
+    try:
+        _, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        return ProbeResult(name, False, f"cannot connect to {host}:{port}: {e.strerror or e}")
+    rtt_ms = (time.perf_counter() - started) * 1000
+    writer.close()
+    await writer.wait_closed()
+    return ProbeResult(name, True, f"{host}:{port} reachable", rtt_ms=rtt_ms)
+
+
+async def check_api_key(name: str, base_url: str, api_key: str, timeout: float = 5.0) -> ProbeResult:
+    """Validate an API key with an authenticated ``GET /models``.
+
+    The request runs in a worker thread, which cancelling the probe cannot
+    stop, so the socket itself times out after ``timeout`` seconds; a hung
+    endpoint would otherwise keep ``asyncio.run`` from shutting down.
+    """
+    request = urllib.request.Request(
+        f"{base_url}/models", headers={"Authorization": f"Bearer {api_key}"}
+    )
+
+    def fetch() -> int:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    started = time.perf_counter()
+    try:
+        status = await asyncio.to_thread(fetch)
+    except urllib.error.URLError as e:
+        return ProbeResult(name, False, f"request failed: {e.reason}")
+    except TimeoutError:
+        return ProbeResult(name, False, f"timed out after {timeout:.1f}s")
+    rtt_ms = (time.perf_counter() - started) * 1000
+    if status == 200:
+        return ProbeResult(name, True, "API key accepted", rtt_ms=rtt_ms)
+    if status in (401, 403):
+        return ProbeResult(name, False, "API key rejected", rtt_ms=rtt_ms)
+    return ProbeResult(name, False, f"unexpected HTTP {status}", rtt_ms=rtt_ms)
+
+
+def _sync_probe(name: str, check: Callable[[], ProbeResult], cacheable: bool = True) -> Probe:
+    async def run() -> ProbeResult:
+        return check()
+
+    return Probe(name, run, cacheable)
+
+
+def package_probes(packages: dict[str, str], optional: dict[str, str] = {}) -> list[Probe]:
+    """Probes for required and optional packages (import name -> distribution)."""
+    probes = [
+        _sync_probe(f"package:{dist}", lambda m=module, d=dist: check_package(m, d))
+        for module, dist in packages.items()
+    ]
+    probes += [
+        _sync_probe(f"package:{dist}", lambda m=module, d=dist: check_package(m, d, required=False))
+        for module, dist in optional.items()
+    ]
+    return probes
+
+
+def temporal_probe(address: str) -> Probe:
+    host, _, port = address.rpartition(":")
+    return Probe("temporal", lambda: tcp_rtt("temporal", host or address, int(port or 7233)))
+
+
+def provider_probes(provider: str, api_key: Optional[str], timeout: float = 5.0) -> list[Probe]:
+    """RTT probe for a provider, plus key validation when a key is available."""
+    base_url, _ = PROVIDERS[provider]
+    host = urlparse(base_url).hostname or ""
+    probes = [Probe(f"{provider}:rtt", lambda: tcp_rtt(f"{provider}:rtt", host, 443))]
+    if api_key and not is_placeholder(api_key):
+        probes.append(Probe(
+            f"{provider}:auth", lambda: check_api_key(f"{provider}:auth", base_url, api_key, timeout)
+        ))
+    return probes
+
+
+def environment_fingerprint(env_files: list[Path]) -> str:
+    """Fingerprint the interpreter, installed packages and .env files."""
+    site_packages = Path(sysconfig.get_paths()["purelib"])
+    parts = [sys.executable, sys.version]
+    for path in [site_packages, *env_files]:
+        parts.append(f"{path}:{path.stat().st_mtime_ns if path.exists() else 0}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+class ProbeCache:
+    """JSON cache of cacheable probe results, keyed by environment fingerprint."""
+
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = 300.0):
+        self.path = path
+        self.ttl = ttl
+
+    def load(self, fingerprint: str) -> dict[str, ProbeResult]:
+        try:
+            entry = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if entry.get("fingerprint") != fingerprint or time.time() - entry.get("time", 0) > self.ttl:
+            return {}
+        return {result["name"]: ProbeResult(**result) for result in entry["results"]}
+
+    def store(self, fingerprint: str, results: list[ProbeResult]) -> None:
+        entry = {"fingerprint": fingerprint, "time": time.time(), "results": [asdict(r) for r in results]}
+        try:
+            self.path.write_text(json.dumps(entry))
+        except OSError:
+            pass
+
+
+async def _run_one(probe: Probe, timeout: float) -> ProbeResult:
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(probe.run(), timeout)
+    except asyncio.TimeoutError:
+        result = ProbeResult(probe.name, False, f"timed out after {timeout:.1f}s")
+    except Exception as e:
+        result = ProbeResult(probe.name, False, f"{type(e).__name__}: {e}")
+    result.duration_ms = (time.perf_counter() - started) * 1000
+    return result
+
+
+async def run_probes(
+    probes: list[Probe],
+    timeout: float = 5.0,
+    cache: Optional[ProbeCache] = None,
+    fingerprint: str = "",
+) -> list[ProbeResult]:
+    """Run probes concurrently, serving cacheable ones from ``cache`` if fresh.
+
+    Args:
+        probes: Probes to run
+        timeout: Per-probe timeout in seconds
+        cache: Optional cache for cacheable probes
+        fingerprint: Environment fingerprint the cache is keyed by
+
+    Returns:
+        Results in the order of ``probes``
+    """
+    cached = cache.load(fingerprint) if cache else {}
+    to_run = [probe for probe in probes if not (probe.cacheable and probe.name in cached)]
+    fresh = dict(zip(
+        (probe.name for probe in to_run),
+        await asyncio.gather(*(_run_one(probe, timeout) for probe in to_run)),
+    ))
+
+    results = [fresh.get(probe.name) or cached[probe.name] for probe in probes]
+    if cache:
+        cacheable = {probe.name for probe in probes if probe.cacheable}
+        cache.store(fingerprint, [result for result in results if result.name in cacheable])
+    return results
+
+
+def default_probes(root: Path = ROOT, timeout: float = 5.0) -> tuple[list[Probe], list[Path]]:
+    """Probes for the main project: packages, .env, Temporal and providers."""
+    env_file = root / ".env"
+    openrouter_env = root / "open-router" / ".env"
+    env = {**read_env_file(openrouter_env), **read_env_file(env_file), **os.environ}
+
+    probes = package_probes(REQUIRED_PACKAGES)
+    probes.append(_sync_probe("config:OPENAI_API_KEY", lambda: check_env_key(env_file, *OPENAI_KEY_VARS)))
+    probes.append(temporal_probe(env.get("TEMPORAL_HOST", "localhost:7233")))
+    probes += provider_probes("openai", first_openai_key(env), timeout)
+    if env.get("OPENROUTER_API_KEY"):
+        probes += provider_probes("openrouter", env["OPENROUTER_API_KEY"], timeout)
+    return probes, [env_file, openrouter_env]
+
+
+def print_results(results: list[ProbeResult]) -> None:
+    for result in results:
+        mark = "✓" if result.ok else ("✗" if result.required else "⚠")
+        rtt = f", RTT {result.rtt_ms:.1f} ms" if result.rtt_ms is not None else ""
+        print(f"{mark} {result.name}: {result.detail}{rtt}")
+
+
+def _parse_packages(value: str) -> dict[str, str]:
+    """Parse ``module[=distribution],...`` into a mapping."""
+    packages = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        module, _, distribution = item.partition("=")
+        packages[module] = distribution or REQUIRED_PACKAGES.get(module, module)
+    return packages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Probe the environment concurrently.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-check timeout in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached results")
+    parser.add_argument("--packages", help="Only check these packages (module[=distribution],...)")
+    parser.add_argument("--optional", default="", help="Optional packages to check as well")
+    args = parser.parse_args()
+
+    if args.packages is not None:
+        probes = package_probes(_parse_packages(args.packages), _parse_packages(args.optional))
+        env_files: list[Path] = []
+    else:
+        probes, env_files = default_probes(timeout=args.timeout)
+
+    cache = None if args.no_cache else ProbeCache()
+    fingerprint = environment_fingerprint(env_files)
+    results = asyncio.run(run_probes(probes, args.timeout, cache, fingerprint))
+
+    if args.json:
+        print(json.dumps([asdict(result) for result in results]))
+    else:
+        print_results(results)
+    return 0 if all(result.ok or not result.required for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Backlog-driven autoscaler for local worker processes.
+
+Polls ``DescribeTaskQueue`` for the backlog of the task queues a worker
+polls (its lanes, plus the base queue while it is being drained; workflow
+and activity tasks) and starts or stops local worker processes to match,
+between ``--min`` and ``--max``:
+
+- scale up when the backlog per worker exceeds ``--target-backlog`` or the
+  oldest task has waited longer than ``--max-backlog-age`` (the
+  schedule-to-start latency new tasks will see)
+- scale down one worker at a time once the backlog is small and its
+  oldest task is younger than ``--idle-backlog-age``
+- hysteresis: a change needs several consecutive samples agreeing
+  (``--up-after`` / ``--down-after``) and a cooldown since the last change
+
+Stopped workers get SIGINT so they shut down like a Ctrl+C. Workers that
+exit on their own are restarted to keep the pool at its current size.
+
+Try it against a dev server:
+    temporal server start-dev
+    python autoscaler.py worker.py --min 1 --max 4
+    python load_generator.py ai-content --rate 10 --duration 120
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from temporalio.api.enums.v1 import TaskQueueType
+from temporalio.api.taskqueue.v1 import TaskQueue
+from temporalio.api.workflowservice.v1 import DescribeTaskQueueRequest
+from temporalio.client import Client
+
+from lanes import lane_queues
+
+# Base task queue served by each worker script
+WORKER_QUEUES = {
+    "worker.py": "ai-content-task-queue",
+    "multi_step_chain_worker.py": "multi-step-ai-chain-queue",
+}
+
+
+def worker_task_queues(worker: str) -> list[str]:
+    """Task queues a worker script polls, as configured by LANES and LANE_BASE_QUEUE."""
+    return [task_queue for task_queue, _ in lane_queues(WORKER_QUEUES[worker])]
+
+
+@dataclass
+class QueueSample:
+    """Backlog of a set of task queues at one point in time."""
+    backlog: int
+    backlog_age: float
+    add_rate: float = 0.0
+    dispatch_rate: float = 0.0
+
+
+@dataclass
+class ScalingPolicy:
+    """Bounds and thresholds of the scaling decision."""
+    min_workers: int = 1
+    max_workers: int = 4
+    # Backlog one worker is expected to absorb
+    target_backlog: int = 20
+    # Oldest-task age (seconds) that triggers a scale-up
+    max_backlog_age: float = 5.0
+    # Oldest-task age below which scaling down is allowed
+    idle_backlog_age: float = 0.5
+    up_after: int = 2
+    down_after: int = 6
+    cooldown: float = 30.0
+
+
+class ScalingDecider:
+    """
+    Decide the desired number of workers from successive queue samples.
+
+    Scaling up jumps straight to the size the backlog calls for; scaling
+    down removes one worker per decision. Both need ``up_after`` /
+    ``down_after`` consecutive agreeing samples and ``cooldown`` seconds
+    since the previous change, so a noisy backlog does not make the pool
+    flap.
+    """
+
+    def __init__(self, policy: ScalingPolicy):
+        self.policy = policy
+        self._up_votes = 0
+        self._down_votes = 0
+        self._last_change = -math.inf
+
+    def decide(self, current: int, sample: QueueSample, now: float) -> int:
+        """Return the number of workers to run after observing ``sample``."""
+        policy = self.policy
+        needed = math.ceil(sample.backlog / policy.target_backlog) if sample.backlog else 0
+        if sample.backlog_age > policy.max_backlog_age:
+            needed = max(needed, current + 1)
+
+        if needed > current:
+            self._up_votes, self._down_votes = self._up_votes + 1, 0
+        elif needed < current and sample.backlog_age <= policy.idle_backlog_age:
+            self._up_votes, self._down_votes = 0, self._down_votes + 1
+        else:
+            self._up_votes = self._down_votes = 0
+
+        desired = current
+        if now - self._last_change >= policy.cooldown:
+            if self._up_votes >= policy.up_after:
+                desired = needed
+            elif self._down_votes >= policy.down_after:
+                desired = current - 1
+        desired = min(policy.max_workers, max(policy.min_workers, desired))
+
+        if desired != current:
+            self._last_change = now
+            self._up_votes = self._down_votes = 0
+        return desired
+
+
+async def sample_queues(client: Client, task_queues: list[str]) -> QueueSample:
+    """Sum the backlog of workflow and activity tasks over ``task_queues``."""
+    sample = QueueSample(backlog=0, backlog_age=0.0)
+    for task_queue in task_queues:
+        for queue_type in (TaskQueueType.TASK_QUEUE_TYPE_WORKFLOW, TaskQueueType.TASK_QUEUE_TYPE_ACTIVITY):
+            response = await client.workflow_service.describe_task_queue(
+                DescribeTaskQueueRequest(
+                    namespace=client.namespace,
+                    task_queue=TaskQueue(name=task_queue),
+                    task_queue_type=queue_type,
+                    report_stats=True,
+                )
+            )
+            stats = response.stats
+            sample.backlog += stats.approximate_backlog_count
+            sample.backlog_age = max(
+                sample.backlog_age, stats.approximate_backlog_age.ToTimedelta().total_seconds()
+            )
+            sample.add_rate += stats.tasks_add_rate
+            sample.dispatch_rate += stats.tasks_dispatch_rate
+    return sample
+
+
+class WorkerPool:
+    """Local worker processes running one worker script."""
+
+    def __init__(self, script: Path, stop_timeout: float = 30.0):
+        self.script = script
+        self.stop_timeout = stop_timeout
+        self.processes: list[asyncio.subprocess.Process] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.processes)
+
+    async def scale_to(self, size: int) -> None:
+        """Start or stop processes until ``size`` are running."""
+        # Replace workers that exited on their own
+        self.processes = [p for p in self.processes if p.returncode is None]
+        while self.size < size:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, str(self.script), cwd=self.script.parent
+            )
+            self.processes.append(process)
+            print(f"  started worker pid {process.pid}")
+        while self.size > size:
+            await self._stop(self.processes.pop())
+
+    async def _stop(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        process.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(process.wait(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        print(f"  stopped worker pid {process.pid}")
+
+    async def close(self) -> None:
+        await asyncio.gather(*(self._stop(p) for p in self.processes))
+        self.processes = []
+
+
+async def run_autoscaler(
+    client: Client,
+    pool: WorkerPool,
+    task_queues: list[str],
+    decider: ScalingDecider,
+    interval: float,
+    iterations: Optional[int] = None,
+) -> None:
+    """Sample the queues every ``interval`` seconds and resize the pool."""
+    await pool.scale_to(decider.policy.min_workers)
+    tick = 0
+    while iterations is None or tick < iterations:
+        tick += 1
+        sample = await sample_queues(client, task_queues)
+        desired = decider.decide(pool.size, sample, time.monotonic())
+        print(
+            f"backlog={sample.backlog} age={sample.backlog_age:.1f}s "
+            f"add/dispatch={sample.add_rate:.1f}/{sample.dispatch_rate:.1f}/s "
+            f"workers={pool.size}->{desired}"
+        )
+        await pool.scale_to(desired)
+        await asyncio.sleep(interval)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scale local worker processes with task queue backlog.")
+    parser.add_argument("worker", choices=sorted(WORKER_QUEUES), help="Worker script to run")
+    parser.add_argument("--min", type=int, default=1, help="Minimum worker processes")
+    parser.add_argument("--max", type=int, default=4, help="Maximum worker processes")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between backlog samples")
+    parser.add_argument("--target-backlog", type=int, default=20, help="Backlog per worker")
+    parser.add_argument("--max-backlog-age", type=float, default=5.0, help="Scale up above this task age (s)")
+    parser.add_argument(
+        "--idle-backlog-age", type=float, default=0.5, help="Scale down only below this task age (s)"
+    )
+    parser.add_argument("--up-after", type=int, default=2, help="Samples needed to scale up")
+    parser.add_argument("--down-after", type=int, default=6, help="Samples needed to scale down")
+    parser.add_argument("--cooldown", type=float, default=30.0, help="Seconds between scaling changes")
+    return parser.parse_args()
+
+
+async def main():
+    """Run the autoscaler until interrupted."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = parse_args()
+
+    client = await Client.connect(
+        os.getenv("TEMPORAL_HOST", "localhost:7233"),
+        namespace=os.getenv("TEMPORAL_NAMESPACE", "default"),
+    )
+    task_queues = worker_task_queues(args.worker)
+    policy = ScalingPolicy(
+        min_workers=args.min,
+        max_workers=args.max,
+        target_backlog=args.target_backlog,
+        max_backlog_age=args.max_backlog_age,
+        idle_backlog_age=args.idle_backlog_age,
+        up_after=args.up_after,
+        down_after=args.down_after,
+        cooldown=args.cooldown,
+    )
+    pool = WorkerPool(Path(__file__).parent / args.worker)
+
+    print(f"Autoscaling {args.worker} ({args.min}-{args.max} processes) on {', '.join(task_queues)}")
+    try:
+        await run_autoscaler(client, pool, task_queues, ScalingDecider(policy), args.interval)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,106 @@
+"""
+Benchmark the execution modes for AIContentWorkflow's process_response step.
+
+Runs AIContentWorkflow with a stubbed generate_text_with_openai activity
+(no OpenAI calls) once per step mode and reports end-to-end latency and
+history size, so the overhead of scheduling a regular activity for a cheap
+step can be compared with a local activity and inline workflow code.
+
+Usage:
+    # Starts a local dev server automatically
+    python bench_cheap_steps.py --runs 200
+
+    # Or run against an existing server
+    python bench_cheap_steps.py --address localhost:7233
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from temporalio import activity
+from temporalio.client import Client
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from cheap_steps import StepMode
+from workflows import AIContentWorkflow, process_response
+
+TASK_QUEUE = "bench-cheap-steps"
+
+
+@activity.defn(name="generate_text_with_openai")
+async def stub_generate_text(prompt: str) -> str:
+    """Stand-in for the OpenAI call returning a fixed response."""
+    return "Temporal makes workflows durable, observable and easy to retry. " * 3
+
+
+@asynccontextmanager
+async def temporal_client(address: Optional[str]) -> AsyncIterator[Client]:
+    """Connect to ``address`` or start a throwaway local dev server."""
+    if address:
+        yield await Client.connect(address)
+        return
+    async with await WorkflowEnvironment.start_local() as env:
+        yield env.client
+
+
+async def bench_mode(client: Client, mode: StepMode, runs: int, prompt: str) -> dict:
+    """Run the workflow ``runs`` times sequentially in one step mode."""
+    latencies = []
+    history_events = 0
+    for _ in range(runs):
+        workflow_id = f"bench-{mode.value}-{uuid.uuid4().hex[:8]}"
+        started = time.perf_counter()
+        handle = await client.start_workflow(
+            AIContentWorkflow.run,
+            args=[prompt, mode.value],
+            id=workflow_id,
+            task_queue=TASK_QUEUE,
+        )
+        await handle.result()
+        latencies.append(time.perf_counter() - started)
+        history_events = len((await handle.fetch_history()).events)
+
+    latencies.sort()
+    return {
+        "mode": mode.value,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "history_events": history_events,
+    }
+
+
+async def main():
+    """Run the benchmark for every step mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=100, help="Workflows per mode")
+    parser.add_argument("--address", help="Existing Temporal server (default: start a dev server)")
+    parser.add_argument("--prompt", default="Explain Temporal in one sentence.")
+    args = parser.parse_args()
+
+    async with temporal_client(args.address) as client:
+        async with Worker(
+            client,
+            task_queue=TASK_QUEUE,
+            workflows=[AIContentWorkflow],
+            activities=[stub_generate_text, process_response],
+        ):
+            # Warm up the worker and workflow sandbox before measuring
+            await bench_mode(client, StepMode.ACTIVITY, 3, args.prompt)
+            results = [await bench_mode(client, mode, args.runs, args.prompt) for mode in StepMode]
+
+    print(f"{'mode':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'events':>7}")
+    for result in results:
+        print(
+            f"{result['mode']:<10} {result['mean_ms']:9.2f} {result['p50_ms']:9.2f} "
+            f"{result['p95_ms']:9.2f} {result['history_events']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Helpers for running cheap, deterministic workflow steps.
+
+Post-processing, parsing and formatting steps take microseconds, but as
+regular activities each one costs a task-queue round-trip and several
+history events. ``run_cheap_step`` lets a workflow choose how such a step
+runs:
+
+- ``activity``: a regular activity (scheduled through the task queue)
+- ``local``: a local activity executed by the same worker, no task queue
+- ``inline``: called directly in workflow code, no activity at all
+
+Inline mode is only valid for functions that are deterministic and do not
+use activity APIs (heartbeats, ``activity.info()``, I/O).
+"""
+
+from datetime import timedelta
+from enum import Enum
+from typing import Any, Callable, Optional
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+
+
+class StepMode(str, Enum):
+    """How a cheap step is executed."""
+
+    ACTIVITY = "activity"
+    LOCAL = "local"
+    INLINE = "inline"
+
+
+async def run_cheap_step(
+    fn: Callable[..., Any],
+    *args: Any,
+    mode: StepMode = StepMode.LOCAL,
+    timeout: timedelta = timedelta(seconds=10),
+    retry_policy: Optional[RetryPolicy] = None,
+) -> Any:
+    """Run a cheap step from workflow code.
+
+    Args:
+        fn: Activity function implementing the step
+        *args: Arguments passed to the step
+        mode: Execution mode, see ``StepMode``
+        timeout: Start-to-close timeout for the activity modes
+        retry_policy: Retry policy for the activity modes (server default if None)
+
+    Returns:
+        The step's result
+    """
+    mode = StepMode(mode)
+    if mode is StepMode.INLINE:
+        return await fn(*args)
+    if mode is StepMode.LOCAL:
+        return await workflow.execute_local_activity(
+            fn,
+            args=args,
+            start_to_close_timeout=timeout,
+            retry_policy=retry_policy,
+        )
+    return await workflow.execute_activity(
+        fn,
+        args=args,
+        start_to_close_timeout=timeout,
+        retry_policy=retry_policy,
+    )
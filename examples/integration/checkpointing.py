@@ -0,0 +1,156 @@
+"""
+Heartbeat checkpointing for long LLM activities.
+
+A streamed completion is recorded in the activity's heartbeat details as it
+arrives. When the attempt fails (a start-to-close or heartbeat timeout, a
+dropped connection, a worker crash), the retry finds the partial text in
+``activity.info().heartbeat_details`` and asks the model to continue from
+it instead of generating everything again. That saves the tokens and the
+time already spent.
+
+Checkpoints are cut at a boundary (a space by default, a newline for
+line-oriented output such as bullet lists), so a resumed attempt never
+continues from half a word or half a bullet.
+
+Usage inside an activity:
+
+    resume = last_checkpoint()
+    progress = Checkpoint(resume.text, resume.tokens)
+    text, tokens = await heartbeat_while(
+        stream_text(client, continuation_request(request, resume), progress), progress
+    )
+
+The workflow sets ``heartbeat_timeout`` on the activity, so a stalled
+stream is retried quickly instead of waiting for the start-to-close timeout.
+"""
+
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, TypeVar
+
+from temporalio import activity
+
+T = TypeVar("T")
+
+# Rough size of a token in English text; used for attempts cut short before
+# the provider reported usage
+CHARS_PER_TOKEN = 4
+
+CONTINUE_PROMPT = (
+    "Your previous answer was cut off. Continue exactly where it stops, "
+    "without repeating anything and without any preamble."
+)
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a streamed completion, as recorded in heartbeat details."""
+    text: str = ""
+    tokens: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return len(text) // CHARS_PER_TOKEN + 1 if text else 0
+
+
+def last_checkpoint() -> Checkpoint:
+    """Return the checkpoint of the previous attempt, or an empty one."""
+    details = activity.info().heartbeat_details
+    if not details:
+        return Checkpoint()
+    # Details are decoded without a type hint, so a dataclass arrives as a dict
+    detail = details[0]
+    if isinstance(detail, Checkpoint):
+        return detail
+    if isinstance(detail, dict):
+        return Checkpoint(str(detail.get("text", "")), int(detail.get("tokens", 0)))
+    return Checkpoint()
+
+
+def safe_prefix(text: str, boundary: str = " ") -> str:
+    """Cut ``text`` after the last ``boundary`` (or newline), dropping a partial tail."""
+    cut = max(text.rfind(boundary), text.rfind("\n"))
+    return text[: cut + 1] if cut != -1 else ""
+
+
+def continuation_request(request: dict[str, Any], resume: Checkpoint) -> dict[str, Any]:
+    """Turn a chat completion request into one continuing ``resume.text``.
+
+    The partial answer is sent back as an assistant turn followed by a
+    request to continue, and ``max_tokens`` shrinks by what was already
+    generated.
+    """
+    if not resume.text:
+        return request
+    continued = {
+        **request,
+        "messages": [
+            *request["messages"],
+            {"role": "assistant", "content": resume.text},
+            {"role": "user", "content": CONTINUE_PROMPT},
+        ],
+    }
+    if "max_tokens" in request:
+        continued["max_tokens"] = max(16, request["max_tokens"] - estimate_tokens(resume.text))
+    return continued
+
+
+async def stream_text(client: Any, request: dict[str, Any], progress: Checkpoint, boundary: str = " ") -> tuple[str, int]:
+    """Stream a chat completion, keeping ``progress`` at the last safe boundary.
+
+    Args:
+        client: ``AsyncOpenAI``-compatible client
+        request: Chat completion arguments (built with ``continuation_request``
+            when resuming)
+        progress: Checkpoint to update; starts from the resumed text and tokens
+        boundary: Character after which the text may be cut
+
+    Returns:
+        The full text (resumed prefix included) and the tokens spent over all
+        attempts
+    """
+    prefix, spent = progress.text, progress.tokens
+    prompt_tokens = estimate_tokens(json.dumps(request["messages"]))
+    parts: list[str] = []
+    usage = None
+
+    stream = await client.chat.completions.create(
+        **request, stream=True, stream_options={"include_usage": True}
+    )
+    async for chunk in stream:
+        if chunk.usage is not None:
+            usage = chunk.usage
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            generated = "".join(parts)
+            checkpoint = safe_prefix(generated, boundary)
+            # A resumed answer's first words join the prefix directly
+            progress.text = prefix + checkpoint.lstrip() if prefix else checkpoint
+            progress.tokens = spent + prompt_tokens + estimate_tokens(generated)
+
+    generated = "".join(parts)
+    text = prefix + generated.lstrip() if prefix else generated
+    tokens = spent + (usage.total_tokens if usage is not None else prompt_tokens + estimate_tokens(generated))
+    progress.text, progress.tokens = text, tokens
+    return text, tokens
+
+
+async def heartbeat_while(work: Awaitable[T], progress: Checkpoint, interval: float = 2.0) -> T:
+    """Await ``work``, heartbeating a snapshot of ``progress`` every ``interval`` seconds.
+
+    Heartbeats also carry the checkpoint when ``work`` fails, so the retry
+    resumes from the latest progress rather than from the last interval.
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=interval)
+            activity.heartbeat(Checkpoint(**asdict(progress)))
+            if done:
+                return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
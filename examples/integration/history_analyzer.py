@@ -0,0 +1,352 @@
+"""
+Workflow history and payload size analyzer.
+
+Fetches the histories of workflows from Temporal (or reads histories
+exported as JSON, e.g. with ``temporal workflow show --output json``) and
+breaks their size down:
+
+- bytes and event counts per event type
+- bytes per payload: workflow input/result, each activity's input and
+  result, local activities, signals, updates and child workflows
+- bytes per top-level field of JSON payloads (``generate_content
+  result.content``, ...)
+- text repeated across payloads of the same history, which is what
+  resending content from step to step costs
+
+It then projects how many such runs fit in one execution before the server
+suggests continue-as-new, and before the hard history limits, and flags
+payloads close to the per-payload size limit.
+
+Usage:
+    python history_analyzer.py --workflow-id multi-step-chain-1
+    python history_analyzer.py --query "WorkflowType='MultiStepAIChainWorkflow'" --limit 50
+    python history_analyzer.py --file history.json --json
+    python history_analyzer.py --query "WorkflowType='MultiStepAIChainWorkflow'" --save histories/
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+from dotenv import load_dotenv
+from temporalio.api.common.v1 import Payload
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from temporalio.client import Client, WorkflowHistory
+
+# Server defaults; both are dynamic config and may differ per deployment
+SUGGEST_CONTINUE_AS_NEW_EVENTS = 4 * 1024
+SUGGEST_CONTINUE_AS_NEW_BYTES = 4 * 1024 * 1024
+HISTORY_LIMIT_EVENTS = 50 * 1024
+HISTORY_LIMIT_BYTES = 50 * 1024 * 1024
+PAYLOAD_WARN_BYTES = 512 * 1024
+PAYLOAD_LIMIT_BYTES = 2 * 1024 * 1024
+
+# Shorter strings are too common to be worth reporting as repeated
+MIN_REPEATED_CHARS = 200
+
+
+@dataclass
+class HistoryReport:
+    """Size breakdown of one or more workflow histories."""
+    workflow_type: str
+    runs: int = 0
+    events: int = 0
+    bytes: int = 0
+    event_types: Counter = field(default_factory=Counter)
+    event_type_bytes: Counter = field(default_factory=Counter)
+    payload_bytes: Counter = field(default_factory=Counter)
+    field_bytes: Counter = field(default_factory=Counter)
+    repeated: dict[str, dict[str, Any]] = field(default_factory=dict)
+    largest_payload: tuple[str, int] = ("", 0)
+
+    def merge(self, other: "HistoryReport") -> None:
+        self.runs += other.runs
+        self.events += other.events
+        self.bytes += other.bytes
+        self.event_types.update(other.event_types)
+        self.event_type_bytes.update(other.event_type_bytes)
+        self.payload_bytes.update(other.payload_bytes)
+        self.field_bytes.update(other.field_bytes)
+        for digest, repeat in other.repeated.items():
+            merged = self.repeated.setdefault(digest, {**repeat, "copies": 0, "wasted_bytes": 0})
+            merged["copies"] += repeat["copies"]
+            merged["wasted_bytes"] += repeat["wasted_bytes"]
+        if other.largest_payload[1] > self.largest_payload[1]:
+            self.largest_payload = other.largest_payload
+
+    def projection(self) -> dict[str, Optional[int]]:
+        """Runs of this size that fit in one execution before each limit."""
+        if not self.runs or not self.events:
+            return {"before_continue_as_new": None, "before_history_limit": None}
+        events, size = self.events / self.runs, self.bytes / self.runs
+        return {
+            "before_continue_as_new": int(
+                min(SUGGEST_CONTINUE_AS_NEW_EVENTS / events, SUGGEST_CONTINUE_AS_NEW_BYTES / size)
+            ),
+            "before_history_limit": int(min(HISTORY_LIMIT_EVENTS / events, HISTORY_LIMIT_BYTES / size)),
+        }
+
+    def to_dict(self, top: int = 10) -> dict[str, Any]:
+        repeated = sorted(self.repeated.values(), key=lambda r: r["wasted_bytes"], reverse=True)
+        return {
+            "workflow_type": self.workflow_type,
+            "runs": self.runs,
+            "events_per_run": self.events / self.runs if self.runs else 0,
+            "bytes_per_run": self.bytes / self.runs if self.runs else 0,
+            "event_types": {
+                name: {"count": self.event_types[name], "bytes": size}
+                for name, size in self.event_type_bytes.most_common()
+            },
+            "payloads": dict(self.payload_bytes.most_common(top)),
+            "fields": dict(self.field_bytes.most_common(top)),
+            "repeated": repeated[:top],
+            "largest_payload": {"location": self.largest_payload[0], "bytes": self.largest_payload[1]},
+            "projection": self.projection(),
+        }
+
+
+def _decode(payload: Payload) -> Any:
+    """Return the JSON value of a payload, or None if it is not plain JSON."""
+    if payload.metadata.get("encoding") != b"json/plain":
+        return None
+    try:
+        return json.loads(payload.data)
+    except ValueError:
+        return None
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _event_payloads(event: HistoryEvent, activities: dict[int, str]) -> Iterator[tuple[str, Iterable[Payload]]]:
+    """Yield (location, payloads) for every payload an event carries."""
+    kind = event.WhichOneof("attributes")
+    if kind is None:
+        return
+    attributes = getattr(event, kind)
+
+    if event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED:
+        yield "workflow input", attributes.input.payloads
+    elif event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED:
+        yield "workflow result", attributes.result.payloads
+    elif event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_CONTINUED_AS_NEW:
+        yield "continue-as-new input", attributes.input.payloads
+    elif event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED:
+        activities[event.event_id] = attributes.activity_type.name
+        yield f"{attributes.activity_type.name} input", attributes.input.payloads
+    elif event.event_type == EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED:
+        name = activities.get(attributes.scheduled_event_id, "activity")
+        yield f"{name} result", attributes.result.payloads
+    elif event.event_type == EventType.EVENT_TYPE_MARKER_RECORDED:
+        details = attributes.details
+        if "result" in details:
+            # Local activity markers name the activity in their "data" detail
+            name = attributes.marker_name
+            if "data" in details and details["data"].payloads:
+                data = _decode(details["data"].payloads[0])
+                if isinstance(data, dict):
+                    name = data.get("activity_type", name)
+            yield f"local {name} result", details["result"].payloads
+    elif event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_SIGNALED:
+        yield f"signal {attributes.signal_name}", attributes.input.payloads
+    elif event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_UPDATE_ACCEPTED:
+        request = attributes.accepted_request
+        yield f"update {request.input.name} input", request.input.args.payloads
+    elif event.event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_UPDATE_COMPLETED:
+        yield "update result", attributes.outcome.success.payloads
+    elif event.event_type == EventType.EVENT_TYPE_START_CHILD_WORKFLOW_EXECUTION_INITIATED:
+        yield f"child {attributes.workflow_type.name} input", attributes.input.payloads
+    elif event.event_type == EventType.EVENT_TYPE_CHILD_WORKFLOW_EXECUTION_COMPLETED:
+        yield f"child {attributes.workflow_type.name} result", attributes.result.payloads
+
+
+def analyze_history(history: WorkflowHistory) -> HistoryReport:
+    """Break down the size of one workflow history."""
+    events = list(history.events)
+    workflow_type = "unknown"
+    if events and events[0].event_type == EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED:
+        workflow_type = events[0].workflow_execution_started_event_attributes.workflow_type.name
+
+    report = HistoryReport(workflow_type, runs=1)
+    activities: dict[int, str] = {}
+    texts: dict[str, dict[str, Any]] = {}
+
+    for event in events:
+        size = event.ByteSize()
+        event_type = EventType.Name(event.event_type).removeprefix("EVENT_TYPE_")
+        report.events += 1
+        report.bytes += size
+        report.event_types[event_type] += 1
+        report.event_type_bytes[event_type] += size
+
+        for location, payloads in _event_payloads(event, activities):
+            for index, payload in enumerate(payloads):
+                label = location if len(payloads) == 1 else f"{location}[{index}]"
+                payload_size = payload.ByteSize()
+                report.payload_bytes[location] += payload_size
+                if payload_size > report.largest_payload[1]:
+                    report.largest_payload = (label, payload_size)
+
+                value = _decode(payload)
+                if isinstance(value, dict):
+                    for key, item in value.items():
+                        report.field_bytes[f"{label}.{key}"] += _json_size(item)
+                for text in _strings(value):
+                    if len(text) < MIN_REPEATED_CHARS:
+                        continue
+                    digest = hashlib.sha256(text.encode()).hexdigest()[:16]
+                    seen = texts.setdefault(
+                        digest, {"preview": text[:60], "bytes": len(text.encode()), "locations": []}
+                    )
+                    seen["locations"].append(label)
+
+    for digest, seen in texts.items():
+        copies = len(seen["locations"])
+        if copies > 1:
+            report.repeated[digest] = {
+                **seen,
+                "copies": copies,
+                "wasted_bytes": (copies - 1) * seen["bytes"],
+            }
+    return report
+
+
+def summarize(histories: Iterable[WorkflowHistory]) -> dict[str, HistoryReport]:
+    """Analyze histories and merge the reports per workflow type."""
+    reports: dict[str, HistoryReport] = {}
+    for history in histories:
+        report = analyze_history(history)
+        if report.workflow_type in reports:
+            reports[report.workflow_type].merge(report)
+        else:
+            reports[report.workflow_type] = report
+    return reports
+
+
+def _kb(size: float) -> str:
+    return f"{size / 1024:.1f} KB"
+
+
+def print_report(report: HistoryReport, top: int = 10) -> None:
+    """Print one workflow type's breakdown, per run."""
+    runs = report.runs
+    print(f"\n{report.workflow_type} ({runs} run{'s' if runs != 1 else ''})")
+    print(f"  {report.events / runs:.0f} events, {_kb(report.bytes / runs)} per run")
+
+    print(f"\n  {'event type':<44} {'count':>7} {'per run':>11} {'share':>6}")
+    for name, size in report.event_type_bytes.most_common(top):
+        print(
+            f"  {name:<44} {report.event_types[name] / runs:7.1f} "
+            f"{_kb(size / runs):>11} {size / report.bytes:6.1%}"
+        )
+
+    print(f"\n  {'payload':<44} {'per run':>11} {'share':>6}")
+    for location, size in report.payload_bytes.most_common(top):
+        print(f"  {location:<44} {_kb(size / runs):>11} {size / report.bytes:6.1%}")
+
+    if report.field_bytes:
+        print(f"\n  {'field':<44} {'per run':>11}")
+        for name, size in report.field_bytes.most_common(top):
+            print(f"  {name:<44} {_kb(size / runs):>11}")
+
+    repeated = sorted(report.repeated.values(), key=lambda r: r["wasted_bytes"], reverse=True)
+    if repeated:
+        wasted = sum(r["wasted_bytes"] for r in repeated)
+        print(f"\n  Repeated text: {_kb(wasted / runs)} per run ({wasted / report.bytes:.1%} of history)")
+        for repeat in repeated[:top]:
+            print(f"    {repeat['copies']}x {_kb(repeat['bytes'])}  {repeat['preview']!r}...")
+            print(f"       in {', '.join(dict.fromkeys(repeat['locations']))}")
+
+    location, size = report.largest_payload
+    if size >= PAYLOAD_WARN_BYTES:
+        print(f"\n  WARNING: {location} is {_kb(size)} (payload limit {_kb(PAYLOAD_LIMIT_BYTES)})")
+
+    projection = report.projection()
+    print(
+        f"\n  Runs per execution: {projection['before_continue_as_new']} before continue-as-new is "
+        f"suggested, {projection['before_history_limit']} before the history limit"
+    )
+
+
+def load_files(paths: list[Path]) -> list[WorkflowHistory]:
+    """Read histories exported as JSON (one per file)."""
+    return [WorkflowHistory.from_json(path.stem, path.read_text()) for path in paths]
+
+
+async def fetch_histories(
+    client: Client,
+    workflow_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    query: Optional[str] = None,
+    limit: int = 20,
+) -> list[WorkflowHistory]:
+    """Fetch one workflow's history, or those of up to ``limit`` workflows matching ``query``."""
+    if workflow_id:
+        return [await client.get_workflow_handle(workflow_id, run_id=run_id).fetch_history()]
+
+    histories = []
+    async for execution in client.list_workflows(query, limit=limit):
+        histories.append(await client.get_workflow_handle(execution.id, run_id=execution.run_id).fetch_history())
+    return histories
+
+
+async def main():
+    """Analyze workflow histories from Temporal or from exported files."""
+    parser = argparse.ArgumentParser(description="Break down workflow history and payload sizes.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--workflow-id", help="Analyze one workflow execution")
+    source.add_argument("--query", help="Analyze workflows matching a list filter")
+    source.add_argument("--file", type=Path, nargs="+", help="Analyze exported history JSON files")
+    parser.add_argument("--run-id", help="Run of --workflow-id (default: latest)")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum workflows for --query")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table")
+    parser.add_argument("--save", type=Path, help="Also write fetched histories to this directory")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+
+    if args.file:
+        histories = load_files(args.file)
+    else:
+        load_dotenv()
+        client = await Client.connect(
+            os.getenv("TEMPORAL_HOST", "localhost:7233"),
+            namespace=os.getenv("TEMPORAL_NAMESPACE", "default"),
+        )
+        histories = await fetch_histories(client, args.workflow_id, args.run_id, args.query, args.limit)
+        if args.save:
+            args.save.mkdir(parents=True, exist_ok=True)
+            for history in histories:
+                (args.save / f"{history.workflow_id}.json").write_text(history.to_json())
+
+    if not histories:
+        print("No workflow histories found")
+        return
+
+    reports = summarize(histories)
+    if args.json:
+        print(json.dumps([report.to_dict(args.top) for report in reports.values()], indent=2))
+        return
+    for report in reports.values():
+        print_report(report, args.top)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,232 @@
+"""
+Priority lanes: separate task queues for interactive and batch work.
+
+A bulk run of chain workflows on the same task queue as interactive
+requests fills every worker slot and queues the interactive tasks behind
+it. Lanes give each class of traffic its own task queue
+(``<base>-interactive`` / ``<base>-batch``) and its own worker slots:
+
+- submitters tag a request with a lane by starting it on
+  ``lane_task_queue(base_queue, lane)``
+- workers run one ``Worker`` per lane with the lane's slot allocation
+  (``create_lane_workers``); set ``LANES=batch`` to run a dedicated
+  batch-only process
+- activities are scheduled without an explicit task queue, so they run on
+  the workflow's queue and follow its lane
+- queue latency is recorded per lane (``workflow_start_latency``,
+  ``activity_schedule_to_start_latency`` with a ``lane`` attribute)
+
+Slot allocations can be overridden per lane with
+``LANE_<LANE>_WORKFLOW_SLOTS`` and ``LANE_<LANE>_ACTIVITY_SLOTS``.
+
+Workflows started on the base queue before the lanes existed keep running
+there. Until none are left, workers also poll the base queue with the
+batch allocation; set ``LANE_BASE_QUEUE=0`` once the base queue is drained
+and every submitter uses a lane.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Optional, Sequence
+from temporalio import activity, workflow
+from temporalio.client import Client
+from temporalio.common import MetricHistogramTimedelta, MetricMeter
+from temporalio.runtime import Runtime
+from temporalio.worker import (
+    ActivityInboundInterceptor,
+    ExecuteActivityInput,
+    ExecuteWorkflowInput,
+    Interceptor,
+    Worker,
+    WorkflowInboundInterceptor,
+    WorkflowInterceptorClassInput,
+)
+
+
+class Lane(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+@dataclass(frozen=True)
+class LaneConfig:
+    """Worker slots dedicated to one lane."""
+    workflow_slots: int
+    activity_slots: int
+
+    @classmethod
+    def from_env(cls, lane: Lane) -> "LaneConfig":
+        """Read LANE_<LANE>_WORKFLOW_SLOTS / _ACTIVITY_SLOTS over the defaults."""
+        default = DEFAULT_LANE_CONFIGS[lane]
+        prefix = f"LANE_{lane.value.upper()}"
+        return cls(
+            workflow_slots=int(os.getenv(f"{prefix}_WORKFLOW_SLOTS", default.workflow_slots)),
+            activity_slots=int(os.getenv(f"{prefix}_ACTIVITY_SLOTS", default.activity_slots)),
+        )
+
+
+# Interactive traffic gets most of the slots; batch work is capped so it
+# cannot exhaust shared resources such as the provider's rate limit
+DEFAULT_LANE_CONFIGS = {
+    Lane.INTERACTIVE: LaneConfig(workflow_slots=100, activity_slots=50),
+    Lane.BATCH: LaneConfig(workflow_slots=20, activity_slots=10),
+}
+
+
+def lane_task_queue(base_queue: str, lane: Lane) -> str:
+    """Task queue of ``lane`` for a base queue name."""
+    return f"{base_queue}-{lane.value}"
+
+
+def lane_of(task_queue: str) -> Optional[Lane]:
+    """Lane a task queue belongs to, or None for queues outside any lane."""
+    for lane in Lane:
+        if task_queue.endswith(f"-{lane.value}"):
+            return lane
+    return None
+
+
+def lanes_from_env() -> list[Lane]:
+    """Lanes this process serves, from LANES (default: all)."""
+    names = [name.strip() for name in os.getenv("LANES", "").split(",") if name.strip()]
+    return [Lane(name) for name in names] if names else list(Lane)
+
+
+def base_queue_from_env() -> bool:
+    """Whether to keep polling the base queue, from LANE_BASE_QUEUE (default: yes)."""
+    return os.getenv("LANE_BASE_QUEUE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def lane_queues(
+    base_queue: str,
+    lanes: Optional[Sequence[Lane]] = None,
+    base_queue_worker: Optional[bool] = None,
+) -> list[tuple[str, LaneConfig]]:
+    """
+    Task queues to poll for a base queue, with their slot allocations.
+
+    Work still sent to the base queue itself (by submitters not yet moved
+    to a lane, and by workflows started there before the migration) gets
+    the batch allocation, so it is not stranded and cannot take
+    interactive slots.
+
+    Args:
+        base_queue: Task queue name the lanes are derived from
+        lanes: Lanes to serve (default: ``lanes_from_env()``)
+        base_queue_worker: Also poll ``base_queue`` (default:
+            ``base_queue_from_env()``)
+    """
+    queues = [(lane_task_queue(base_queue, lane), LaneConfig.from_env(lane)) for lane in lanes or lanes_from_env()]
+    if base_queue_worker if base_queue_worker is not None else base_queue_from_env():
+        queues.append((base_queue, LaneConfig.from_env(Lane.BATCH)))
+    return queues
+
+
+def create_lane_workers(
+    client: Client,
+    base_queue: str,
+    workflows: Sequence[type],
+    activities: Sequence[Callable],
+    interceptors: Sequence[Interceptor] = (),
+    lanes: Optional[Sequence[Lane]] = None,
+    base_queue_worker: Optional[bool] = None,
+) -> list[Worker]:
+    """
+    Create one worker per lane, each with the lane's slot allocation, plus
+    one on the base queue while it is being drained (see ``lane_queues``).
+
+    Args:
+        client: Temporal client
+        base_queue: Task queue name the lanes are derived from
+        workflows: Workflow classes to register on every lane
+        activities: Activities to register on every lane
+        interceptors: Extra interceptors for every worker
+        lanes: Lanes to serve (default: ``lanes_from_env()``)
+        base_queue_worker: Also poll ``base_queue`` (default:
+            ``base_queue_from_env()``)
+
+    Returns:
+        list[Worker]: Workers to run together, e.g. with ``asyncio.gather``
+    """
+    runtime = client.service_client.config.runtime or Runtime.default()
+    lane_metrics = LaneMetricsInterceptor(runtime.metric_meter)
+    return [
+        Worker(
+            client,
+            task_queue=task_queue,
+            workflows=list(workflows),
+            activities=list(activities),
+            max_concurrent_workflow_tasks=config.workflow_slots,
+            max_concurrent_activities=config.activity_slots,
+            interceptors=[*interceptors, lane_metrics],
+        )
+        for task_queue, config in lane_queues(base_queue, lanes, base_queue_worker)
+    ]
+
+
+class LaneMetricsInterceptor(Interceptor):
+    """
+    Record how long workflows and activities waited in their lane's queue.
+
+    Args:
+        meter: Runtime metric meter the activity latency histogram is
+            created on (workflow latency goes to ``workflow.metric_meter()``)
+    """
+
+    def __init__(self, meter: MetricMeter):
+        self._activity_latency = meter.create_histogram_timedelta(
+            "activity_schedule_to_start_latency",
+            "Time activities waited in their lane's task queue",
+            "ms",
+        )
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _LaneActivityInbound(next, self._activity_latency)
+
+    def workflow_interceptor_class(
+        self, input: WorkflowInterceptorClassInput
+    ) -> Optional[type[WorkflowInboundInterceptor]]:
+        return _LaneWorkflowInbound
+
+
+def _lane_attribute(task_queue: str) -> dict[str, str]:
+    lane = lane_of(task_queue)
+    return {"lane": lane.value if lane else "none"}
+
+
+class _LaneActivityInbound(ActivityInboundInterceptor):
+    def __init__(self, next: ActivityInboundInterceptor, latency: MetricHistogramTimedelta):
+        super().__init__(next)
+        self._latency = latency
+
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        info = activity.info()
+        if info.current_attempt_scheduled_time is not None:
+            # Clamp clock skew between the server and this host
+            waited = max(timedelta(0), datetime.now(timezone.utc) - info.current_attempt_scheduled_time)
+            self._latency.record(
+                waited,
+                {
+                    "namespace": info.namespace,
+                    "task_queue": info.task_queue,
+                    "activity_type": info.activity_type,
+                    **_lane_attribute(info.task_queue),
+                },
+            )
+        return await super().execute_activity(input)
+
+
+class _LaneWorkflowInbound(WorkflowInboundInterceptor):
+    async def execute_workflow(self, input: ExecuteWorkflowInput) -> Any:
+        info = workflow.info()
+        # The workflow meter skips recording during replay and adds the
+        # namespace, task queue and workflow type
+        latency = workflow.metric_meter().create_histogram_timedelta(
+            "workflow_start_latency",
+            "Time from workflow start until its first task ran in its lane",
+            "ms",
+        )
+        latency.record(max(timedelta(0), workflow.now() - info.start_time), _lane_attribute(info.task_queue))
+        return await super().execute_workflow(input)
@@ -0,0 +1,262 @@
+"""
+Load generator for the integration workflows.
+
+Submits a registered workflow either at a target rate (open loop) or with a
+fixed number of in-flight executions (closed loop). Every execution gets a
+unique ID and a prompt from a corpus file. Start-to-complete latency is
+recorded per workflow and a throughput/latency summary is printed at the end.
+
+Examples:
+    # 5 workflows per second for one minute
+    python load_generator.py ai-content --rate 5 --duration 60 --prompts prompts.txt
+
+    # 20 concurrent chains, 500 in total
+    python load_generator.py multi-step-chain --concurrency 20 --total 500
+
+    # Check interactive latency while a batch runs (in two shells)
+    python load_generator.py multi-step-chain --concurrency 200 --duration 300
+    python load_generator.py ai-content --rate 2 --duration 120 --lane interactive
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+from dotenv import load_dotenv
+from temporalio.client import Client
+
+from fast_converter import fast_data_converter
+from lanes import Lane, lane_task_queue
+from multi_step_chain import MultiStepAIChainWorkflow, StructuredAIChainWorkflow
+from workflows import AIContentWorkflow
+
+# Load environment variables
+load_dotenv()
+
+
+@dataclass
+class WorkflowSpec:
+    """How to submit one registered workflow."""
+
+    run: Any
+    base_queue: str
+    build_args: Callable[[str], list[Any]]
+    lane: Lane = Lane.INTERACTIVE
+
+    @property
+    def task_queue(self) -> str:
+        return lane_task_queue(self.base_queue, self.lane)
+
+
+WORKFLOWS: dict[str, WorkflowSpec] = {
+    "ai-content": WorkflowSpec(
+        AIContentWorkflow.run,
+        "ai-content-task-queue",
+        lambda prompt: [prompt],
+    ),
+    "multi-step-chain": WorkflowSpec(
+        MultiStepAIChainWorkflow.run,
+        "multi-step-ai-chain-queue",
+        lambda prompt: [prompt, "short"],
+        Lane.BATCH,
+    ),
+    "structured-chain": WorkflowSpec(
+        StructuredAIChainWorkflow.run,
+        "multi-step-ai-chain-queue",
+        lambda prompt: [prompt, "short"],
+        Lane.BATCH,
+    ),
+}
+
+DEFAULT_PROMPTS = [
+    "Explain the benefits of using Temporal for workflow orchestration in 2-3 sentences.",
+    "Temporal workflow orchestration",
+    "Machine Learning in production systems",
+]
+
+
+@dataclass
+class LoadResults:
+    """Latencies and failures collected during a run."""
+
+    latencies: list[float] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def submitted(self) -> int:
+        return len(self.latencies) + len(self.failures)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values`` (nearest rank)."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(len(ordered) * pct / 100) - 1))
+    return ordered[index]
+
+
+def load_prompts(path: Optional[str]) -> list[str]:
+    """Read one prompt per non-empty line, or fall back to built-in prompts."""
+    if path is None:
+        return DEFAULT_PROMPTS
+    prompts = [line.strip() for line in Path(path).read_text().splitlines() if line.strip()]
+    if not prompts:
+        raise ValueError(f"No prompts found in {path}")
+    return prompts
+
+
+async def submit_one(
+    client: Client,
+    spec: WorkflowSpec,
+    prompt: str,
+    id_prefix: str,
+    results: LoadResults,
+) -> None:
+    """Start one workflow with a unique ID and record its latency."""
+    workflow_id = f"{id_prefix}-{uuid.uuid4().hex[:12]}"
+    started = time.monotonic()
+    try:
+        handle = await client.start_workflow(
+            spec.run,
+            args=spec.build_args(prompt),
+            id=workflow_id,
+            task_queue=spec.task_queue,
+        )
+        await handle.result()
+    except Exception as e:
+        results.failures.append(f"{workflow_id}: {type(e).__name__}: {e}")
+        return
+    results.latencies.append(time.monotonic() - started)
+
+
+async def run_at_rate(
+    client: Client,
+    spec: WorkflowSpec,
+    prompts: Iterator[str],
+    rate: float,
+    deadline: float,
+    total: Optional[int],
+    id_prefix: str,
+    results: LoadResults,
+) -> None:
+    """Open loop: start ``rate`` workflows per second regardless of completions."""
+    tasks: list[asyncio.Task] = []
+    interval = 1.0 / rate
+    next_start = time.monotonic()
+    while time.monotonic() < deadline and (total is None or len(tasks) < total):
+        tasks.append(asyncio.create_task(submit_one(client, spec, next(prompts), id_prefix, results)))
+        next_start += interval
+        await asyncio.sleep(max(0.0, next_start - time.monotonic()))
+    await asyncio.gather(*tasks)
+
+
+async def run_with_concurrency(
+    client: Client,
+    spec: WorkflowSpec,
+    prompts: Iterator[str],
+    concurrency: int,
+    deadline: float,
+    total: Optional[int],
+    id_prefix: str,
+    results: LoadResults,
+) -> None:
+    """Closed loop: keep ``concurrency`` workflows in flight."""
+    remaining = itertools.count() if total is None else iter(range(total))
+
+    async def submitter() -> None:
+        while time.monotonic() < deadline and next(remaining, None) is not None:
+            await submit_one(client, spec, next(prompts), id_prefix, results)
+
+    await asyncio.gather(*(submitter() for _ in range(concurrency)))
+
+
+def print_summary(name: str, results: LoadResults) -> None:
+    """Print throughput and latency percentiles."""
+    elapsed = time.monotonic() - results.started_at
+    completed = len(results.latencies)
+
+    print("=" * 70)
+    print(f"Load test summary: {name}")
+    print("=" * 70)
+    print(f"Submitted:  {results.submitted}")
+    print(f"Completed:  {completed}")
+    print(f"Failed:     {len(results.failures)}")
+    print(f"Elapsed:    {elapsed:.1f}s")
+    print(f"Throughput: {completed / elapsed:.2f} workflows/s")
+    if results.latencies:
+        print("\nStart-to-complete latency:")
+        for pct in (50, 90, 95, 99):
+            print(f"  p{pct:<3} {percentile(results.latencies, pct):8.3f}s")
+        print(f"  max  {max(results.latencies):8.3f}s")
+    for failure in results.failures[:5]:
+        print(f"  ✗ {failure}")
+    if len(results.failures) > 5:
+        print(f"  ... and {len(results.failures) - 5} more failures")
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Submit workflows at a target rate or concurrency.")
+    parser.add_argument("workflow", choices=sorted(WORKFLOWS), help="Registered workflow to run")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rate", type=float, help="Workflows started per second (open loop)")
+    mode.add_argument("--concurrency", type=int, help="Workflows kept in flight (closed loop)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to keep submitting")
+    parser.add_argument("--total", type=int, help="Stop after this many workflows")
+    parser.add_argument("--prompts", help="File with one prompt per line")
+    parser.add_argument(
+        "--lane",
+        choices=[lane.value for lane in Lane],
+        help="Priority lane to submit to (default: interactive for ai-content, batch for chains)",
+    )
+    parser.add_argument("--id-prefix", help="Workflow ID prefix (default: load-<workflow>)")
+    args = parser.parse_args(argv)
+
+    for option in ("rate", "concurrency", "duration", "total"):
+        value = getattr(args, option)
+        if value is not None and value <= 0:
+            parser.error(f"--{option} must be positive")
+    return args
+
+
+async def main():
+    """Run the load generator."""
+    args = parse_args()
+    spec = WORKFLOWS[args.workflow]
+    if args.lane:
+        spec = replace(spec, lane=Lane(args.lane))
+    prompts = itertools.cycle(load_prompts(args.prompts))
+    id_prefix = args.id_prefix or f"load-{args.workflow}"
+
+    # Get Temporal configuration from environment
+    temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
+    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
+
+    # Connect to Temporal
+    client = await Client.connect(
+        temporal_host,
+        namespace=temporal_namespace,
+        data_converter=fast_data_converter(),
+    )
+
+    results = LoadResults()
+    deadline = time.monotonic() + args.duration
+    print(f"Submitting {args.workflow} to {spec.task_queue} for up to {args.duration:.0f}s...")
+
+    if args.rate is not None:
+        await run_at_rate(client, spec, prompts, args.rate, deadline, args.total, id_prefix, results)
+    else:
+        await run_with_concurrency(
+            client, spec, prompts, args.concurrency, deadline, args.total, id_prefix, results
+        )
+
+    print_summary(args.workflow, results)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
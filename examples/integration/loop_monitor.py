@@ -0,0 +1,114 @@
+"""
+Event-loop lag monitor for workers.
+
+Workflows and async activities share the worker's event loop. A blocking
+call inside an ``async def`` activity (for example the synchronous OpenAI
+client) stalls every other task on the worker. The monitor measures how
+late a periodic timer fires (the loop lag), exports it as the
+``event_loop_lag`` histogram, and logs the stack of the code that is
+holding the loop when the lag passes a threshold.
+
+Configure with LOOP_LAG_THRESHOLD_MS (default 250).
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop lag and report what blocks the loop.
+
+    Args:
+        threshold: Lag in seconds after which the blocking stack is logged
+        interval: Seconds between lag measurements
+        meter: Optional Temporal metric meter to export the lag
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, meter: Any = None):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.stalls = 0
+
+        self._histogram = None
+        self._stall_counter = None
+        if meter is not None:
+            self._histogram = meter.create_histogram_float(
+                "event_loop_lag", "Delay of the worker event loop", "s"
+            )
+            self._stall_counter = meter.create_counter(
+                "event_loop_stalls", "Times the event loop lag exceeded the threshold"
+            )
+
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, meter: Any = None) -> "LoopLagMonitor":
+        """Build a monitor using LOOP_LAG_THRESHOLD_MS."""
+        threshold_ms = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+        return cls(threshold=threshold_ms / 1000, meter=meter)
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _measure(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+
+            lag = max(0.0, now - started - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            if self._histogram is not None:
+                self._histogram.record(lag)
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while it is stalled."""
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            stalled_for = time.monotonic() - beat - self.interval
+            if stalled_for < self.threshold or beat == reported_beat:
+                continue
+
+            # Report each stall once, with the stack that is blocking it
+            reported_beat = beat
+            self.stalls += 1
+            if self._stall_counter is not None:
+                self._stall_counter.add(1)
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>\n"
+            logger.warning(
+                "Event loop blocked for %.0f ms (threshold %.0f ms). Blocking stack:\n%s",
+                stalled_for * 1000,
+                self.threshold * 1000,
+                stack,
+            )
@@ -0,0 +1,244 @@
+"""
+Map-reduce summarization for documents larger than the model context.
+
+``MapReduceSummaryWorkflow`` summarizes a text file of any size:
+
+1. ``plan_chunks`` scans the file in bounded blocks and returns byte ranges
+   of roughly ``chunk_tokens`` tokens, cut at paragraph, line or word
+   boundaries. Only offsets enter the workflow history, never the text.
+2. ``summarize_chunk`` activities read and summarize one range each, at
+   most ``max_parallel`` at a time.
+3. Summaries are combined in groups of up to ``fan_in`` (and at most
+   ``chunk_tokens`` tokens) by ``combine_summaries``, level by level,
+   until a single summary remains.
+
+Wall-clock time grows with the number of reduce levels (logarithmic in the
+document size) rather than the number of chunks, as long as there are
+workers to run the chunks in parallel.
+
+The file has to be readable by the workers at the same path (a local file
+for a single machine, a shared volume otherwise).
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import timedelta
+from temporalio import activity, workflow
+from temporalio.common import RetryPolicy
+import os
+
+with workflow.unsafe.imports_passed_through():
+    from llm_common.gateway import get_gateway
+
+# Rough size of a token in English text; good enough to stay under limits
+CHARS_PER_TOKEN = 4
+
+SUMMARY_MODEL = "gpt-3.5-turbo"
+
+
+@dataclass
+class SummarizeRequest:
+    path: str
+    chunk_tokens: int = 2000
+    max_parallel: int = 8
+    fan_in: int = 8
+
+
+@dataclass
+class ChunkRange:
+    start: int
+    end: int
+
+
+@dataclass
+class SummaryResult:
+    path: str
+    summary: str
+    chunks: int
+    reduce_levels: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _cut_point(block: bytes) -> int:
+    """Best place to end a chunk within ``block`` (exclusive index)."""
+    half = len(block) // 2
+    for separator in (b"\n\n", b"\n", b" "):
+        index = block.rfind(separator, half)
+        if index != -1:
+            return index + len(separator)
+    # No whitespace: cut anyway, but not inside a UTF-8 sequence
+    cut = len(block)
+    while cut > 0 and block[cut - 1] & 0xC0 == 0x80:
+        cut -= 1
+    if cut > 0 and block[cut - 1] & 0xC0 == 0xC0:
+        cut -= 1
+    return cut or len(block)
+
+
+def split_ranges(path: str, chunk_bytes: int) -> list[ChunkRange]:
+    """Split a file into ranges of at most ``chunk_bytes`` bytes.
+
+    Reads one block at a time, so memory use does not depend on file size.
+    """
+    ranges = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        start = 0
+        while start < size:
+            if size - start <= chunk_bytes:
+                ranges.append(ChunkRange(start, size))
+                break
+            f.seek(start)
+            end = start + _cut_point(f.read(chunk_bytes))
+            ranges.append(ChunkRange(start, end))
+            start = end
+    return ranges
+
+
+def group_for_reduce(summaries: list[str], max_tokens: int, fan_in: int) -> list[list[str]]:
+    """Group consecutive summaries so each group fits one reduce prompt.
+
+    Every group has at least two summaries when possible, so each level
+    shrinks the list and the reduction terminates.
+    """
+    groups: list[list[str]] = []
+    current: list[str] = []
+    tokens = 0
+    for summary in summaries:
+        size = estimate_tokens(summary)
+        if len(current) >= 2 and (len(current) >= fan_in or tokens + size > max_tokens):
+            groups.append(current)
+            current, tokens = [], 0
+        current.append(summary)
+        tokens += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _complete(system: str, user: str, max_tokens: int) -> str:
+    response = await get_gateway().chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        max_tokens=max_tokens,
+    )
+    return response.choices[0].message.content or ""
+
+
+@activity.defn
+async def plan_chunks(path: str, chunk_tokens: int) -> list[ChunkRange]:
+    """Split a file into byte ranges of about ``chunk_tokens`` tokens.
+
+    Args:
+        path: Text file to summarize
+        chunk_tokens: Target tokens per chunk
+
+    Returns:
+        Byte ranges covering the whole file
+    """
+    return await asyncio.to_thread(split_ranges, path, chunk_tokens * CHARS_PER_TOKEN)
+
+
+@activity.defn
+async def summarize_chunk(path: str, chunk: ChunkRange) -> str:
+    """Summarize one byte range of a file.
+
+    Args:
+        path: Text file to summarize
+        chunk: Byte range to read
+
+    Returns:
+        Summary of the chunk
+    """
+
+    def read() -> str:
+        with open(path, "rb") as f:
+            f.seek(chunk.start)
+            return f.read(chunk.end - chunk.start).decode("utf-8", errors="replace")
+
+    text = await asyncio.to_thread(read)
+    return await _complete(
+        "You summarize one section of a longer document. Keep names, numbers and conclusions.",
+        f"Summarize this section in a few sentences:\n\n{text}",
+        max_tokens=200,
+    )
+
+
+@activity.defn
+async def combine_summaries(summaries: list[str]) -> str:
+    """Merge consecutive section summaries into one summary.
+
+    Args:
+        summaries: Summaries of consecutive sections, in document order
+
+    Returns:
+        Combined summary
+    """
+    sections = "\n\n".join(f"Section {i + 1}: {summary}" for i, summary in enumerate(summaries))
+    return await _complete(
+        "You merge summaries of consecutive sections of a document into one coherent summary.",
+        f"Combine these section summaries into a single summary:\n\n{sections}",
+        max_tokens=300,
+    )
+
+
+@workflow.defn
+class MapReduceSummaryWorkflow:
+    """Summarize a long document by summarizing chunks and reducing the summaries."""
+
+    @workflow.run
+    async def run(self, request: SummarizeRequest) -> SummaryResult:
+        """Run the map-reduce summarization.
+
+        Args:
+            request: File path, chunk size, parallelism and reduce fan-in
+
+        Returns:
+            SummaryResult with the final summary and chunk/level counts
+        """
+        chunks = await workflow.execute_activity(
+            plan_chunks,
+            args=[request.path, request.chunk_tokens],
+            start_to_close_timeout=timedelta(minutes=5),
+            retry_policy=RetryPolicy(maximum_attempts=3),
+        )
+
+        # Caps in-flight LLM calls for this workflow (map and reduce alike)
+        limit = asyncio.Semaphore(request.max_parallel)
+
+        async def limited(activity_fn, *args) -> str:
+            async with limit:
+                return await workflow.execute_activity(
+                    activity_fn,
+                    args=list(args),
+                    start_to_close_timeout=timedelta(seconds=60),
+                    retry_policy=RetryPolicy(maximum_attempts=3),
+                )
+
+        async def reduce(group: list[str]) -> str:
+            # A leftover single summary moves up a level unchanged
+            if len(group) == 1:
+                return group[0]
+            return await limited(combine_summaries, group)
+
+        summaries = await asyncio.gather(*(limited(summarize_chunk, request.path, chunk) for chunk in chunks))
+
+        levels = 0
+        while len(summaries) > 1:
+            groups = group_for_reduce(list(summaries), request.chunk_tokens, request.fan_in)
+            summaries = await asyncio.gather(*(reduce(group) for group in groups))
+            levels += 1
+
+        return SummaryResult(
+            path=request.path,
+            summary=summaries[0] if summaries else "",
+            chunks=len(chunks),
+            reduce_levels=levels,
+        )
@@ -0,0 +1,122 @@
+"""
+Workflow-level memoization through input-derived workflow IDs.
+
+The workflow ID is a hash of the workflow type and its arguments, so
+identical requests map to the same ID. Temporal's ID policies then do the
+deduplication:
+
+- a request for a workflow that is still running attaches to it
+  (``WorkflowIDConflictPolicy.USE_EXISTING``)
+- a request for a workflow that already completed gets the stored result,
+  as long as the closed execution is retained by the namespace
+  (``WorkflowIDReusePolicy.ALLOW_DUPLICATE_FAILED_ONLY``)
+- a request for a workflow that failed, was cancelled or timed out starts
+  a fresh execution
+
+Pass ``ttl`` to limit how long results are reused: the current time window
+becomes part of the hash, so a new execution starts once it rolls over.
+"""
+
+import hashlib
+import json
+import time
+from datetime import timedelta
+from typing import Any, Optional
+from temporalio import workflow
+from temporalio.client import Client, WorkflowHandle
+from temporalio.common import WorkflowIDConflictPolicy, WorkflowIDReusePolicy
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+
+def memoized_workflow_id(
+    workflow_type: str,
+    args: list[Any],
+    ttl: Optional[timedelta] = None,
+    prefix: Optional[str] = None,
+) -> str:
+    """Derive a deterministic workflow ID from a workflow type and its inputs.
+
+    Args:
+        workflow_type: Registered workflow name
+        args: Workflow arguments (must be JSON serializable)
+        ttl: Optional reuse window; IDs change when the window rolls over
+        prefix: Human-readable ID prefix (defaults to the workflow type)
+
+    Returns:
+        Workflow ID such as ``MultiStepAIChainWorkflow-3f2a...``
+    """
+    key: list[Any] = [workflow_type, args]
+    if ttl is not None:
+        key.append(int(time.time() // ttl.total_seconds()))
+    payload = json.dumps(key, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:32]
+    return f"{prefix or workflow_type}-{digest}"
+
+
+def workflow_type_of(run_fn: Any) -> str:
+    """Return the registered workflow name for a ``@workflow.run`` method.
+
+    This is the ``name`` given to ``@workflow.defn``, or the class name.
+    """
+    return workflow._Definition.must_from_run_fn(run_fn).name
+
+
+async def submit_memoized(
+    client: Client,
+    run_fn: Any,
+    *args: Any,
+    task_queue: str,
+    ttl: Optional[timedelta] = None,
+    workflow_type: Optional[str] = None,
+    **start_kwargs: Any,
+) -> WorkflowHandle:
+    """Start a workflow, or attach to an identical running or completed one.
+
+    Args:
+        client: Temporal client
+        run_fn: The workflow's ``@workflow.run`` method
+        *args: Workflow arguments
+        task_queue: Task queue to start the workflow on
+        ttl: Optional window during which completed results are reused
+        workflow_type: Workflow name, if it differs from the class name
+        **start_kwargs: Extra ``Client.start_workflow`` options
+
+    Returns:
+        Handle whose ``result()`` resolves to the memoized result
+    """
+    workflow_id = memoized_workflow_id(workflow_type or workflow_type_of(run_fn), list(args), ttl)
+    try:
+        return await client.start_workflow(
+            run_fn,
+            args=args,
+            id=workflow_id,
+            task_queue=task_queue,
+            id_conflict_policy=WorkflowIDConflictPolicy.USE_EXISTING,
+            id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE_FAILED_ONLY,
+            **start_kwargs,
+        )
+    except WorkflowAlreadyStartedError:
+        # A completed execution with the same inputs is still retained
+        return client.get_workflow_handle_for(run_fn, workflow_id)
+
+
+async def execute_memoized(
+    client: Client,
+    run_fn: Any,
+    *args: Any,
+    task_queue: str,
+    ttl: Optional[timedelta] = None,
+    workflow_type: Optional[str] = None,
+    **start_kwargs: Any,
+) -> Any:
+    """Like ``submit_memoized`` but wait for and return the result."""
+    handle = await submit_memoized(
+        client,
+        run_fn,
+        *args,
+        task_queue=task_queue,
+        ttl=ttl,
+        workflow_type=workflow_type,
+        **start_kwargs,
+    )
+    return await handle.result()
@@ -6,26 +6,173 @@ This workflow demonstrates:
 2. Analyzing the generated content
 3. Summarizing the analysis
 4. Combining results with temporal orchestration
+
+StructuredAIChainWorkflow is a variant that asks for the analysis as
+structured output (sentiment, summary and key points in one JSON response)
+and therefore skips the separate key point extraction call.
+
+Both workflows store their result, including the tokens spent, in the
+worker's SQLite result store (RESULT_STORE_PATH, default results.db).
+
+Steps exchange typed dataclasses with real numbers and lists; run workers
+and clients with ``fast_converter.fast_data_converter()`` so older
+histories with stringified fields still decode.
 """
 
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
 from datetime import timedelta
 from temporalio import workflow, activity
 from temporalio.common import RetryPolicy
-from openai import OpenAI
-from typing import TypedDict
+from temporalio.exceptions import ApplicationError
+from typing import Iterator, Optional, Union
+import json
 import os
 
+from cheap_steps import run_cheap_step
+
+with workflow.unsafe.imports_passed_through():
+    from checkpointing import Checkpoint, continuation_request, heartbeat_while, last_checkpoint, stream_text
+    from llm_common.gateway import get_gateway
+    from llm_common.metrics import metric_meter
+    from result_store import ChainRecord, ResultStore
+    from llm_common.similarity_cache import SimilarityCache, namespace_key
+    from singleflight import SingleFlight, request_key
 
-class GeneratedContent(TypedDict):
+
+@dataclass
+class GeneratedContent:
     content: str
     word_count: int
+    tokens: int = 0
+
+
+@dataclass
+class ContentAnalysis:
+    analysis: str
+    tokens: int = 0
 
 
-class AnalysisResult(TypedDict):
+@dataclass
+class AnalysisResult:
     content: str
     summary: str
     sentiment: str
     key_points: list[str]
+    tokens: int = 0
+
+
+@dataclass
+class ChainSummary:
+    final_summary: str
+    original_content_length: int
+    analysis_length: int
+    tokens: int = 0
+
+
+@dataclass
+class KeyPoints:
+    key_points: list[str]
+    tokens: int = 0
+
+
+@dataclass
+class ChainResult:
+    topic: str
+    generated_content: str
+    content_word_count: int
+    analysis: str
+    final_summary: str
+    key_points: list[str] = field(default_factory=list)
+    total_tokens: int = 0
+
+
+# JSON schema for structured analysis; "content" is filled in from the input
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": ["positive", "neutral", "negative"]},
+        "summary": {"type": "string", "description": "One-sentence summary"},
+        "key_points": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "3-5 key takeaways",
+        },
+    },
+    "required": ["sentiment", "summary", "key_points"],
+    "additionalProperties": False,
+}
+
+# Structured outputs need a model that supports json_schema response formats
+STRUCTURED_MODEL = "gpt-4o-mini"
+
+# Streaming activities heartbeat every couple of seconds; a stalled stream is
+# retried (from its checkpoint) after this long instead of after 30s
+HEARTBEAT_TIMEOUT = timedelta(seconds=10)
+
+
+_single_flight: Optional[SingleFlight] = None
+_similarity_cache: Optional[SimilarityCache] = None
+_similarity_cache_loaded = False
+_result_store: Optional[ResultStore] = None
+# Progress of in-flight generations and how many activities share each
+_generation_progress: dict[str, list] = {}
+
+
+def get_single_flight() -> SingleFlight:
+    """Return the worker-wide single-flight group for generation calls."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight(meter=metric_meter())
+    return _single_flight
+
+
+def get_similarity_cache() -> Optional[SimilarityCache]:
+    """Return the worker-wide similarity cache, or None unless LLM_SIMILARITY_CACHE is enabled."""
+    global _similarity_cache, _similarity_cache_loaded
+    if not _similarity_cache_loaded:
+        _similarity_cache = SimilarityCache.from_env("LLM", meter=metric_meter())
+        _similarity_cache_loaded = True
+    return _similarity_cache
+
+
+def get_result_store() -> ResultStore:
+    """Return the worker-wide result store at RESULT_STORE_PATH."""
+    global _result_store
+    if _result_store is None:
+        _result_store = ResultStore(os.getenv("RESULT_STORE_PATH", "results.db"))
+    return _result_store
+
+
+def close_result_store() -> None:
+    """Commit queued results and stop the result store's writer, if one was opened."""
+    global _result_store
+    if _result_store is not None:
+        _result_store.close()
+        _result_store = None
+
+
+@contextmanager
+def _shared_progress(key: str, resume: Checkpoint) -> Iterator[Checkpoint]:
+    """Progress shared by the activities coalesced on a single-flight ``key``.
+
+    Coalesced activities heartbeat the progress of the one call they share,
+    so if it fails they all resume from the same checkpoint, and their
+    retries coalesce again.
+    """
+    entry = _generation_progress.setdefault(key, [Checkpoint(resume.text, resume.tokens), 0])
+    entry[1] += 1
+    try:
+        yield entry[0]
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _generation_progress[key]
+
+
+def _tokens(response) -> int:
+    """Total tokens used by a chat completion, 0 if not reported."""
+    return response.usage.total_tokens if response.usage else 0
 
 
 @activity.defn
@@ -39,18 +186,25 @@ async def generate_content(topic: str, length: str = "short") -> GeneratedConten
     Returns:
         GeneratedContent with content and word count
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-    client = OpenAI(api_key=api_key)
+    # Calls are spread over the worker's pool of API keys
+    client = get_gateway()
 
     token_limits = {"short": 150, "medium": 300, "long": 500}
     max_tokens = token_limits.get(length, 150)
-
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
+    model = "gpt-3.5-turbo"
+
+    # Topics that differ only trivially from an earlier one reuse its content
+    cache = get_similarity_cache()
+    namespace = namespace_key(length=length, model=model, max_tokens=max_tokens)
+    if cache is not None:
+        cached = cache.get(topic, namespace)
+        if cached is not None:
+            # The tokens were spent, and reported, by the call that filled the cache
+            return replace(GeneratedContent(**cached), tokens=0)
+
+    request = {
+        "model": model,
+        "messages": [
             {
                 "role": "system",
                 "content": "You are a content writer who creates informative and engaging text.",
@@ -60,30 +214,45 @@ async def generate_content(topic: str, length: str = "short") -> GeneratedConten
                 "content": f"Write a {length} explanation about {topic}. Focus on key concepts and practical applications.",
             },
         ],
-        max_tokens=max_tokens,
-    )
-
-    content = response.choices[0].message.content or ""
-    return {"content": content, "word_count": len(content.split())}
+        "max_tokens": max_tokens,
+    }
+    # A retry continues the text an earlier attempt checkpointed
+    resume = last_checkpoint()
+
+    # Identical concurrent requests in this worker share one API call, and
+    # its progress
+    key = request_key(topic, length=length, model=model, max_tokens=max_tokens, resume=resume.text)
+    executed = False
+    with _shared_progress(key, resume) as progress:
+
+        async def generate() -> GeneratedContent:
+            nonlocal executed
+            executed = True
+            content, tokens = await stream_text(client, continuation_request(request, resume), progress)
+            return GeneratedContent(content, len(content.split()), tokens)
+
+        result = await heartbeat_while(get_single_flight().do(key, generate), progress)
+    if not executed:
+        # Served by an identical call in flight, which reports the tokens
+        return replace(result, tokens=0)
+    if cache is not None:
+        cache.put(topic, asdict(result), namespace)
+    return result
 
 
 @activity.defn
-async def analyze_content(content: str) -> dict[str, str]:
+async def analyze_content(content: str) -> ContentAnalysis:
     """Analyze the generated content using OpenAI.
 
     Args:
         content: Text to analyze
 
     Returns:
-        Dictionary with sentiment, summary, and key insights
+        ContentAnalysis with sentiment, summary and key insights as text
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    client = get_gateway()
 
-    client = OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model="gpt-3.5-turbo",
         messages=[
             {
@@ -103,11 +272,82 @@ Content: {content}""",
         max_tokens=200,
     )
 
-    return {"analysis": response.choices[0].message.content or ""}
+    return ContentAnalysis(response.choices[0].message.content or "", _tokens(response))
+
+
+@activity.defn
+async def analyze_content_structured(content: str) -> AnalysisResult:
+    """Analyze content and return sentiment, summary and key points in one call.
+
+    Args:
+        content: Text to analyze
+
+    Returns:
+        AnalysisResult parsed from the model's JSON schema response
+
+    Raises:
+        ApplicationError: If the model refuses or its response does not
+            match the schema (not retryable; the same content would fail
+            the same way)
+    """
+    client = get_gateway()
+
+    response = await client.chat.completions.create(
+        model=STRUCTURED_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a content analyst. Report sentiment, a one-sentence summary and 3-5 key points.",
+            },
+            {"role": "user", "content": f"Content: {content}"},
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "content_analysis", "strict": True, "schema": ANALYSIS_SCHEMA},
+        },
+        max_tokens=300,
+    )
+
+    message = response.choices[0].message
+    if getattr(message, "refusal", None):
+        raise ApplicationError(
+            f"Model refused to analyze the content: {message.refusal}",
+            type="AnalysisRefused",
+            non_retryable=True,
+        )
+    try:
+        analysis = json.loads(message.content or "")
+    except ValueError:
+        analysis = {}
+    if not isinstance(analysis, dict):
+        analysis = {}
+    missing = [key for key in ANALYSIS_SCHEMA["required"] if key not in analysis]
+    if missing:
+        raise ApplicationError(
+            f"Structured analysis is missing {', '.join(missing)}: {(message.content or '')[:200]!r}",
+            type="InvalidAnalysis",
+            non_retryable=True,
+        )
+    return AnalysisResult(
+        content=content,
+        summary=analysis["summary"],
+        sentiment=analysis["sentiment"],
+        key_points=analysis["key_points"],
+        tokens=_tokens(response),
+    )
+
+
+def format_analysis(analysis: AnalysisResult) -> str:
+    """Render a structured analysis in the free-text form used by the chain."""
+    return (
+        f"Sentiment: {analysis.sentiment}\n"
+        f"Summary: {analysis.summary}\n"
+        f"Key insights: {', '.join(analysis.key_points)}"
+    )
 
 
 @activity.defn
-async def summarize_analysis(generated_content: str, analysis: str) -> dict[str, str]:
+async def summarize_analysis(generated_content: str, analysis: str) -> ChainSummary:
     """Create a final summary combining content and analysis.
 
     Args:
@@ -115,15 +355,11 @@ async def summarize_analysis(generated_content: str, analysis: str) -> dict[str,
         analysis: Analysis of the content
 
     Returns:
-        Dictionary with combined summary and metadata
+        ChainSummary with the combined summary and input lengths
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    client = get_gateway()
 
-    client = OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model="gpt-3.5-turbo",
         messages=[
             {
@@ -145,32 +381,29 @@ Provide a summary that highlights the most important aspects in 2-3 sentences.""
         max_tokens=150,
     )
 
-    return {
-        "final_summary": response.choices[0].message.content or "",
-        "original_content_length": str(len(generated_content)),
-        "analysis_length": str(len(analysis)),
-    }
+    return ChainSummary(
+        final_summary=response.choices[0].message.content or "",
+        original_content_length=len(generated_content),
+        analysis_length=len(analysis),
+        tokens=_tokens(response),
+    )
 
 
 @activity.defn
-async def extract_key_points(combined_text: str) -> list[str]:
+async def extract_key_points(combined_text: str) -> KeyPoints:
     """Extract key bullet points from combined text.
 
     Args:
         combined_text: Text containing both content and analysis
 
     Returns:
-        List of key points
+        KeyPoints with the list of key points and tokens used
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    client = get_gateway()
 
-    client = OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
+    request = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
             {
                 "role": "system",
                 "content": "Extract 3-5 key bullet points from the text.",
@@ -180,11 +413,45 @@ async def extract_key_points(combined_text: str) -> list[str]:
                 "content": f"Extract the main takeaways as bullet points:\n\n{combined_text}",
             },
         ],
-        max_tokens=200,
+        "max_tokens": 200,
+    }
+    # Checkpoints end at a line, so a retry never resumes mid-bullet
+    resume = last_checkpoint()
+    progress = Checkpoint(resume.text, resume.tokens)
+    content, tokens = await heartbeat_while(
+        stream_text(client, continuation_request(request, resume), progress, boundary="\n"), progress
     )
 
-    content = response.choices[0].message.content or ""
-    return [point.strip("- ").strip() for point in content.split("\n") if point.strip()]
+    return KeyPoints([point.strip("- ").strip() for point in content.split("\n") if point.strip()], tokens)
+
+
+@activity.defn
+async def store_chain_result(result: ChainResult) -> None:
+    """Write a finished chain's result to the worker's result store.
+
+    Args:
+        result: The chain workflow's result
+    """
+    info = activity.info()
+    await get_result_store().write(
+        ChainRecord(
+            workflow_id=info.workflow_id or "",
+            workflow_type=info.workflow_type or "",
+            topic=result.topic,
+            content=result.generated_content,
+            analysis=result.analysis,
+            summary=result.final_summary,
+            key_points="; ".join(result.key_points),
+            total_tokens=result.total_tokens,
+        )
+    )
+
+
+def total_tokens(
+    *step_results: Union[GeneratedContent, ContentAnalysis, AnalysisResult, ChainSummary, KeyPoints],
+) -> int:
+    """Sum the tokens reported by chain steps."""
+    return sum(step.tokens for step in step_results)
 
 
 @workflow.defn
@@ -192,7 +459,7 @@ class MultiStepAIChainWorkflow:
     """Workflow that chains multiple AI operations."""
 
     @workflow.run
-    async def run(self, topic: str, length: str = "medium") -> dict[str, str]:
+    async def run(self, topic: str, length: str = "medium") -> ChainResult:
         """Run the multi-step AI chain workflow.
 
         Args:
@@ -200,45 +467,113 @@ class MultiStepAIChainWorkflow:
             length: Length of content to generate
 
         Returns:
-            Dictionary with all results from the chain
+            ChainResult with all results from the chain
         """
         step1_result = await workflow.execute_activity(
             generate_content,
-            topic,
-            length,
+            args=[topic, length],
             start_to_close_timeout=timedelta(seconds=30),
+            heartbeat_timeout=HEARTBEAT_TIMEOUT,
             retry_policy=RetryPolicy(maximum_attempts=3),
         )
 
         step2_result = await workflow.execute_activity(
             analyze_content,
-            step1_result["content"],
+            step1_result.content,
             start_to_close_timeout=timedelta(seconds=30),
             retry_policy=RetryPolicy(maximum_attempts=3),
         )
 
         step3_result = await workflow.execute_activity(
             summarize_analysis,
-            step1_result["content"],
-            step2_result["analysis"],
+            args=[step1_result.content, step2_result.analysis],
             start_to_close_timeout=timedelta(seconds=30),
             retry_policy=RetryPolicy(maximum_attempts=3),
         )
 
-        combined_text = f"{step1_result['content']}\n\n{step2_result['analysis']}\n\n{step3_result['final_summary']}"
+        combined_text = f"{step1_result.content}\n\n{step2_result.analysis}\n\n{step3_result.final_summary}"
 
+        # Executions that extracted key points before they reported tokens
+        # replay the plain list the activity returned then
+        reports_tokens = workflow.patched("key-points-tokens")
         step4_result = await workflow.execute_activity(
             extract_key_points,
             combined_text,
             start_to_close_timeout=timedelta(seconds=30),
+            heartbeat_timeout=HEARTBEAT_TIMEOUT,
             retry_policy=RetryPolicy(maximum_attempts=3),
+            result_type=KeyPoints if reports_tokens else list[str],
+        )
+        if not reports_tokens:
+            step4_result = KeyPoints(step4_result)
+
+        result = ChainResult(
+            topic=topic,
+            generated_content=step1_result.content,
+            content_word_count=step1_result.word_count,
+            analysis=step2_result.analysis,
+            final_summary=step3_result.final_summary,
+            key_points=step4_result.key_points,
+            total_tokens=total_tokens(step1_result, step2_result, step3_result, step4_result),
         )
 
-        return {
-            "topic": topic,
-            "generated_content": step1_result["content"],
-            "content_word_count": str(step1_result["word_count"]),
-            "analysis": step2_result["analysis"],
-            "final_summary": step3_result["final_summary"],
-            "key_points": "; ".join(step4_result),
-        }
+        # Executions started before the result store existed do not store
+        if workflow.patched("store-chain-result"):
+            await run_cheap_step(store_chain_result, result)
+
+        return result
+
+
+@workflow.defn
+class StructuredAIChainWorkflow:
+    """Multi-step chain that gets key points from a structured analysis."""
+
+    @workflow.run
+    async def run(self, topic: str, length: str = "medium") -> ChainResult:
+        """Run the chain with one model call fewer than MultiStepAIChainWorkflow.
+
+        Args:
+            topic: Topic to generate content about
+            length: Length of content to generate
+
+        Returns:
+            ChainResult like MultiStepAIChainWorkflow
+        """
+        step1_result = await workflow.execute_activity(
+            generate_content,
+            args=[topic, length],
+            start_to_close_timeout=timedelta(seconds=30),
+            heartbeat_timeout=HEARTBEAT_TIMEOUT,
+            retry_policy=RetryPolicy(maximum_attempts=3),
+        )
+
+        step2_result = await workflow.execute_activity(
+            analyze_content_structured,
+            step1_result.content,
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=3),
+        )
+        analysis = format_analysis(step2_result)
+
+        step3_result = await workflow.execute_activity(
+            summarize_analysis,
+            args=[step1_result.content, analysis],
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=3),
+        )
+
+        result = ChainResult(
+            topic=topic,
+            generated_content=step1_result.content,
+            content_word_count=step1_result.word_count,
+            analysis=analysis,
+            final_summary=step3_result.final_summary,
+            key_points=step2_result.key_points,
+            total_tokens=total_tokens(step1_result, step2_result, step3_result),
+        )
+
+        # Executions started before the result store existed do not store
+        if workflow.patched("store-chain-result"):
+            await run_cheap_step(store_chain_result, result)
+
+        return result
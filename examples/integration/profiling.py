@@ -0,0 +1,206 @@
+"""
+On-demand CPU profiling for workers.
+
+While a profiling window is open, a background thread samples the worker's
+event-loop thread and the SDK's workflow-task threads (where workflow
+activations and the sandbox run) and aggregates the stacks into
+collapsed-stack files (``frame;frame;frame count``), which can be turned
+into flamegraphs with ``flamegraph.pl`` or opened directly in speedscope.
+Each stack is rooted at ``event-loop`` or ``workflow-task``. The sampler
+thread only runs inside a window:
+
+- ``WORKER_PROFILE_SECONDS=N`` profiles the first N seconds after startup
+- ``kill -USR2 <pid>`` starts a window of ``WORKER_PROFILE_WINDOW`` seconds
+  (default 30)
+- ``WORKER_PROFILE_ACTIVITIES=generate_content,analyze_content`` only keeps
+  samples taken while one of these activity types is running; without a
+  window it profiles continuously and writes a file every window
+
+Files are written to ``WORKER_PROFILE_DIR`` (default ``profiles/``) as
+``<pid>-<timestamp>.collapsed``.
+"""
+
+import asyncio
+import concurrent.futures.thread
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+from temporalio import activity
+from temporalio.worker import ActivityInboundInterceptor, ExecuteActivityInput, Interceptor
+
+# The SDK runs workflow activations in a thread pool with this name prefix
+WORKFLOW_THREAD_PREFIX = "temporal_workflow_"
+
+# Innermost frame of an idle pool thread waiting for work
+_IDLE_POOL_CODE = concurrent.futures.thread._worker.__code__
+
+
+class WorkerProfiler(Interceptor):
+    """
+    Sample the event-loop and workflow-task threads during profiling windows.
+
+    Register the profiler as a worker interceptor so it can restrict
+    sampling to selected activity types.
+
+    Args:
+        output_dir: Directory for ``.collapsed`` files
+        activity_types: Only sample while these activity types run (all if empty)
+        window: Length in seconds of signal-triggered windows
+        interval: Seconds between samples
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        activity_types: frozenset[str] = frozenset(),
+        window: float = 30.0,
+        interval: float = 0.005,
+    ):
+        self.output_dir = Path(output_dir)
+        self.activity_types = activity_types
+        self.window = window
+        self.interval = interval
+
+        self._target_thread: Optional[int] = None
+        self._stacks: Counter[str] = Counter()
+        self._deadline = 0.0
+        self._running_selected = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls) -> "WorkerProfiler":
+        """Build a profiler from the WORKER_PROFILE_* environment variables."""
+        activities = os.getenv("WORKER_PROFILE_ACTIVITIES", "")
+        return cls(
+            output_dir=os.getenv("WORKER_PROFILE_DIR", "profiles"),
+            activity_types=frozenset(name.strip() for name in activities.split(",") if name.strip()),
+            window=float(os.getenv("WORKER_PROFILE_WINDOW", "30")),
+        )
+
+    def install(self) -> None:
+        """Record the event-loop thread and hook up triggers.
+
+        Must be called from the worker's event loop. The sampler thread is
+        only started once a window opens, or right away when sampling is
+        restricted to activity types.
+        """
+        loop = asyncio.get_running_loop()
+        self._target_thread = threading.get_ident()
+
+        if hasattr(signal, "SIGUSR2"):
+            loop.add_signal_handler(signal.SIGUSR2, self.start_window)
+
+        startup_seconds = float(os.getenv("WORKER_PROFILE_SECONDS", "0"))
+        if startup_seconds > 0:
+            self.start_window(startup_seconds)
+        elif self.activity_types:
+            with self._lock:
+                self._deadline = float("inf")
+                self._start_sampler()
+            print(f"Profiling {', '.join(sorted(self.activity_types))}, writing to {self.output_dir}/")
+
+    def start_window(self, seconds: Optional[float] = None) -> None:
+        """Profile for ``seconds`` (default: the configured window)."""
+        with self._lock:
+            self._deadline = max(self._deadline, time.monotonic() + (seconds or self.window))
+            self._start_sampler()
+        print(f"Profiling for {seconds or self.window:.0f}s (pid {os.getpid()}), writing to {self.output_dir}/")
+
+    def stop(self) -> Optional[Path]:
+        """Stop sampling and write any pending samples."""
+        self._stopped.set()
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        return self._flush()
+
+    def _start_sampler(self) -> None:
+        # Called with the lock held
+        if self._thread is None and not self._stopped.is_set():
+            self._thread = threading.Thread(target=self._sample_loop, name="worker-profiler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self) -> None:
+        flush_at = time.monotonic() + self.window
+        while not self._stopped.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                if now >= self._deadline:
+                    # Window over; start_window starts a new sampler
+                    self._thread = None
+                    break
+            if now >= flush_at:
+                self._flush()
+                flush_at = now + self.window
+            if self.activity_types and not self._running_selected:
+                continue
+            self._sample()
+        else:
+            # Stopped: stop() writes the pending samples
+            return
+        self._flush()
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        targets = [("event-loop", self._target_thread)]
+        targets += [
+            ("workflow-task", thread.ident)
+            for thread in threading.enumerate()
+            if thread.name.startswith(WORKFLOW_THREAD_PREFIX)
+        ]
+        samples = []
+        for root, ident in targets:
+            frame = frames.get(ident)
+            if frame is None or frame.f_code is _IDLE_POOL_CODE:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(root)
+            samples.append(";".join(reversed(stack)))
+        if samples:
+            with self._lock:
+                self._stacks.update(samples)
+
+    def _flush(self) -> Optional[Path]:
+        with self._lock:
+            stacks, self._stacks = self._stacks, Counter()
+        if not stacks:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        with open(path, "a") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"Profile written: {path} ({sum(stacks.values())} samples)")
+        return path
+
+    def intercept_activity(self, next: ActivityInboundInterceptor) -> ActivityInboundInterceptor:
+        return _ProfiledActivityInbound(next, self)
+
+
+class _ProfiledActivityInbound(ActivityInboundInterceptor):
+    def __init__(self, next: ActivityInboundInterceptor, profiler: WorkerProfiler):
+        super().__init__(next)
+        self._profiler = profiler
+
+    async def execute_activity(self, input: ExecuteActivityInput) -> Any:
+        if activity.info().activity_type not in self._profiler.activity_types:
+            return await super().execute_activity(input)
+
+        self._profiler._running_selected += 1
+        try:
+            return await super().execute_activity(input)
+        finally:
+            self._profiler._running_selected -= 1
@@ -0,0 +1,288 @@
+"""
+SQLite store for chain workflow results.
+
+Writes from many concurrent activities are funnelled through one writer
+thread. The thread drains its queue into a single transaction per batch
+(up to ``batch_size`` rows), so a batch run pays for one commit per batch
+instead of one per result. The database runs in WAL mode, so readers never
+block the writer.
+
+Topic and content are indexed with FTS5 for instant text search, when the
+SQLite build has FTS5; otherwise ``search`` falls back to LIKE. Results
+can be exported to Parquet (requires ``pyarrow``).
+
+Usage:
+    store = ResultStore("results.db")
+    await store.write(ChainRecord(workflow_id="...", topic="...", ...))
+    store.search("temporal retries")
+    store.export_parquet("results.parquet")
+
+    python result_store.py search "temporal retries"
+    python result_store.py export results.parquet
+"""
+
+import argparse
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import closing
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Optional, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chain_results (
+    id INTEGER PRIMARY KEY,
+    workflow_id TEXT NOT NULL UNIQUE,
+    workflow_type TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    content TEXT NOT NULL,
+    analysis TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    key_points TEXT NOT NULL,
+    total_tokens INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chain_results_created ON chain_results (created);
+"""
+
+# External-content FTS index kept in sync with the table by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS chain_results_fts USING fts5(
+    topic, content, content='chain_results', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS chain_results_ai AFTER INSERT ON chain_results BEGIN
+    INSERT INTO chain_results_fts (rowid, topic, content) VALUES (new.id, new.topic, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chain_results_ad AFTER DELETE ON chain_results BEGIN
+    INSERT INTO chain_results_fts (chain_results_fts, rowid, topic, content)
+    VALUES ('delete', old.id, old.topic, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chain_results_au AFTER UPDATE ON chain_results BEGIN
+    INSERT INTO chain_results_fts (chain_results_fts, rowid, topic, content)
+    VALUES ('delete', old.id, old.topic, old.content);
+    INSERT INTO chain_results_fts (rowid, topic, content) VALUES (new.id, new.topic, new.content);
+END;
+"""
+
+
+@dataclass
+class ChainRecord:
+    """One stored chain result."""
+    workflow_id: str
+    workflow_type: str
+    topic: str
+    content: str
+    analysis: str
+    summary: str
+    key_points: str
+    total_tokens: int = 0
+    created: float = field(default_factory=time.time)
+
+
+_COLUMNS = [f.name for f in fields(ChainRecord)]
+# Activity retries re-deliver the same workflow's result; keep the latest
+_UPSERT = (
+    f"INSERT INTO chain_results ({', '.join(_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+    "ON CONFLICT (workflow_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in _COLUMNS if c != "workflow_id")
+)
+
+_STOP = object()
+
+
+def fts_query(text: str) -> str:
+    """Turn user text into an FTS5 query matching all of its terms.
+
+    Each term is quoted as an FTS5 string, so punctuation ("C++",
+    "what's", "temporal-retries") is tokenized like the indexed text
+    instead of being parsed as query syntax.
+    """
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+class ResultStore:
+    """
+    Batched, WAL-mode SQLite store for chain results.
+
+    Args:
+        path: Database file
+        batch_size: Maximum rows committed in one transaction
+        linger: Seconds the writer waits for more rows before committing a
+            partial batch
+    """
+
+    def __init__(self, path: Union[str, Path] = "results.db", batch_size: int = 1000, linger: float = 0.005):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.linger = linger
+        self.batches = 0
+        self.rows = 0
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5
+                self.fts = False
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="result-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, record: ChainRecord) -> "Future[None]":
+        """Queue a record; the future completes once its batch is committed."""
+        done: "Future[None]" = Future()
+        self._queue.put((record, done))
+        return done
+
+    async def write(self, record: ChainRecord) -> None:
+        """Store a record and wait until it is committed."""
+        await asyncio.wrap_future(self.submit(record))
+
+    def close(self) -> None:
+        """Commit queued records and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(conn, batch)
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[tuple[ChainRecord, Future]]) -> None:
+        try:
+            with conn:
+                conn.executemany(_UPSERT, [tuple(asdict(record).values()) for record, _ in batch])
+        except Exception as e:
+            for _, done in batch:
+                done.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for _, done in batch:
+            done.set_result(None)
+
+    def get(self, workflow_id: str) -> Optional[dict[str, Any]]:
+        """Return the result stored for a workflow."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM chain_results WHERE workflow_id = ?", (workflow_id,)).fetchone()
+        return dict(row) if row else None
+
+    def search(self, text: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Full-text search over topic and content, best matches first.
+
+        Every whitespace-separated term of ``text`` has to match; terms are
+        plain text, not FTS5 query syntax.
+        """
+        with closing(self._connect()) as conn:
+            if self.fts:
+                query = fts_query(text)
+                if not query:
+                    return []
+                rows = conn.execute(
+                    "SELECT chain_results.* FROM chain_results_fts "
+                    "JOIN chain_results ON chain_results.id = chain_results_fts.rowid "
+                    "WHERE chain_results_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (query, limit),
+                ).fetchall()
+            else:
+                pattern = f"%{text}%"
+                rows = conn.execute(
+                    "SELECT * FROM chain_results WHERE topic LIKE ? OR content LIKE ? "
+                    "ORDER BY created DESC LIMIT ?",
+                    (pattern, pattern, limit),
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def export_parquet(self, destination: Union[str, Path], chunk_rows: int = 50_000) -> int:
+        """
+        Export all results to a Parquet file.
+
+        Args:
+            destination: Parquet file to write
+            chunk_rows: Rows per row group, bounding memory use
+
+        Returns:
+            int: Number of rows exported
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+        columns = ["id", *_COLUMNS]
+        exported = 0
+        writer = None
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM chain_results ORDER BY id")
+            try:
+                while rows := cursor.fetchmany(chunk_rows):
+                    table = pa.Table.from_pylist([dict(row) for row in rows])
+                    if writer is None:
+                        writer = pq.ParquetWriter(str(destination), table.schema)
+                    writer.write_table(table)
+                    exported += len(rows)
+            finally:
+                if writer is not None:
+                    writer.close()
+        return exported
+
+
+def main():
+    """Search or export a result store from the command line."""
+    parser = argparse.ArgumentParser(description="Query or export stored chain results.")
+    parser.add_argument("--db", default="results.db", help="Result store database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="Full-text search over topic and content")
+    search.add_argument("text")
+    search.add_argument("--limit", type=int, default=10)
+    export = commands.add_parser("export", help="Export all results to Parquet")
+    export.add_argument("destination")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    try:
+        if args.command == "search":
+            for row in store.search(args.text, args.limit):
+                print(f"{row['workflow_id']}  [{row['total_tokens']} tokens]  {row['topic']}")
+                print(f"    {row['summary'][:120]}")
+        else:
+            count = store.export_parquet(args.destination)
+            print(f"Exported {count} results to {args.destination}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
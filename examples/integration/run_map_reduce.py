@@ -0,0 +1,64 @@
+"""
+Summarize a long document with the map-reduce summarization workflow.
+
+Usage:
+    python run_map_reduce.py path/to/document.txt
+    python run_map_reduce.py report.txt --chunk-tokens 3000 --max-parallel 16 --lane batch
+
+The file must be readable by the workers at the same path.
+"""
+
+import argparse
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+from temporalio.client import Client
+
+from fast_converter import fast_data_converter
+from lanes import Lane, lane_task_queue
+from map_reduce import MapReduceSummaryWorkflow, SummarizeRequest
+
+# Load environment variables
+load_dotenv()
+
+
+async def main():
+    """Run the map-reduce summarization workflow on a file."""
+    parser = argparse.ArgumentParser(description="Summarize a long document with map-reduce.")
+    parser.add_argument("path", help="Text file to summarize")
+    parser.add_argument("--chunk-tokens", type=int, default=2000, help="Approximate tokens per chunk")
+    parser.add_argument("--max-parallel", type=int, default=8, help="Concurrent summarization calls")
+    parser.add_argument("--fan-in", type=int, default=8, help="Summaries combined per reduce call")
+    parser.add_argument("--lane", choices=[lane.value for lane in Lane], default=Lane.BATCH.value)
+    args = parser.parse_args()
+
+    # Get Temporal configuration from environment
+    temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
+    temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
+
+    # Connect to Temporal
+    client = await Client.connect(
+        temporal_host,
+        namespace=temporal_namespace,
+        data_converter=fast_data_converter(),
+    )
+
+    path = str(Path(args.path).resolve())
+    print(f"Summarizing {path} ({Path(path).stat().st_size:,} bytes)...")
+
+    result = await client.execute_workflow(
+        MapReduceSummaryWorkflow.run,
+        SummarizeRequest(path, args.chunk_tokens, args.max_parallel, args.fan_in),
+        id=f"map-reduce-summary-{uuid.uuid4().hex[:12]}",
+        task_queue=lane_task_queue("multi-step-ai-chain-queue", Lane(args.lane)),
+    )
+
+    print(f"\nChunks: {result.chunks}, reduce levels: {result.reduce_levels}")
+    print("\nSummary:")
+    print(result.summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
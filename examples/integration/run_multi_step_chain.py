@@ -6,6 +6,10 @@ This script demonstrates running a complex workflow that chains multiple AI oper
 2. Content analysis
 3. Summary creation
 4. Key point extraction
+
+Workflow IDs are derived from the inputs, so running the script again while
+a chain is running attaches to it, and a completed chain returns its stored
+result instead of calling OpenAI again.
 """
 
 import asyncio
@@ -13,21 +17,43 @@ import os
 from dotenv import load_dotenv
 from temporalio.client import Client
 
-from multi_step_chain import MultiStepAIChainWorkflow
+from fast_converter import fast_data_converter
+from llm_common.gateway import ProviderGateway
+from lanes import Lane, lane_task_queue
+from memoized_submit import execute_memoized
+from multi_step_chain import ChainResult, MultiStepAIChainWorkflow
 
 # Load environment variables
 load_dotenv()
 
 
+def print_result(result: ChainResult) -> None:
+    """Print a chain result."""
+    print(f"\nTopic: {result.topic}")
+    print(f"Word Count: {result.content_word_count}")
+    print(f"Tokens: {result.total_tokens}")
+    print(f"\nGenerated Content:")
+    print(result.generated_content)
+    print(f"\nAnalysis:")
+    print(result.analysis)
+    print(f"\nFinal Summary:")
+    print(result.final_summary)
+    print(f"\nKey Points:")
+    for point in result.key_points:
+        print(f"  • {point}")
+
+
 async def main():
     """Run the multi-step AI chain workflow."""
     # Get Temporal configuration from environment
     temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
     temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
 
-    # Verify OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("Error: OPENAI_API_KEY not found in environment variables")
+    # Verify OpenAI API keys are set (a single key, a key list or a pool)
+    try:
+        ProviderGateway.from_env()
+    except ValueError as e:
+        print(f"Error: {e}")
         print("Please copy .env.example to .env and add your API key")
         return
 
@@ -35,6 +61,7 @@ async def main():
     client = await Client.connect(
         temporal_host,
         namespace=temporal_namespace,
+        data_converter=fast_data_converter(),
     )
 
     print("=" * 70)
@@ -51,25 +78,15 @@ async def main():
     print("Example 1: Short content about Temporal")
     print("-" * 70)
 
-    result = await client.execute_workflow(
+    result = await execute_memoized(
+        client,
         MultiStepAIChainWorkflow.run,
         "Temporal workflow orchestration",
         "short",
-        id="multi-step-chain-1",
-        task_queue="multi-step-ai-chain-queue",
+        task_queue=lane_task_queue("multi-step-ai-chain-queue", Lane.INTERACTIVE),
     )
 
-    print(f"\nTopic: {result['topic']}")
-    print(f"Word Count: {result['content_word_count']}")
-    print(f"\nGenerated Content:")
-    print(result["generated_content"])
-    print(f"\nAnalysis:")
-    print(result["analysis"])
-    print(f"\nFinal Summary:")
-    print(result["final_summary"])
-    print(f"\nKey Points:")
-    for point in result["key_points"].split(";"):
-        print(f"  • {point.strip()}")
+    print_result(result)
 
     print("\n" + "=" * 70)
 
@@ -77,25 +94,15 @@ async def main():
     print("Example 2: Medium content about Machine Learning")
     print("-" * 70)
 
-    result = await client.execute_workflow(
+    result = await execute_memoized(
+        client,
         MultiStepAIChainWorkflow.run,
         "Machine Learning in production systems",
         "medium",
-        id="multi-step-chain-2",
-        task_queue="multi-step-ai-chain-queue",
+        task_queue=lane_task_queue("multi-step-ai-chain-queue", Lane.INTERACTIVE),
     )
 
-    print(f"\nTopic: {result['topic']}")
-    print(f"Word Count: {result['content_word_count']}")
-    print(f"\nGenerated Content:")
-    print(result["generated_content"])
-    print(f"\nAnalysis:")
-    print(result["analysis"])
-    print(f"\nFinal Summary:")
-    print(result["final_summary"])
-    print(f"\nKey Points:")
-    for point in result["key_points"].split(";"):
-        print(f"  • {point.strip()}")
+    print_result(result)
 
     print("\n" + "=" * 70)
     print("Multi-step AI chain workflow completed successfully!")
@@ -9,6 +9,9 @@ import os
 from dotenv import load_dotenv
 from temporalio.client import Client
 
+from fast_converter import fast_data_converter
+from llm_common.gateway import ProviderGateway
+from lanes import Lane, lane_task_queue
 from workflows import AIContentWorkflow
 
 # Load environment variables
@@ -21,9 +24,11 @@ async def main():
     temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
     temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
 
-    # Verify OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("Error: OPENAI_API_KEY not found in environment variables")
+    # Verify OpenAI API keys are set (a single key, a key list or a pool)
+    try:
+        ProviderGateway.from_env()
+    except ValueError as e:
+        print(f"Error: {e}")
         print("Please copy .env.example to .env and add your API key")
         return
 
@@ -31,6 +36,7 @@ async def main():
     client = await Client.connect(
         temporal_host,
         namespace=temporal_namespace,
+        data_converter=fast_data_converter(),
     )
 
     # Start the workflow
@@ -41,7 +47,7 @@ async def main():
         AIContentWorkflow.run,
         "Explain the benefits of using Temporal for workflow orchestration in 2-3 sentences.",
         id="ai-content-workflow-1",
-        task_queue="ai-content-task-queue",
+        task_queue=lane_task_queue("ai-content-task-queue", Lane.INTERACTIVE),
     )
 
     print("\nWorkflow completed!")
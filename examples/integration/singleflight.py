@@ -0,0 +1,108 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+When several activities in the same worker ask for exactly the same LLM
+call at the same time, only the first one reaches the provider. The others
+wait for that call and receive its result. Nothing is cached: once the call
+finishes, the next identical request goes to the provider again.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def request_key(prompt: str, **params: Any) -> str:
+    """Build a coalescing key from a prompt and the request parameters.
+
+    Whitespace in the prompt is normalized so that prompts differing only in
+    spacing or surrounding blanks share a key.
+    """
+    normalized = " ".join(prompt.split())
+    payload = json.dumps({"prompt": normalized, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Future[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Share one in-flight call between concurrent identical requests.
+
+    Args:
+        meter: Optional Temporal metric meter to report coalescing counters
+    """
+
+    def __init__(self, meter: Any = None):
+        self._inflight: dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+        self._counters = None
+        if meter is not None:
+            self._counters = {
+                "executions": meter.create_counter(
+                    "llm_singleflight_executions", "Calls that reached the provider"
+                ),
+                "coalesced": meter.create_counter(
+                    "llm_singleflight_coalesced", "Calls served by an identical in-flight call"
+                ),
+            }
+
+    def stats(self) -> dict[str, float]:
+        """Return execution and coalescing counts."""
+        total = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / total if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+    def _count(self, name: str) -> None:
+        if self._counters is not None:
+            self._counters[name].add(1)
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` unless an identical call is already in flight.
+
+        The shared call keeps running if the request that started it is
+        cancelled; it is only cancelled once every waiter has gone away.
+
+        Args:
+            key: Coalescing key, see ``request_key``
+            fn: Factory for the call
+
+        Returns:
+            The result of the shared call
+        """
+        call: Optional[_Call] = self._inflight.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._inflight[key] = call
+            call.task.add_done_callback(lambda _, call=call: self._forget(key, call))
+            self.executions += 1
+            self._count("executions")
+        else:
+            self.coalesced += 1
+            self._count("coalesced")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
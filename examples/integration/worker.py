@@ -6,48 +6,78 @@ This worker handles workflows that use OpenAI.
 
 import asyncio
 import os
-from dotenv import load_dotenv
 from temporalio.client import Client
-from temporalio.worker import Worker
 
+from fast_converter import fast_data_converter
+from llm_common.gateway import get_gateway, print_stats
+from lanes import create_lane_workers
+from loop_monitor import LoopLagMonitor
+from llm_common.metrics import configure_metrics, metric_meter
+from profiling import WorkerProfiler
 from workflows import AIContentWorkflow, generate_text_with_openai, process_response
 
-# Load environment variables
-load_dotenv()
-
 
 async def main():
     """Start the Temporal worker with OpenAI integration."""
+    # Load environment variables
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
     # Get Temporal configuration from environment
     temporal_host = os.getenv("TEMPORAL_HOST", "localhost:7233")
     temporal_namespace = os.getenv("TEMPORAL_NAMESPACE", "default")
 
-    # Verify OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("Warning: OPENAI_API_KEY not found in environment variables")
+    # Export custom and SDK metrics if TEMPORAL_METRICS_ADDRESS is set
+    configure_metrics()
+
+    # Verify OpenAI API keys are set; activities share this key pool
+    try:
+        gateway = get_gateway()
+    except ValueError as e:
+        print(f"Warning: {e}")
         print("Please copy .env.example to .env and add your API key")
         return
+    print(f"OpenAI key pool: {', '.join(gateway.stats())}")
 
     # Connect to Temporal
     client = await Client.connect(
         temporal_host,
         namespace=temporal_namespace,
+        data_converter=fast_data_converter(),
     )
 
-    # Create worker
-    worker = Worker(
+    # Report event-loop stalls caused by blocking calls in async code
+    loop_monitor = LoopLagMonitor.from_env(meter=metric_meter())
+    loop_monitor.start()
+
+    # On-demand CPU profiling (WORKER_PROFILE_* env vars or SIGUSR2)
+    profiler = WorkerProfiler.from_env()
+    profiler.install()
+
+    # One worker per priority lane (LANES selects which), each with its own
+    # task queue and slots; activities follow their workflow's lane
+    workers = create_lane_workers(
         client,
-        task_queue="ai-content-task-queue",
+        "ai-content-task-queue",
         workflows=[AIContentWorkflow],
         activities=[generate_text_with_openai, process_response],
+        interceptors=[profiler],
     )
 
-    print(f"Worker started on task queue: ai-content-task-queue")
+    for worker in workers:
+        print(f"Worker started on task queue: {worker.task_queue}")
     print(f"Temporal host: {temporal_host}")
     print("Waiting for workflows...")
 
-    # Run the worker
-    await worker.run()
+    # Run the workers
+    try:
+        await asyncio.gather(*(worker.run() for worker in workers))
+    finally:
+        profiler.stop()
+        await loop_monitor.stop()
+        print_stats(gateway)
+        await gateway.close()
 
 
 if __name__ == "__main__":
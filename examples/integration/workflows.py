@@ -7,27 +7,51 @@ This example demonstrates how to use OpenAI within Temporal workflows.
 from datetime import timedelta
 from temporalio import workflow, activity
 from temporalio.common import RetryPolicy
-from openai import OpenAI
-import os
+from typing import Optional
+
+from cheap_steps import StepMode, run_cheap_step
+
+with workflow.unsafe.imports_passed_through():
+    from llm_common.gateway import get_gateway
+    from llm_common.hedging import Hedger
+    from llm_common.metrics import metric_meter
+
+
+_hedger: Optional[Hedger] = None
+_hedger_loaded = False
+
+
+def get_hedger() -> Optional[Hedger]:
+    """Return the worker-wide hedger, or None unless LLM_HEDGING is enabled."""
+    global _hedger, _hedger_loaded
+    if not _hedger_loaded:
+        _hedger = Hedger.from_env("LLM", meter=metric_meter())
+        _hedger_loaded = True
+    return _hedger
 
 
 @activity.defn
 async def generate_text_with_openai(prompt: str) -> str:
     """Activity that uses OpenAI to generate text."""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-
-    client = OpenAI(api_key=api_key)
-
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
+    request = {
+        "model": "gpt-3.5-turbo",
+        "messages": [
             {"role": "system", "content": "You are a helpful assistant."},
             {"role": "user", "content": prompt},
         ],
-        max_tokens=150,
-    )
+        "max_tokens": 150,
+    }
+
+    # Calls are spread over the worker's pool of API keys
+    client = get_gateway()
+
+    hedger = get_hedger()
+    if hedger is None:
+        response = await client.chat.completions.create(**request)
+    else:
+        # The hedge usually lands on a different key than the first request
+        response = await hedger.run(lambda: client.chat.completions.create(**request))
+        activity.logger.debug("Hedging stats: %s", hedger.stats())
 
     return response.choices[0].message.content
 
@@ -47,8 +71,14 @@ class AIContentWorkflow:
     """Workflow that generates and processes AI content."""
 
     @workflow.run
-    async def run(self, prompt: str) -> dict:
-        """Run the AI content workflow."""
+    async def run(self, prompt: str, step_mode: str = StepMode.LOCAL) -> dict:
+        """Run the AI content workflow.
+
+        Args:
+            prompt: Prompt sent to OpenAI
+            step_mode: How process_response runs ("activity", "local" or
+                "inline"); see cheap_steps.StepMode
+        """
         # Generate text using OpenAI
         ai_response = await workflow.execute_activity(
             generate_text_with_openai,
@@ -59,11 +89,15 @@ class AIContentWorkflow:
             ),
         )
 
-        # Process the response
-        processed_data = await workflow.execute_activity(
+        # Process the response; executions started before cheap steps
+        # existed keep replaying it as a regular activity
+        if not workflow.patched("cheap-process-response"):
+            step_mode = StepMode.ACTIVITY
+        processed_data = await run_cheap_step(
             process_response,
             ai_response,
-            start_to_close_timeout=timedelta(seconds=10),
+            mode=step_mode,
+            timeout=timedelta(seconds=10),
         )
 
         return processed_data
@@ -0,0 +1,11 @@
+"""
+LLM call helpers shared by the integration and OpenRouter examples.
+
+- ``gateway``: spreads calls over a pool of API keys and endpoints
+- ``hedging``: hedged requests for latency-sensitive calls
+- ``similarity_cache``: answers near-duplicate prompts from a cache
+- ``metrics``: Temporal runtime metrics export
+
+Install it (``pip install -e libs/llm_common``, included in the root
+requirements.txt) so the examples can import it from their own folders.
+"""
@@ -0,0 +1,441 @@
+"""
+Provider gateway spreading LLM calls over a pool of API keys and endpoints.
+
+With a single API key, that key's rate limit caps every worker in the fleet.
+The gateway takes a pool of endpoints (base URL, key, weight and optional
+limits) and sends each chat completion to the endpoint with the fewest
+outstanding requests relative to its weight, so throughput grows with the
+number of keys held:
+
+- an endpoint at its ``max_concurrency`` or ``requests_per_minute`` limit
+  is skipped; if every endpoint is at its limit the call waits
+- a 429 takes the endpoint out of rotation for its ``Retry-After`` time (or
+  an exponentially growing cooldown), a 401/403 for ``auth_cooldown``
+  seconds, and the call moves on to another endpoint
+- other errors are raised unchanged, for the activity retry policy
+- one ``AsyncOpenAI`` client per endpoint is reused for every call
+- a streamed call holds its endpoint slot until the stream is consumed or
+  closed, so ``max_concurrency`` also bounds open streams
+
+``ProviderGateway`` exposes ``chat.completions.create``, so it can stand in
+for an ``AsyncOpenAI`` client; other APIs go to the first endpoint.
+``stats()`` reports per-endpoint utilization, and with a meter the gateway
+counts requests and ejections per endpoint. Keys never appear in names,
+logs or metrics.
+
+The pool is read from the environment; see ``ProviderGateway.from_env``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger("gateway")
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+_shared: dict[str, "ProviderGateway"] = {}
+
+
+@dataclass
+class Endpoint:
+    """One API key at one base URL."""
+    key: str
+    base_url: str = OPENAI_BASE_URL
+    weight: float = 1.0
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    name: str = ""
+
+    def __post_init__(self):
+        if self.weight <= 0:
+            raise ValueError("Endpoint weight must be positive")
+        if not self.name:
+            self.name = f"{urlparse(self.base_url).hostname}/...{self.key[-4:]}"
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """Return the HTTP status code carried by an OpenAI SDK error, if any."""
+    return getattr(error, "status_code", None)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Return the Retry-After seconds of a rate-limit error, if sent."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _default_client(endpoint: Endpoint) -> Any:
+    # openai is imported on first use: it is slow to import and not needed
+    # by workflow code or the workflow sandbox
+    from openai import AsyncOpenAI
+
+    # The gateway fails over on 429 itself and activities retry the rest,
+    # so SDK retries would only hold a saturated key longer
+    return AsyncOpenAI(api_key=endpoint.key, base_url=endpoint.base_url, max_retries=0)
+
+
+class _EndpointState:
+    """Load and health of one endpoint."""
+
+    def __init__(self, endpoint: Endpoint):
+        self.endpoint = endpoint
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.auth_failures = 0
+        self.consecutive_rate_limits = 0
+        self.ejected_until = 0.0
+        self.started: deque[float] = deque()
+        self.client: Any = None
+        self.client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+    def requests_last_minute(self, now: float) -> int:
+        while self.started and self.started[0] <= now - 60:
+            self.started.popleft()
+        return len(self.started)
+
+    def wait_for_capacity(self, now: float) -> float:
+        """Seconds until the endpoint may accept a call (0 if it can now)."""
+        limit = self.endpoint.requests_per_minute
+        if limit is not None and self.requests_last_minute(now) >= limit:
+            return self.started[0] + 60 - now
+        if self.endpoint.max_concurrency is not None and self.outstanding >= self.endpoint.max_concurrency:
+            # Freed by a finishing call, which wakes the waiters
+            return 1.0
+        return 0.0
+
+    def load(self) -> tuple[float, int]:
+        return (self.outstanding + 1) / self.endpoint.weight, self.requests
+
+
+class _HeldStream:
+    """Streamed completion that keeps its endpoint slot until the stream ends.
+
+    The slot is released when iteration stops (exhausted, failed or
+    cancelled), when the stream is closed, or when it is garbage collected
+    unconsumed.
+    """
+
+    def __init__(self, stream: Any, release: Callable[[], None]):
+        self._stream = stream
+        self._iterator: Any = None
+        self._release: Optional[Callable[[], None]] = release
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __aiter__(self) -> "_HeldStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._iterator is None:
+            self._iterator = self._stream.__aiter__()
+        try:
+            return await self._iterator.__anext__()
+        except BaseException:
+            self._done()
+            raise
+
+    async def close(self) -> None:
+        self._done()
+        close = getattr(self._stream, "close", None)
+        if close is not None:
+            await close()
+
+    async def __aenter__(self) -> "_HeldStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _done(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+    def __del__(self) -> None:
+        self._done()
+
+
+class _GatewayCompletions:
+    def __init__(self, gateway: "ProviderGateway"):
+        self._gateway = gateway
+
+    async def create(self, **kwargs: Any) -> Any:
+        return await self._gateway.create(**kwargs)
+
+
+class _GatewayChat:
+    def __init__(self, gateway: "ProviderGateway"):
+        self.completions = _GatewayCompletions(gateway)
+
+
+class ProviderGateway:
+    """
+    Weighted least-outstanding-requests balancer over API endpoints.
+
+    Args:
+        endpoints: Keys and base URLs to spread calls over
+        base_cooldown: Seconds out of rotation after a first 429 without
+            Retry-After; doubles with each further 429
+        max_cooldown: Upper bound for the rate-limit cooldown
+        auth_cooldown: Seconds out of rotation after a 401 or 403
+        client_factory: Builds the client for an endpoint (``AsyncOpenAI``
+            by default)
+        meter: Optional Temporal metric meter for per-endpoint counters
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        base_cooldown: float = 15.0,
+        max_cooldown: float = 300.0,
+        auth_cooldown: float = 300.0,
+        client_factory: Callable[[Endpoint], Any] = _default_client,
+        meter: Any = None,
+    ):
+        if not endpoints:
+            raise ValueError("ProviderGateway needs at least one endpoint")
+        names = [endpoint.name for endpoint in endpoints]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Endpoint names must be unique: {names}")
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.auth_cooldown = auth_cooldown
+        self.client_factory = client_factory
+        self.chat = _GatewayChat(self)
+
+        self._states = [_EndpointState(endpoint) for endpoint in endpoints]
+        self._released: Optional[asyncio.Event] = None
+        self._released_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._counters = None
+        if meter is not None:
+            self._counters = {
+                "requests": meter.create_counter("llm_gateway_requests", "Calls sent per gateway endpoint"),
+                "ejections": meter.create_counter(
+                    "llm_gateway_ejections", "Times an endpoint was taken out of rotation"
+                ),
+            }
+
+    @classmethod
+    def from_env(cls, prefix: str = "OPENAI", base_url: str = OPENAI_BASE_URL, meter: Any = None) -> "ProviderGateway":
+        """
+        Build a gateway from the first of these that is set:
+
+        - ``{prefix}_GATEWAY_POOL``: a JSON list of endpoints, or ``@`` and
+          the path of a JSON file holding one. Each entry has ``key`` (or
+          ``key_env``, the name of a variable holding the key) and optionally
+          ``base_url``, ``weight``, ``max_concurrency``,
+          ``requests_per_minute`` and ``name``
+        - ``{prefix}_API_KEYS``: comma-separated keys of equal weight
+        - ``{prefix}_API_KEY``: a single key
+
+        Raises:
+            ValueError: If no key is configured
+        """
+        pool = os.getenv(f"{prefix}_GATEWAY_POOL", "").strip()
+        if pool:
+            if pool.startswith("@"):
+                pool = Path(pool[1:]).read_text()
+            endpoints = []
+            for entry in json.loads(pool):
+                entry = dict(entry)
+                if "key_env" in entry:
+                    entry["key"] = os.getenv(entry.pop("key_env"), "")
+                if not entry.get("key"):
+                    raise ValueError(f"{prefix}_GATEWAY_POOL entry without a key: {entry.get('name', '?')}")
+                endpoints.append(Endpoint(**{"base_url": base_url, **entry}))
+            return cls(endpoints, meter=meter)
+
+        keys = [key.strip() for key in os.getenv(f"{prefix}_API_KEYS", "").split(",") if key.strip()]
+        if not keys and os.getenv(f"{prefix}_API_KEY"):
+            keys = [os.environ[f"{prefix}_API_KEY"]]
+        if not keys:
+            raise ValueError(f"{prefix}_API_KEY not found in environment variables")
+        return cls([Endpoint(key, base_url) for key in keys], meter=meter)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        # APIs other than chat completions are not balanced
+        return getattr(self._client(self._states[0]), name)
+
+    def _client(self, state: _EndpointState) -> Any:
+        # Async clients are bound to the loop that first uses them
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if state.client is None or state.client_loop is not loop:
+            state.client = self.client_factory(state.endpoint)
+            state.client_loop = loop
+        return state.client
+
+    def _pick(self, now: float, tried: list[_EndpointState]) -> tuple[Optional[_EndpointState], float]:
+        """Return the endpoint to call, or None and how long to wait."""
+        candidates = [state for state in self._states if state not in tried]
+        # With every endpoint ejected, the one back soonest is the last resort
+        healthy = [state for state in candidates if not state.ejected(now)] or [
+            min(candidates, key=lambda state: state.ejected_until)
+        ]
+        ready = [state for state in healthy if state.wait_for_capacity(now) == 0]
+        if ready:
+            return min(ready, key=_EndpointState.load), 0.0
+        return None, min(state.wait_for_capacity(now) for state in healthy)
+
+    async def _acquire(self, tried: list[_EndpointState]) -> _EndpointState:
+        while True:
+            now = time.monotonic()
+            state, wait = self._pick(now, tried)
+            if state is not None:
+                state.outstanding += 1
+                state.requests += 1
+                state.started.append(now)
+                self._count("requests", state)
+                return state
+            released = self._released_event()
+            released.clear()
+            try:
+                await asyncio.wait_for(released.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _released_event(self) -> asyncio.Event:
+        loop = asyncio.get_running_loop()
+        if self._released is None or self._released_loop is not loop:
+            self._released, self._released_loop = asyncio.Event(), loop
+        return self._released
+
+    def _release(self, state: _EndpointState) -> None:
+        state.outstanding -= 1
+        if self._released is not None:
+            self._released.set()
+
+    def _eject(self, state: _EndpointState, error: BaseException) -> None:
+        status = _status_code(error)
+        if status == 429:
+            state.rate_limited += 1
+            state.consecutive_rate_limits += 1
+            cooldown = _retry_after(error)
+            if cooldown is None:
+                cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (state.consecutive_rate_limits - 1))
+            reason = "rate_limited"
+        else:
+            state.auth_failures += 1
+            cooldown = self.auth_cooldown
+            reason = "unauthorized"
+        state.ejected_until = time.monotonic() + cooldown
+        self._count("ejections", state, reason=reason)
+        logger.warning("Endpoint %s out of rotation for %.0fs (HTTP %s)", state.endpoint.name, cooldown, status)
+
+    async def create(self, **kwargs: Any) -> Any:
+        """
+        Create a chat completion on the least loaded endpoint.
+
+        Rate-limited and unauthorized endpoints are taken out of rotation
+        and the call is retried on another endpoint, once per endpoint.
+
+        Args:
+            **kwargs: Arguments for ``chat.completions.create``
+
+        Returns:
+            The chat completion; with ``stream=True``, a stream that holds
+            the endpoint slot until it is consumed or closed
+        """
+        tried: list[_EndpointState] = []
+        while True:
+            state = await self._acquire(tried)
+            tried.append(state)
+            try:
+                response = await self._client(state).chat.completions.create(**kwargs)
+            except BaseException as e:
+                self._release(state)
+                if not isinstance(e, Exception):
+                    raise
+                state.errors += 1
+                if _status_code(e) not in (401, 403, 429):
+                    raise
+                self._eject(state, e)
+                if len(tried) == len(self._states):
+                    raise
+                continue
+            state.consecutive_rate_limits = 0
+            if kwargs.get("stream"):
+                return _HeldStream(response, partial(self._release, state))
+            self._release(state)
+            return response
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-endpoint load, errors and utilization of its limits."""
+        now = time.monotonic()
+        total = sum(state.requests for state in self._states)
+        stats = {}
+        for state in self._states:
+            endpoint = state.endpoint
+            last_minute = state.requests_last_minute(now)
+            stats[endpoint.name] = {
+                "weight": endpoint.weight,
+                "requests": state.requests,
+                "share": state.requests / total if total else 0.0,
+                "outstanding": state.outstanding,
+                "requests_last_minute": last_minute,
+                "rpm_utilization": (
+                    last_minute / endpoint.requests_per_minute if endpoint.requests_per_minute else None
+                ),
+                "concurrency_utilization": (
+                    state.outstanding / endpoint.max_concurrency if endpoint.max_concurrency else None
+                ),
+                "errors": state.errors,
+                "rate_limited": state.rate_limited,
+                "auth_failures": state.auth_failures,
+                "ejected": state.ejected(now),
+            }
+        return stats
+
+    async def close(self) -> None:
+        """Close the endpoint clients."""
+        for state in self._states:
+            if state.client is not None:
+                await state.client.close()
+                state.client = None
+
+    def _count(self, name: str, state: _EndpointState, **attributes: str) -> None:
+        if self._counters is not None:
+            self._counters[name].add(1, {"endpoint": state.endpoint.name, **attributes})
+
+
+def get_gateway(prefix: str = "OPENAI") -> ProviderGateway:
+    """Return the worker-wide gateway for ``prefix``, built from the environment on first use."""
+    if prefix not in _shared:
+        from .metrics import metric_meter
+
+        _shared[prefix] = ProviderGateway.from_env(prefix, meter=metric_meter())
+    return _shared[prefix]
+
+
+def print_stats(gateway: ProviderGateway) -> None:
+    """Print per-endpoint utilization of a gateway."""
+    print(f"{'endpoint':<32} {'weight':>6} {'requests':>9} {'share':>6} {'rpm':>5} {'429s':>5} {'401s':>5}")
+    for name, stats in gateway.stats().items():
+        print(
+            f"{name:<32} {stats['weight']:6.1f} {stats['requests']:9d} {stats['share']:6.1%} "
+            f"{stats['requests_last_minute']:5d} {stats['rate_limited']:5d} {stats['auth_failures']:5d}"
+        )
@@ -0,0 +1,198 @@
+"""
+Hedged requests for latency-sensitive LLM calls.
+
+A hedged call starts the request, waits until a configurable percentile of
+recently observed latency, and then sends a duplicate (to the same or an
+alternate provider). Whichever response arrives first wins and the other
+task is cancelled, which aborts its HTTP request when the call is made with
+an async OpenAI client.
+
+Hedging is opt-in; see ``Hedger.from_env``.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies in seconds."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+def response_tokens(response: Any) -> int:
+    """Return the total tokens billed for a chat completion, 0 if unknown."""
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", 0) or 0
+
+
+class Hedger:
+    """
+    Send a backup request when the first one is slower than usual.
+
+    Args:
+        percentile: Latency percentile after which the hedge is sent
+        initial_delay: Hedge delay in seconds until enough samples exist
+        min_delay: Lower bound for the hedge delay
+        min_samples: Samples needed before the percentile is trusted
+        window: Number of recent latencies kept
+        cost_of: Returns the cost (e.g. tokens) of a response; used to
+            estimate the extra spend caused by hedging
+        meter: Optional Temporal metric meter to report hedging counters
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        cost_of: Callable[[Any], float] = response_tokens,
+        meter: Any = None,
+    ):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.cost_of = cost_of
+        self.latencies = LatencyTracker(window)
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.extra_cost = 0.0
+
+        self._counters = None
+        if meter is not None:
+            self._counters = {
+                "requests": meter.create_counter("llm_hedge_requests", "Calls made through the hedger"),
+                "hedged": meter.create_counter("llm_hedge_sent", "Backup requests sent"),
+                "wins": meter.create_counter("llm_hedge_wins", "Calls won by the backup request"),
+                "extra_cost": meter.create_counter(
+                    "llm_hedge_extra_tokens", "Estimated tokens spent on hedges", "tokens"
+                ),
+            }
+
+    @classmethod
+    def from_env(cls, prefix: str = "LLM", meter: Any = None) -> Optional["Hedger"]:
+        """
+        Build a hedger from ``{prefix}_HEDGING`` and ``{prefix}_HEDGE_PERCENTILE``.
+
+        Returns None unless ``{prefix}_HEDGING`` is set to a true value.
+        """
+        if os.getenv(f"{prefix}_HEDGING", "").lower() not in ("1", "true", "yes"):
+            return None
+        percentile = float(os.getenv(f"{prefix}_HEDGE_PERCENTILE", "95"))
+        return cls(percentile=percentile, meter=meter)
+
+    def delay(self) -> float:
+        """Return how long to wait before sending the hedge."""
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+        observed = self.latencies.percentile(self.percentile)
+        return max(self.min_delay, observed or self.initial_delay)
+
+    def stats(self) -> dict[str, float]:
+        """Return hedge rate, win rate and estimated extra cost."""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "extra_cost": self.extra_cost,
+            "hedge_delay": self.delay(),
+        }
+
+    def _count(self, name: str, value: float = 1) -> None:
+        if self._counters is not None and value:
+            self._counters[name].add(int(value))
+
+    async def _timed(self, request: Callable[[], Awaitable[T]]) -> tuple[T, float]:
+        started = time.monotonic()
+        result = await request()
+        return result, time.monotonic() - started
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        hedge: Optional[Callable[[], Awaitable[T]]] = None,
+    ) -> T:
+        """
+        Run ``request``, hedging with ``hedge`` (or a repeat of ``request``).
+
+        If the first request fails before the hedge is sent, its error is
+        raised. Once both are in flight, the first success wins; an error is
+        only raised if both fail.
+
+        Args:
+            request: Factory for the primary call
+            hedge: Factory for the backup call; defaults to ``request``
+
+        Returns:
+            The result of whichever call finished first
+        """
+        self.requests += 1
+        self._count("requests")
+
+        primary = asyncio.ensure_future(self._timed(request))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay())
+            if done:
+                result, latency = primary.result()
+                self.latencies.record(latency)
+                return result
+
+            self.hedged += 1
+            self._count("hedged")
+            backup = asyncio.ensure_future(self._timed(hedge or request))
+            tasks.append(backup)
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result, latency = task.result()
+                    self.latencies.record(latency)
+                    if task is backup:
+                        self.hedge_wins += 1
+                        self._count("wins")
+                    # The loser would have cost about as much as the winner
+                    extra = self.cost_of(result)
+                    self.extra_cost += extra
+                    self._count("extra_cost", extra)
+                    return result
+
+            assert error is not None
+            raise error
+        finally:
+            # Cancelling the loser aborts its in-flight HTTP request
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
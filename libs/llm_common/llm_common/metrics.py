@@ -0,0 +1,32 @@
+"""
+Metrics export for the example workers and clients.
+
+Custom metrics (hedging, coalescing, ...) are recorded through the Temporal
+runtime's metric meter, so they are exported together with the SDK's own
+worker metrics. Set TEMPORAL_METRICS_ADDRESS (e.g. ``0.0.0.0:9464``) to
+expose them on a Prometheus endpoint.
+"""
+
+import os
+from temporalio.common import MetricMeter
+from temporalio.runtime import PrometheusConfig, Runtime, TelemetryConfig
+
+
+def configure_metrics() -> None:
+    """Install a Prometheus-enabled default runtime if configured.
+
+    Must be called before the first Temporal client is created.
+    """
+    bind_address = os.getenv("TEMPORAL_METRICS_ADDRESS")
+    if not bind_address:
+        return
+
+    Runtime.set_default(
+        Runtime(telemetry=TelemetryConfig(metrics=PrometheusConfig(bind_address=bind_address)))
+    )
+    print(f"Metrics exported on: http://{bind_address}/metrics")
+
+
+def metric_meter() -> MetricMeter:
+    """Return the metric meter of the process-wide Temporal runtime."""
+    return Runtime.default().metric_meter
@@ -0,0 +1,338 @@
+"""
+Near-duplicate prompt cache based on SimHash.
+
+Exact-match caching misses prompts that differ only in casing, punctuation,
+whitespace, word order or filler words. This cache normalizes each prompt,
+turns it into word unigram and bigram features, and indexes a 64-bit
+SimHash of those features. A lookup returns the cached response of the most
+similar earlier prompt when the similarity (1 - Hamming distance / 64) is
+at least ``threshold`` and the two prompts ask about the same things.
+
+Candidates are found with banded LSH: the hash is split into 8 bands of 8
+bits, and prompts sharing any band are compared exactly. By the pigeonhole
+principle, any prompt within 7 bits (similarity >= 0.89) shares at least
+one band and is always found; most prompts somewhat further away are found
+too.
+
+SimHash alone cannot tell which words matter: "What is the capital of
+France?" and "... of Germany?" score 0.92. A candidate therefore also has
+to share its content words (the words left after dropping common English
+stopwords) with the prompt: their Jaccard overlap must be at least
+``content_threshold``. With the default of 0.9, a prompt with fewer than 19
+content words never matches one that swaps a single content word for
+another.
+
+Entries only match within a namespace, which callers derive from everything
+except the prompt (model, system prompt, max_tokens, ...). Every hit is
+logged on the ``similarity_cache`` logger for audit. The cache can persist
+to a JSON file; under an event loop, saves are batched (at most one per
+``save_interval``) and written in a worker thread. Call ``flush()`` on
+shutdown.
+
+Enable with ``{prefix}_SIMILARITY_CACHE=1``; see ``SimilarityCache.from_env``.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("similarity_cache")
+
+HASH_BITS = 64
+BANDS = 8
+BAND_BITS = HASH_BITS // BANDS
+
+# Unicode word characters, so prompts in any script keep their words
+_WORD_RE = re.compile(r"\w+")
+
+# Words that do not change what a prompt asks about
+STOPWORDS = frozenset("""
+a about an and any are as at be but by can could do does for from how i in
+is it its me my of on or please so some tell that the their there these this
+those to was what when where which who why will with would you your
+""".split())
+
+
+def normalize(prompt: str) -> str:
+    """Lowercase a prompt and reduce it to space-separated words."""
+    return " ".join(_WORD_RE.findall(prompt.lower()))
+
+
+def features(prompt: str) -> list[str]:
+    """Word unigrams and bigrams of the normalized prompt."""
+    words = normalize(prompt).split()
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def simhash(prompt: str) -> int:
+    """64-bit SimHash of the prompt's features."""
+    weights = [0] * HASH_BITS
+    for feature in features(prompt):
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(HASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def content_words(prompt: str) -> frozenset[str]:
+    """Words of the normalized prompt that are not stopwords."""
+    return frozenset(word for word in normalize(prompt).split() if word not in STOPWORDS)
+
+
+def overlap(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard overlap of two word sets (1.0 if both are empty)."""
+    union = a | b
+    return len(a & b) / len(union) if union else 1.0
+
+
+def similarity(a: int, b: int) -> float:
+    """Fraction of equal bits between two hashes."""
+    return 1 - bin(a ^ b).count("1") / HASH_BITS
+
+
+def namespace_key(**params: Any) -> str:
+    """Namespace for the request parameters that must match exactly."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class SimilarityCache:
+    """
+    In-memory SimHash cache with optional JSON persistence.
+
+    Args:
+        threshold: Minimum SimHash similarity for a hit (0-1)
+        content_threshold: Minimum overlap of content words for a hit (0-1)
+        max_entries: Oldest entries are evicted beyond this size
+        ttl: Seconds an entry stays valid (None for no expiry)
+        path: JSON file to load from and save to (None for memory only)
+        meter: Optional Temporal metric meter for hit/miss counters
+        save_interval: Minimum seconds between saves to ``path`` while an
+            event loop runs; saves then happen in a worker thread
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        content_threshold: float = 0.9,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+        path: Optional[Path] = None,
+        meter: Any = None,
+        save_interval: float = 30.0,
+    ):
+        self.threshold = threshold
+        self.content_threshold = content_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        self._content: dict[int, frozenset[str]] = {}
+        self._bands: dict[tuple[str, int, int], set[int]] = {}
+        self._next_id = 0
+
+        # Every put bumps the version; a write never replaces a newer one
+        self._version = 0
+        self._saved_version = 0
+        self._written_version = 0
+        self._write_lock = threading.Lock()
+        self._last_save = 0.0
+        self._save_timer: Optional[asyncio.TimerHandle] = None
+        self._saving: Optional[asyncio.Future] = None
+
+        self._counters = None
+        if meter is not None:
+            self._counters = {
+                "hits": meter.create_counter("llm_similarity_cache_hits", "Calls served from the similarity cache"),
+                "misses": meter.create_counter("llm_similarity_cache_misses", "Similarity cache lookups without a match"),
+            }
+
+        if path is not None and path.exists():
+            self._load()
+
+    @classmethod
+    def from_env(cls, prefix: str = "LLM", meter: Any = None) -> Optional["SimilarityCache"]:
+        """
+        Build a cache from ``{prefix}_SIMILARITY_CACHE``,
+        ``{prefix}_SIMILARITY_THRESHOLD`` (default 0.85),
+        ``{prefix}_SIMILARITY_CONTENT_THRESHOLD`` (default 0.9),
+        ``{prefix}_SIMILARITY_CACHE_TTL`` (seconds) and
+        ``{prefix}_SIMILARITY_CACHE_PATH``.
+
+        Returns None unless ``{prefix}_SIMILARITY_CACHE`` is set to a true value.
+        """
+        if os.getenv(f"{prefix}_SIMILARITY_CACHE", "").lower() not in ("1", "true", "yes"):
+            return None
+        ttl = os.getenv(f"{prefix}_SIMILARITY_CACHE_TTL")
+        path = os.getenv(f"{prefix}_SIMILARITY_CACHE_PATH")
+        return cls(
+            threshold=float(os.getenv(f"{prefix}_SIMILARITY_THRESHOLD", "0.85")),
+            content_threshold=float(os.getenv(f"{prefix}_SIMILARITY_CONTENT_THRESHOLD", "0.9")),
+            ttl=float(ttl) if ttl else None,
+            path=Path(path) if path else None,
+            meter=meter,
+        )
+
+    def get(self, prompt: str, namespace: str = "") -> Optional[Any]:
+        """Return the response cached for the most similar prompt, if any."""
+        if not normalize(prompt):
+            # Without words every prompt would share one fingerprint
+            return None
+        fingerprint = simhash(prompt)
+        words = content_words(prompt)
+        best_id, best_similarity = None, 0.0
+        for entry_id in self._candidates(namespace, fingerprint):
+            entry = self._entries[entry_id]
+            if self.ttl is not None and time.time() - entry["created"] > self.ttl:
+                continue
+            score = similarity(fingerprint, entry["fingerprint"])
+            if score < self.threshold or score <= best_similarity:
+                continue
+            # Similar wording about a different subject is not a hit
+            if overlap(words, self._content[entry_id]) < self.content_threshold:
+                continue
+            best_id, best_similarity = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            self._count("misses")
+            return None
+
+        entry = self._entries[best_id]
+        self.hits += 1
+        self._count("hits")
+        logger.info(
+            "Similarity cache hit (%.3f >= %.2f, age %.0fs): %r served with the response to %r",
+            best_similarity,
+            self.threshold,
+            time.time() - entry["created"],
+            prompt,
+            entry["prompt"],
+        )
+        return entry["response"]
+
+    def put(self, prompt: str, response: Any, namespace: str = "") -> None:
+        """Cache a JSON-serializable response for ``prompt``."""
+        if not normalize(prompt):
+            return
+        self._add({
+            "prompt": prompt,
+            "namespace": namespace,
+            "fingerprint": simhash(prompt),
+            "response": response,
+            "created": time.time(),
+        })
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        self._version += 1
+        if self.path is not None:
+            self._schedule_save()
+
+    def stats(self) -> dict[str, float]:
+        """Return entry count, hits, misses and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self) -> None:
+        """Write all entries to ``path`` atomically."""
+        assert self.path is not None
+        self._saved_version, self._last_save = self._version, time.monotonic()
+        self._write(list(self._entries.values()), self._version)
+
+    def flush(self) -> None:
+        """Save entries added since the last save, if any (e.g. on shutdown)."""
+        if self.path is not None and self._saved_version != self._version:
+            self.save()
+
+    def _schedule_save(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Synchronous callers save right away
+            self.save()
+            return
+        if self._save_timer is None:
+            delay = max(0.0, self._last_save + self.save_interval - time.monotonic())
+            self._save_timer = loop.call_later(delay, self._save_in_background, loop)
+
+    def _save_in_background(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._save_timer = None
+        if self._saved_version == self._version:
+            return
+        if self._saving is not None and not self._saving.done():
+            # One write at a time; retry once this one had time to finish
+            self._save_timer = loop.call_later(self.save_interval, self._save_in_background, loop)
+            return
+        self._saved_version, self._last_save = self._version, time.monotonic()
+        # Serializing thousands of entries would stall the event loop.
+        # Entries are never modified after they are added, so a shallow
+        # snapshot is safe to serialize in another thread.
+        self._saving = loop.run_in_executor(None, self._write, list(self._entries.values()), self._version)
+
+    def _write(self, entries: list[dict[str, Any]], version: int) -> None:
+        assert self.path is not None
+        with self._write_lock:
+            if version < self._written_version:
+                return
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(entries))
+            os.replace(tmp, self.path)
+            self._written_version = version
+
+    def _load(self) -> None:
+        assert self.path is not None
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable similarity cache %s: %s", self.path, e)
+            return
+        for entry in entries[-self.max_entries:]:
+            self._add(entry)
+
+    def _band_keys(self, namespace: str, fingerprint: int) -> list[tuple[str, int, int]]:
+        mask = (1 << BAND_BITS) - 1
+        return [(namespace, band, fingerprint >> (band * BAND_BITS) & mask) for band in range(BANDS)]
+
+    def _candidates(self, namespace: str, fingerprint: int) -> set[int]:
+        found: set[int] = set()
+        for key in self._band_keys(namespace, fingerprint):
+            found |= self._bands.get(key, set())
+        return found
+
+    def _add(self, entry: dict[str, Any]) -> None:
+        entry_id, self._next_id = self._next_id, self._next_id + 1
+        self._entries[entry_id] = entry
+        self._content[entry_id] = content_words(entry["prompt"])
+        for key in self._band_keys(entry["namespace"], entry["fingerprint"]):
+            self._bands.setdefault(key, set()).add(entry_id)
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        del self._content[entry_id]
+        for key in self._band_keys(entry["namespace"], entry["fingerprint"]):
+            bucket = self._bands.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._bands[key]
+
+    def _count(self, name: str) -> None:
+        if self._counters is not None:
+            self._counters[name].add(1)
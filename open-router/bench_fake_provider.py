@@ -0,0 +1,94 @@
+"""
+Benchmark the OpenRouter workflows against the fake model provider.
+
+Runs SimpleAgentWorkflow, CodeAssistantWorkflow and DataAnalysisWorkflow in
+the time-skipping test environment with ``FakeModelProvider`` behind the
+agents plugin, so no API key or network is involved. Reports workflows per
+second and latency percentiles per workflow.
+
+Usage:
+    python bench_fake_provider.py --runs 1000 --concurrency 100
+    python bench_fake_provider.py --latency 0.2 --jitter 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import Worker
+
+from fake_provider import FakeModelProvider, fake_plugin
+from workflows import CodeAssistantWorkflow, DataAnalysisWorkflow, SimpleAgentWorkflow
+
+TASK_QUEUE = "bench-fake-provider"
+
+WORKFLOWS = [SimpleAgentWorkflow, CodeAssistantWorkflow, DataAnalysisWorkflow]
+
+
+async def bench_workflow(client, workflow_cls, runs: int, concurrency: int) -> dict:
+    """Execute ``runs`` workflows with at most ``concurrency`` in flight."""
+    limit = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def run_one(i: int) -> None:
+        async with limit:
+            started = time.perf_counter()
+            await client.execute_workflow(
+                workflow_cls.run,
+                f"Question {i}: what is Temporal?",
+                id=f"bench-{workflow_cls.__name__}-{uuid.uuid4().hex[:8]}",
+                task_queue=TASK_QUEUE,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_one(i) for i in range(runs)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "workflow": workflow_cls.__name__,
+        "per_second": runs / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark workflows against the fake provider.")
+    parser.add_argument("--runs", type=int, default=500, help="Workflows per workflow type")
+    parser.add_argument("--concurrency", type=int, default=100, help="Workflows in flight")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated model latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency (s)")
+    args = parser.parse_args()
+
+    fake = FakeModelProvider(
+        replies=[(r"(?i)what is (?P<topic>\w+)", "{topic} is a durable execution platform.")],
+        latency=args.latency,
+        jitter=args.jitter,
+    )
+    async with await WorkflowEnvironment.start_time_skipping(plugins=[fake_plugin(fake)]) as env:
+        async with Worker(
+            env.client,
+            task_queue=TASK_QUEUE,
+            workflows=WORKFLOWS,
+            max_concurrent_workflow_tasks=args.concurrency,
+        ):
+            results = [
+                await bench_workflow(env.client, workflow_cls, args.runs, args.concurrency)
+                for workflow_cls in WORKFLOWS
+            ]
+
+    print(f"{'workflow':<24} {'per sec':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for result in results:
+        print(
+            f"{result['workflow']:<24} {result['per_second']:9.1f} "
+            f"{result['p50_ms']:9.2f} {result['p95_ms']:9.2f}"
+        )
+    print(f"\nModel calls served by the fake provider: {fake.calls}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
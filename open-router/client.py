@@ -1,62 +1,183 @@
 """
 OpenRouter client configuration for Temporal.
 This module handles the connection to OpenRouter API and Temporal server.
+
+The Temporal client and the OpenRouter key pool (a ``ProviderGateway``
+balancing calls over one ``AsyncOpenAI`` client per key) are created
+once per process (and event loop) and shared by every caller. Every
+agent model call goes through that gateway, which reuses its client per
+key instead of creating one per call. Call ``close_openrouter_client()``
+or use ``openrouter_client()`` as an async context manager to release
+them.
+
+Gateway, hedging and similarity cache counters are recorded on the
+Temporal runtime's meter; set TEMPORAL_METRICS_ADDRESS to export them.
 """
+import asyncio
 import os
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Optional
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
-from temporalio.client import Client
-from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+from temporalio.client import Client, WithStartWorkflowOperation, WorkflowUpdateFailedError
+from temporalio.common import WorkflowIDConflictPolicy
+from temporalio.exceptions import ApplicationError
+
+from llm_common.gateway import ProviderGateway
+from llm_common.hedging import Hedger
+from llm_common.metrics import configure_metrics, metric_meter
+from llm_common.similarity_cache import SimilarityCache
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Attempts and base delay (seconds) of ask_persona while a session drains
+PERSONA_ATTEMPTS = 10
+PERSONA_RETRY_DELAY = 0.1
+
 # Load environment variables from .env file in this directory
 load_dotenv()
 
 
-async def get_openrouter_client() -> Client:
-    """
-    Create and return a Temporal client configured with OpenRouter.
+_client: Optional[Client] = None
+_openrouter_client: Optional["AsyncOpenAI"] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_client_lock: Optional[asyncio.Lock] = None
+_metrics_configured = False
+
+
+async def _connect() -> tuple[Client, Optional["AsyncOpenAI"]]:
+    """Create the OpenRouter client and connect to Temporal with it."""
+    # The agents SDK and its plugin take seconds to import, so they are only
+    # loaded once a client is actually needed
+    from agents import OpenAIProvider
+    from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+
+    from router import ModelRouter, RoutedModelProvider
+
+    global _metrics_configured
+    if not _metrics_configured:
+        # The runtime has to be installed before the first Temporal client
+        configure_metrics()
+        _metrics_configured = True
+    meter = metric_meter()
+
+    use_fake = os.getenv("OPENROUTER_FAKE_PROVIDER", "").lower() in ("1", "true", "yes")
+
+    # Agents call their model through a provider in the model activities:
+    # the OpenRouter key pool (OPENROUTER_GATEWAY_POOL, OPENROUTER_API_KEYS
+    # or OPENROUTER_API_KEY), or the scripted in-process provider for
+    # offline tests and benchmarks (OPENROUTER_FAKE_PROVIDER=1)
+    openrouter_client = None
+    if use_fake:
+        from fake_provider import FakeModelProvider
+
+        provider = FakeModelProvider(latency=float(os.getenv("OPENROUTER_FAKE_LATENCY", "0")))
+    else:
+        try:
+            openrouter_client = ProviderGateway.from_env("OPENROUTER", base_url=OPENROUTER_BASE_URL, meter=meter)
+        except ValueError:
+            raise ValueError(
+                "OPENROUTER_API_KEY not found in .env file.\n\n"
+                "Setup instructions:\n"
+                "1. Get free API key: https://openrouter.ai/keys\n"
+                "2. Create .env file in open-router/ folder\n"
+                "3. Add: OPENROUTER_API_KEY=sk-or-v1-your-key-here"
+            ) from None
+        # OpenRouter serves the Chat Completions API, not the Responses API
+        provider = OpenAIProvider(openai_client=openrouter_client, use_responses=False)
+    
+    # Route pool models by observed latency and fail over on errors,
+    # optionally hedging slow calls (OPENROUTER_HEDGING=1) and answering
+    # near-duplicate prompts from a cache (OPENROUTER_SIMILARITY_CACHE=1)
+    model_provider = RoutedModelProvider(
+        provider,
+        ModelRouter.from_env(),
+        hedger=Hedger.from_env("OPENROUTER", meter=meter),
+        cache=SimilarityCache.from_env("OPENROUTER", meter=meter),
+    )
     
-    This function:
-    1. Loads OPENROUTER_API_KEY from .env file
-    2. Creates OpenRouter client with OpenAI-compatible interface
-    3. Connects to Temporal server with OpenRouter plugin
+    # Get Temporal address (default to localhost)
+    temporal_address = os.getenv("TEMPORAL_ADDRESS", "localhost:7233")
     
+    # Connect to Temporal with OpenRouter plugin
+    try:
+        client = await Client.connect(
+            temporal_address,
+            plugins=[OpenAIAgentsPlugin(model_provider=model_provider)]
+        )
+    except BaseException:
+        if openrouter_client is not None:
+            await openrouter_client.close()
+        raise
+
+    return client, openrouter_client
+
+
+async def get_openrouter_client() -> Client:
+    """
+    Return the shared Temporal client configured with OpenRouter.
+
+    On first use this function:
+    1. Loads OPENROUTER_API_KEY (or a key pool) from .env file
+    2. Creates a gateway balancing calls over the OpenRouter keys
+    3. Routes agent model calls over OPENROUTER_MODEL_POOL by latency
+    4. Connects to Temporal server with OpenRouter plugin
+
+    Later calls on the same event loop return the same client, so the
+    Temporal connection and HTTP connection pool are reused. Concurrent
+    first calls share a single connection attempt.
+
     Returns:
         Client: Configured Temporal client ready to use
-        
+
     Raises:
         ValueError: If OPENROUTER_API_KEY is not set
         Exception: If connection to Temporal fails
     """
-    # Get API key from environment
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    
-    if not api_key:
-        raise ValueError(
-            "OPENROUTER_API_KEY not found in .env file.\n\n"
-            "Setup instructions:\n"
-            "1. Get free API key: https://openrouter.ai/keys\n"
-            "2. Create .env file in open-router/ folder\n"
-            "3. Add: OPENROUTER_API_KEY=sk-or-v1-your-key-here"
-        )
-    
-    # Initialize OpenRouter client
-    openrouter_client = AsyncOpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=api_key,
-    )
-    
-    # Get Temporal address (default to localhost)
-    temporal_address = os.getenv("TEMPORAL_ADDRESS", "localhost:7233")
-    
-    # Connect to Temporal with OpenRouter plugin
-    client = await Client.connect(
-        temporal_address,
-        plugins=[OpenAIAgentsPlugin(client=openrouter_client)]
-    )
-    
-    return client
+    global _client, _openrouter_client, _client_loop, _client_lock
+
+    loop = asyncio.get_running_loop()
+    if _client_loop is not loop:
+        # Clients are bound to the loop that created them
+        _client, _openrouter_client = None, None
+        _client_loop, _client_lock = loop, asyncio.Lock()
+
+    if _client is None:
+        assert _client_lock is not None
+        async with _client_lock:
+            if _client is None:
+                _client, _openrouter_client = await _connect()
+
+    return _client
+
+
+async def close_openrouter_client() -> None:
+    """Close the shared OpenRouter HTTP client and forget the Temporal client."""
+    global _client, _openrouter_client
+
+    openrouter_client = _openrouter_client
+    _client, _openrouter_client = None, None
+    if openrouter_client is not None:
+        await openrouter_client.close()
+
+
+@asynccontextmanager
+async def openrouter_client() -> AsyncIterator[Client]:
+    """
+    Provide the shared Temporal client and close it on exit.
+
+    Example:
+        async with openrouter_client() as client:
+            await client.execute_workflow(...)
+    """
+    client = await get_openrouter_client()
+    try:
+        yield client
+    finally:
+        await close_openrouter_client()
 
 
 async def get_openrouter_client_with_custom_model(model: str) -> Client:
@@ -71,4 +192,57 @@ async def get_openrouter_client_with_custom_model(model: str) -> Client:
     """
     # For now, model is set at workflow level
     # This function exists for future enhancements
-    return await get_openrouter_client()
\ No newline at end of file
+    return await get_openrouter_client()
+
+
+async def ask_persona(
+    persona: str,
+    query: str,
+    session: str = "default",
+    task_queue: str = "openrouter-queue",
+    client: Optional[Client] = None,
+) -> str:
+    """
+    Ask a long-lived persona agent a question and wait for the answer.
+
+    Uses update-with-start: the persona session workflow is started if it is
+    not running, and the query is delivered as an Update either way, so
+    repeated questions reuse one warm workflow instead of starting one each.
+    A session that is continuing as new or completing rejects the Update;
+    it is retried until the next run (or a new session) accepts it.
+
+    Args:
+        persona: Name of a persona in ``workflows.PERSONAS``
+        query: User question or prompt
+        session: Session name; each session keeps its own context
+        task_queue: Task queue the persona workflows are served on
+        client: Temporal client to use (default: the shared OpenRouter client)
+
+    Returns:
+        str: AI response
+    """
+    # Imported lazily, like the agents plugin, to keep this module cheap to import
+    from workflows import SESSION_DRAINING, PersonaAgentWorkflow, PersonaSessionInput
+
+    client = client or await get_openrouter_client()
+    attempt = 0
+    while True:
+        attempt += 1
+        start_operation = WithStartWorkflowOperation(
+            PersonaAgentWorkflow.run,
+            PersonaSessionInput(persona),
+            id=f"persona-{persona}-{session}",
+            task_queue=task_queue,
+            id_conflict_policy=WorkflowIDConflictPolicy.USE_EXISTING,
+        )
+        try:
+            return await client.execute_update_with_start_workflow(
+                PersonaAgentWorkflow.ask,
+                query,
+                start_workflow_operation=start_operation,
+            )
+        except WorkflowUpdateFailedError as e:
+            draining = isinstance(e.cause, ApplicationError) and e.cause.type == SESSION_DRAINING
+            if not draining or attempt >= PERSONA_ATTEMPTS:
+                raise
+        await asyncio.sleep(PERSONA_RETRY_DELAY * attempt)
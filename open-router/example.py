@@ -1,15 +1,19 @@
-
 """
 Complete example demonstrating OpenRouter integration.
 This script shows how to use free DeepSeek R1 model with Temporal.
 
+All examples share one Temporal client. Their workflows are started
+together and results are printed as soon as each one completes.
+
 Usage:
     1. Create .env file with OPENROUTER_API_KEY
     2. Start Temporal: temporal server start-dev
     3. Run: python example.py
 """
 import asyncio
-from client import get_openrouter_client
+from temporalio.client import Client, WorkflowHandle
+
+from client import openrouter_client
 from workflows import (
     SimpleAgentWorkflow,
     CodeAssistantWorkflow,
@@ -17,89 +21,72 @@ from workflows import (
 )
 
 
-async def run_simple_example():
-    """Run a basic question-answer example."""
-    print("\n" + "="*60)
-    print("Example 1: Simple Question")
-    print("="*60)
-    
-    client = await get_openrouter_client()
-    
-    handle = await client.start_workflow(
+# (title, workflow run method, prompt, workflow ID)
+EXAMPLES = [
+    (
+        "Example 1: Simple Question",
         SimpleAgentWorkflow.run,
         "What is Temporal and why is it useful?",
-        id="simple-example",
-        task_queue="openrouter-queue",
-    )
-    
-    print("⏳ Waiting for response...")
-    result = await handle.result()
-    
-    print("\n🤖 Response:")
-    print(result)
-
-
-async def run_code_assistant_example():
-    """Run a coding question example."""
-    print("\n" + "="*60)
-    print("Example 2: Code Assistant")
-    print("="*60)
-    
-    client = await get_openrouter_client()
-    
-    handle = await client.start_workflow(
+        "simple-example",
+    ),
+    (
+        "Example 2: Code Assistant",
         CodeAssistantWorkflow.run,
         "How do I create an async function in Python that retries on failure?",
-        id="code-assistant-example",
-        task_queue="openrouter-queue",
-    )
-    
-    print("⏳ Waiting for response...")
-    result = await handle.result()
-    
-    print("\n🤖 Response:")
-    print(result)
-
-
-async def run_data_analysis_example():
-    """Run a data analysis example."""
-    print("\n" + "="*60)
-    print("Example 3: Data Analysis")
-    print("="*60)
-    
-    client = await get_openrouter_client()
-    
-    handle = await client.start_workflow(
+        "code-assistant-example",
+    ),
+    (
+        "Example 3: Data Analysis",
         DataAnalysisWorkflow.run,
         "Analyze the trend: Sales increased 20% in Q1, dropped 5% in Q2, and increased 35% in Q3.",
-        id="data-analysis-example",
-        task_queue="openrouter-queue",
+        "data-analysis-example",
+    ),
+]
+
+
+async def run_example(title: str, handle: WorkflowHandle) -> tuple[str, str]:
+    """Wait for a started example workflow and return its title and result."""
+    return title, await handle.result()
+
+
+async def run_examples(client: Client) -> None:
+    """Start every example workflow, then print results as they complete."""
+    handles = await asyncio.gather(
+        *(
+            client.start_workflow(run, prompt, id=workflow_id, task_queue="openrouter-queue")
+            for _, run, prompt, workflow_id in EXAMPLES
+        )
     )
-    
-    print("⏳ Waiting for response...")
-    result = await handle.result()
-    
-    print("\n🤖 Response:")
-    print(result)
+
+    print(f"⏳ Started {len(handles)} workflows, waiting for responses...")
+    pending = [
+        run_example(title, handle)
+        for (title, _, _, _), handle in zip(EXAMPLES, handles)
+    ]
+    for next_result in asyncio.as_completed(pending):
+        title, result = await next_result
+        print("\n" + "="*60)
+        print(title)
+        print("="*60)
+        print("\n🤖 Response:")
+        print(result)
 
 
 async def main():
     """Run all examples."""
     print("🌐 OpenRouter + Temporal Integration Examples")
     print("Using free DeepSeek R1 model")
-    
+
     try:
         print("\n🔌 Connecting to Temporal with OpenRouter...")
-        
-        # Run examples
-        await run_simple_example()
-        await run_code_assistant_example()
-        await run_data_analysis_example()
-        
+
+        async with openrouter_client() as client:
+            await run_examples(client)
+
         print("\n" + "="*60)
         print("✅ All examples completed successfully!")
         print("="*60)
-        
+
     except ValueError as e:
         print(f"\n❌ Configuration Error: {e}")
         return 1
@@ -110,10 +97,10 @@ async def main():
         print("2. Check .env file has OPENROUTER_API_KEY")
         print("3. Verify API key is active on openrouter.ai")
         return 1
-    
+
     return 0
 
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
-    exit(exit_code)
\ No newline at end of file
+    exit(exit_code)
@@ -0,0 +1,200 @@
+"""
+In-process fake model provider for tests and benchmarks.
+
+``FakeModelProvider`` is an agents ``ModelProvider`` whose models answer
+from a script instead of the network:
+
+- replies are ``(pattern, template)`` pairs; the first pattern (a regular
+  expression) found in the last user message selects the template
+- templates are ``str.format`` strings with ``{prompt}``, ``{model}``,
+  ``{system}`` and the pattern's named groups
+- latency (plus seeded jitter) and token usage are configurable, so runs
+  are reproducible
+- streamed calls yield the whole reply as one ``response.completed`` event
+- ``calls`` counts model calls; pass ``record_requests=True`` to also keep
+  every request in ``requests`` (unbounded, so only for short tests)
+
+With ``OPENROUTER_FAKE_PROVIDER=1`` the client in ``client.py`` uses it
+instead of OpenRouter, so no API key or network is needed. In tests, pass
+it to the plugin directly:
+
+    fake = FakeModelProvider(replies=[(r"Temporal", "Temporal is a workflow engine.")])
+    client = await Client.connect(..., plugins=[fake_plugin(fake)])
+
+Simulated latency is real time inside activities; keep ``latency=0`` for
+throughput benchmarks under the time-skipping test environment.
+"""
+import asyncio
+import random
+import re
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings, ModelTracing, Usage
+from openai.types.responses import Response, ResponseCompletedEvent, ResponseUsage
+from temporalio.contrib.openai_agents.testing import ResponseBuilders
+
+
+DEFAULT_MODEL = "fake/model"
+DEFAULT_TEMPLATE = "[{model}] {prompt}"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _text(content: Any) -> str:
+    """Return the text of a message's content (a string or a list of parts)."""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [] if isinstance(part, dict))
+
+
+def last_user_message(input: Any) -> str:
+    """Return the last user message of an agents input (a string or input items)."""
+    if isinstance(input, str):
+        return input
+    for item in reversed(input or []):
+        if isinstance(item, dict) and item.get("role") == "user":
+            return _text(item.get("content"))
+    return ""
+
+
+class FakeModel(Model):
+    """Model answering from its provider's script."""
+
+    def __init__(self, provider: "FakeModelProvider", name: str):
+        self._provider = provider
+        self.name = name
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: ModelSettings,
+        tools: list,
+        output_schema: Any,
+        handoffs: list,
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """Answer the last user message from the script."""
+        return await self._provider._complete(self.name, system_instructions, input)
+
+    async def stream_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: ModelSettings,
+        tools: list,
+        output_schema: Any,
+        handoffs: list,
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[ResponseCompletedEvent]:
+        """Stream the scripted reply as a single completed event."""
+        response = await self._provider._complete(self.name, system_instructions, input)
+        usage = response.usage
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=0,
+            response=Response(
+                id="fake-response",
+                created_at=0,
+                model=self.name,
+                object="response",
+                status="completed",
+                output=response.output,
+                parallel_tool_calls=False,
+                tool_choice="auto",
+                tools=[],
+                usage=ResponseUsage(
+                    input_tokens=usage.input_tokens,
+                    input_tokens_details=usage.input_tokens_details,
+                    output_tokens=usage.output_tokens,
+                    output_tokens_details=usage.output_tokens_details,
+                    total_tokens=usage.total_tokens,
+                ),
+            ),
+        )
+
+
+class FakeModelProvider(ModelProvider):
+    """
+    Scripted stand-in for the OpenRouter model provider.
+
+    Args:
+        replies: ``(pattern, template)`` pairs tried in order
+        default: Template used when no pattern matches
+        latency: Seconds each call takes
+        jitter: Extra random latency, up to this many seconds
+        completion_tokens: Fixed completion token count (estimated if None)
+        seed: Seed for the latency jitter
+        record_requests: Keep every request in ``requests``
+    """
+
+    def __init__(
+        self,
+        replies: Sequence[tuple[str, str]] = (),
+        default: str = DEFAULT_TEMPLATE,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        completion_tokens: Optional[int] = None,
+        seed: int = 0,
+        record_requests: bool = False,
+    ):
+        self.replies = [(re.compile(pattern), template) for pattern, template in replies]
+        self.default = default
+        self.latency = latency
+        self.jitter = jitter
+        self.completion_tokens = completion_tokens
+        self.record_requests = record_requests
+        self.calls = 0
+        self.requests: list[dict[str, Any]] = []
+
+        self._random = random.Random(seed)
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        """Return a scripted model answering as ``model_name``."""
+        return FakeModel(self, model_name or DEFAULT_MODEL)
+
+    def render(self, prompt: str, model: str, system: str = "") -> str:
+        """Return the scripted reply for a prompt."""
+        for pattern, template in self.replies:
+            match = pattern.search(prompt)
+            if match:
+                return template.format(prompt=prompt, model=model, system=system, **match.groupdict())
+        return self.default.format(prompt=prompt, model=model, system=system)
+
+    async def _complete(self, model: str, system_instructions: Optional[str], input: Any) -> ModelResponse:
+        self.calls += 1
+        if self.record_requests:
+            self.requests.append({"model": model, "system": system_instructions, "input": input})
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        prompt = last_user_message(input)
+        system = system_instructions or ""
+        content = self.render(prompt, model, system)
+        if isinstance(input, str):
+            history = input
+        else:
+            history = "".join(_text(item.get("content")) for item in input if isinstance(item, dict))
+        input_tokens = estimate_tokens(system) + estimate_tokens(history)
+        output_tokens = self.completion_tokens if self.completion_tokens is not None else estimate_tokens(content)
+        response = ResponseBuilders.output_message(content)
+        response.usage = Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+        return response
+
+
+def fake_plugin(provider: Optional[ModelProvider] = None) -> Any:
+    """Return an ``OpenAIAgentsPlugin`` backed by a fake provider."""
+    from temporalio.contrib.openai_agents import OpenAIAgentsPlugin
+
+    return OpenAIAgentsPlugin(model_provider=provider or FakeModelProvider())
@@ -0,0 +1,361 @@
+"""
+Latency-aware model routing for OpenRouter.
+
+The router keeps rolling per-model statistics (latency, errors, rate limits)
+inside the worker process and picks the best model from a configured pool
+for every chat completion. Failed calls fail over to the next candidate.
+
+It plugs into ``OpenAIAgentsPlugin`` as its ``model_provider``: the agents'
+model activities ask ``RoutedModelProvider`` for a model, so workflows keep
+asking for ``DEFAULT_MODEL`` and the worker decides which pool member
+actually serves the request.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from agents import Model, ModelProvider, ModelResponse, ModelSettings, ModelTracing, Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+
+# Models tried when OPENROUTER_MODEL_POOL is not set
+DEFAULT_MODEL_POOL = [
+    "deepseek/deepseek-r1:free",
+    "deepseek/deepseek-r1",
+]
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """Return the HTTP status code carried by an OpenAI SDK error, if any."""
+    return getattr(error, "status_code", None)
+
+
+class ModelStats:
+    """Rolling statistics for a single model."""
+
+    def __init__(self, window: int = 50):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "calls": len(self.outcomes),
+            "p50_latency": self.latency_percentile(50),
+            "p90_latency": self.latency_percentile(90),
+            "error_rate": round(self.error_rate, 3),
+            "rate_limited": self.rate_limited,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class ModelRouter:
+    """
+    Pick the best model from a pool based on observed behaviour.
+
+    Models are ranked by their p90 latency inflated by their recent error
+    rate. Models that have not been tried yet are ranked first so every
+    pool member gets measured. A 429 or repeated failures put a model into
+    an exponentially growing cooldown during which it is only used as a
+    last resort.
+
+    Args:
+        models: Model IDs in order of preference
+        window: Number of recent calls kept per model
+        base_cooldown: Cooldown in seconds after the first rate limit
+        max_cooldown: Upper bound for the cooldown
+        error_penalty: How strongly the error rate inflates the score
+    """
+
+    def __init__(
+        self,
+        models: Iterable[str],
+        window: int = 50,
+        base_cooldown: float = 15.0,
+        max_cooldown: float = 300.0,
+        error_penalty: float = 4.0,
+    ):
+        self.models = list(dict.fromkeys(models))
+        if not self.models:
+            raise ValueError("ModelRouter needs at least one model")
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.error_penalty = error_penalty
+        self._stats = {model: ModelStats(window) for model in self.models}
+
+    @classmethod
+    def from_env(cls) -> "ModelRouter":
+        """
+        Build a router from OPENROUTER_MODEL_POOL (comma-separated model IDs).
+
+        Falls back to DEFAULT_MODEL_POOL when the variable is not set.
+        """
+        pool = os.getenv("OPENROUTER_MODEL_POOL", "")
+        models = [model.strip() for model in pool.split(",") if model.strip()]
+        return cls(models or DEFAULT_MODEL_POOL)
+
+    def __contains__(self, model: str) -> bool:
+        return model in self._stats
+
+    def _score(self, model: str) -> float:
+        stats = self._stats[model]
+        p90 = stats.latency_percentile(90)
+        if p90 is None:
+            return 0.0
+        return p90 * (1 + self.error_penalty * stats.error_rate)
+
+    def candidates(self) -> list[str]:
+        """Return the pool ordered from best to worst candidate."""
+        now = time.monotonic()
+        preference = {model: index for index, model in enumerate(self.models)}
+        return sorted(
+            self.models,
+            key=lambda model: (
+                self._stats[model].cooldown_until > now,
+                self._score(model),
+                preference[model],
+            ),
+        )
+
+    def record_success(self, model: str, latency: float) -> None:
+        stats = self._stats[model]
+        stats.latencies.append(latency)
+        stats.outcomes.append(True)
+        stats.consecutive_failures = 0
+
+    def record_failure(self, model: str, error: BaseException) -> None:
+        stats = self._stats[model]
+        stats.outcomes.append(False)
+        stats.consecutive_failures += 1
+
+        rate_limited = _status_code(error) == 429
+        if rate_limited:
+            stats.rate_limited += 1
+        if rate_limited or stats.consecutive_failures >= 3:
+            cooldown = min(
+                self.max_cooldown,
+                self.base_cooldown * 2 ** (stats.consecutive_failures - 1),
+            )
+            stats.cooldown_until = time.monotonic() + cooldown
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return a snapshot of the per-model statistics."""
+        return {model: self._stats[model].snapshot() for model in self.models}
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Decide whether a failed call should fail over to another model."""
+    status = _status_code(error)
+    if status is None:
+        # Timeouts and connection errors carry no status code
+        return True
+    return status == 429 or status >= 500 or status in (404, 408)
+
+
+def _cacheable_prompt(input: Any, tools: list, handoffs: list, output_schema: Any) -> Optional[str]:
+    """Return the final user message of a plain text request, if there is one."""
+    if tools or handoffs or output_schema is not None:
+        return None
+    if isinstance(input, str):
+        return input
+    if not input or not isinstance(input[-1], dict) or input[-1].get("role") != "user":
+        return None
+    content = input[-1].get("content")
+    return content if isinstance(content, str) else None
+
+
+def _output_text(response: ModelResponse) -> Optional[str]:
+    """Return the text of a response made only of text messages, else None."""
+    if not response.output:
+        return None
+    texts = []
+    for item in response.output:
+        if not isinstance(item, ResponseOutputMessage):
+            return None
+        for part in item.content:
+            if not isinstance(part, ResponseOutputText):
+                return None
+            texts.append(part.text)
+    return "".join(texts)
+
+
+def _text_response(text: str) -> ModelResponse:
+    """Build a model response carrying ``text``; it cost no tokens."""
+    message = ResponseOutputMessage(
+        id="cached",
+        content=[ResponseOutputText(text=text, annotations=[], type="output_text")],
+        role="assistant",
+        status="completed",
+        type="message",
+    )
+    return ModelResponse(output=[message], usage=Usage(), response_id=None)
+
+
+class RoutedModel(Model):
+    """
+    Model that serves each call with the best member of a router's pool.
+
+    Args:
+        provider: Model provider serving the pool members
+        router: Router holding the model pool and its statistics
+        requested: Model name the agent asked for
+        hedger: Optional ``hedging.Hedger``; slow calls to the best model
+            are then hedged with the second-best one
+        cache: Optional ``similarity_cache.SimilarityCache``; near-duplicate
+            final user messages are then answered from the cache
+    """
+
+    def __init__(
+        self,
+        provider: ModelProvider,
+        router: ModelRouter,
+        requested: Optional[str] = None,
+        hedger: Any = None,
+        cache: Any = None,
+    ):
+        self._provider = provider
+        self._router = router
+        self._requested = requested
+        self._hedger = hedger
+        self._cache = cache
+
+    async def _attempt(self, model: str, kwargs: dict[str, Any], tried: list[str]) -> ModelResponse:
+        tried.append(model)
+        started = time.monotonic()
+        try:
+            response = await self._provider.get_model(model).get_response(**kwargs)
+        except Exception as e:
+            self._router.record_failure(model, e)
+            raise
+        self._router.record_success(model, time.monotonic() - started)
+        return response
+
+    async def get_response(
+        self,
+        system_instructions: Optional[str],
+        input: Any,
+        model_settings: ModelSettings,
+        tools: list,
+        output_schema: Any,
+        handoffs: list,
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """Get a response from the best pool member, failing over on errors."""
+        kwargs.update(
+            system_instructions=system_instructions,
+            input=input,
+            model_settings=model_settings,
+            tools=tools,
+            output_schema=output_schema,
+            handoffs=handoffs,
+            tracing=tracing,
+        )
+        prompt = _cacheable_prompt(input, tools, handoffs, output_schema) if self._cache is not None else None
+        if prompt is None:
+            return await self._route(kwargs)
+
+        # Everything but the final prompt (model, system prompt, earlier
+        # turns, sampling parameters) has to match exactly
+        context = {
+            "model": self._requested,
+            "system": system_instructions,
+            "input": [] if isinstance(input, str) else input[:-1],
+            "settings": model_settings.to_json_dict(),
+        }
+        namespace = hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        cached = self._cache.get(prompt, namespace)
+        if cached is not None:
+            return _text_response(cached)
+
+        response = await self._route(kwargs)
+        text = _output_text(response)
+        if text is not None:
+            self._cache.put(prompt, text, namespace)
+        return response
+
+    async def _route(self, kwargs: dict[str, Any]) -> ModelResponse:
+        candidates = self._router.candidates()
+        tried: list[str] = []
+        last_error: Optional[BaseException] = None
+
+        if self._hedger is not None and len(candidates) > 1:
+            # Hedge a slow call to the best model with the runner-up
+            try:
+                return await self._hedger.run(
+                    lambda: self._attempt(candidates[0], kwargs, tried),
+                    lambda: self._attempt(candidates[1], kwargs, tried),
+                )
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                last_error = e
+
+        for model in candidates:
+            if model in tried:
+                continue
+            try:
+                return await self._attempt(model, kwargs, tried)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                last_error = e
+
+        assert last_error is not None
+        raise last_error
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream from the best pool member (a started stream cannot fail over)."""
+        return self._provider.get_model(self._router.candidates()[0]).stream_response(*args, **kwargs)
+
+
+class RoutedModelProvider(ModelProvider):
+    """
+    Agents model provider that routes pool models through a ModelRouter.
+
+    Requests for a model in the router's pool are served by the best pool
+    member and fail over on rate limits, timeouts and server errors. Other
+    models come straight from the wrapped provider.
+
+    Args:
+        provider: Model provider serving the pool members, e.g.
+            ``OpenAIProvider(openai_client=..., use_responses=False)``
+        router: Router holding the model pool and its statistics
+        hedger: Optional ``hedging.Hedger`` for slow calls
+        cache: Optional ``similarity_cache.SimilarityCache`` for
+            near-duplicate prompts
+    """
+
+    def __init__(self, provider: ModelProvider, router: ModelRouter, hedger: Any = None, cache: Any = None):
+        self.provider = provider
+        self.router = router
+        self.hedger = hedger
+        self.cache = cache
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        """Return a routed model for pool members, else the provider's model."""
+        if model_name not in self.router:
+            return self.provider.get_model(model_name)
+        return RoutedModel(self.provider, self.router, model_name, self.hedger, self.cache)
+
+    async def aclose(self) -> None:
+        """Close the wrapped provider."""
+        await self.provider.aclose()
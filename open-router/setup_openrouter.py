@@ -4,11 +4,19 @@ Checks if OpenRouter API key is configured and validates the setup.
 Includes venv management and automated key retrieval.
 """
 
+import asyncio
+import json
 import os
 import sys
 import subprocess
 from pathlib import Path
 
+# The probe engine lives at the repository root and only needs the stdlib,
+# so it can also run under the venv's interpreter
+ENV_PROBE = Path(__file__).resolve().parent.parent / "env_probe.py"
+sys.path.append(str(ENV_PROBE.parent))
+import env_probe
+
 
 def setup_venv():
     """Create and activate virtual environment."""
@@ -40,22 +48,21 @@ def get_venv_python():
 
 
 def install_dependencies():
-    """Install required dependencies in venv."""
+    """Install required dependencies in venv with a single pip run."""
     python_path = get_venv_python()
     required = ["openai", "python-dotenv", "temporalio", "requests"]
     
     print("Installing dependencies...")
-    for package in required:
-        try:
-            subprocess.run(
-                [str(python_path), "-m", "pip", "install", "-q", package],
-                check=True,
-                capture_output=True
-            )
-            print(f"✓ {package} installed")
-        except subprocess.CalledProcessError:
-            print(f"✗ Failed to install {package}")
-            return False
+    try:
+        subprocess.run(
+            [str(python_path), "-m", "pip", "install", "-q", *required],
+            check=True,
+            capture_output=True
+        )
+        print(f"✓ {', '.join(required)} installed")
+    except subprocess.CalledProcessError:
+        print(f"✗ Failed to install {', '.join(required)}")
+        return False
     
     # Try to install agents with compatible tensorflow version
     print("Installing agents with TensorFlow 1.x compatibility...")
@@ -98,31 +105,15 @@ def fetch_api_key_interactive():
 
 
 def validate_api_key(api_key):
-    """Validate API key by making a test request."""
-    python_path = get_venv_python()
-    
-    test_script = '''
-import sys
-try:
-    from openai import OpenAI
-    api_key = sys.argv[1]
-    client = OpenAI(api_key=api_key, base_url="https://openrouter.ai/api/v1")
-    response = client.models.list()
-    print("valid")
-except Exception as e:
-    print(f"invalid")
-'''
-    
-    try:
-        result = subprocess.run(
-            [str(python_path), "-c", test_script, api_key],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        return "valid" in result.stdout
-    except Exception:
-        return False
+    """Validate API key with an authenticated request to the models endpoint."""
+    result = asyncio.run(env_probe.run_probes(
+        [env_probe.Probe(
+            "openrouter:auth",
+            lambda: env_probe.check_api_key("openrouter:auth", env_probe.PROVIDERS["openrouter"][0], api_key),
+        )],
+        timeout=10,
+    ))[0]
+    return result.ok
 
 
 def check_openrouter_env():
@@ -162,34 +153,32 @@ def check_openrouter_env():
 
 
 def check_dependencies():
-    """Check if OpenRouter dependencies are installed."""
+    """Check if OpenRouter dependencies are installed.
+
+    All packages are probed by one interpreter run in the venv.
+    """
     python_path = get_venv_python()
-    required = ["openai", "dotenv", "temporalio"]
-    optional = ["agents"]
+    result = subprocess.run(
+        [
+            str(python_path), str(ENV_PROBE), "--json", "--no-cache",
+            "--packages", "openai,dotenv=python-dotenv,temporalio",
+            "--optional", "agents=openai-agents",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    results = [env_probe.ProbeResult(**item) for item in json.loads(result.stdout)]
     missing = []
     
-    for package in required:
-        try:
-            subprocess.run(
-                [str(python_path), "-c", f"import {package.replace('-', '_')}"],
-                capture_output=True,
-                check=True
-            )
-            print(f"✓ {package} installed")
-        except subprocess.CalledProcessError:
+    for probe in results:
+        package = probe.name.split(":", 1)[1]
+        if probe.ok:
+            print(f"✓ {package} {probe.detail}")
+        elif probe.required:
             print(f"✗ {package} not installed")
             missing.append(package)
-    
-    # Check optional dependencies
-    for package in optional:
-        try:
-            subprocess.run(
-                [str(python_path), "-c", f"import {package.replace('-', '_')}"],
-                capture_output=True,
-                check=True
-            )
-            print(f"✓ {package} installed")
-        except subprocess.CalledProcessError:
+        else:
             print(f"⚠ {package} not installed (required for agent features)")
     
     return missing
@@ -0,0 +1,55 @@
+"""
+Temporal worker for the OpenRouter workflows.
+
+Serves the one-shot workflows, the long-lived persona sessions and the
+parametrized custom agent on ``openrouter-queue``. Agent model calls run
+as activities registered by the agents plugin of the shared client, so
+they go through the OpenRouter key pool (or the fake provider with
+OPENROUTER_FAKE_PROVIDER=1).
+
+Usage:
+    python worker.py
+"""
+import asyncio
+from temporalio.worker import Worker
+
+from client import close_openrouter_client, get_openrouter_client
+from workflows import (
+    CodeAssistantWorkflow,
+    CustomAgentWorkflow,
+    DataAnalysisWorkflow,
+    PersonaAgentWorkflow,
+    SimpleAgentWorkflow,
+)
+
+TASK_QUEUE = "openrouter-queue"
+
+WORKFLOWS = [
+    SimpleAgentWorkflow,
+    CodeAssistantWorkflow,
+    DataAnalysisWorkflow,
+    PersonaAgentWorkflow,
+    CustomAgentWorkflow,
+]
+
+
+async def main():
+    """Start the OpenRouter worker."""
+    try:
+        client = await get_openrouter_client()
+    except ValueError as e:
+        print(f"❌ Configuration Error: {e}")
+        return
+
+    worker = Worker(client, task_queue=TASK_QUEUE, workflows=WORKFLOWS)
+    print(f"Worker started on task queue: {TASK_QUEUE}")
+    print("Waiting for workflows...")
+
+    try:
+        await worker.run()
+    finally:
+        await close_openrouter_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,15 +1,95 @@
 """
 Example workflows using OpenRouter models.
 These workflows demonstrate different use cases with OpenRouter.
+
+``PersonaAgentWorkflow`` is a long-lived alternative to the one-shot
+workflows: one execution per persona (and session) answers queries sent as
+Updates, keeping its agent and recent conversation warm between requests.
 """
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Optional
 from temporalio import workflow
-from temporalio.contrib.openai_agents import OpenAIAgent
+from temporalio.exceptions import ApplicationError
+
+with workflow.unsafe.imports_passed_through():
+    from agents import Agent, Runner
 
 
 # Default free model
 DEFAULT_MODEL = "deepseek/deepseek-r1:free"
 
 
+@dataclass(frozen=True)
+class Persona:
+    """Agent configuration served by a persona workflow."""
+    model: str
+    system: str
+
+    def agent(self, name: str = "Assistant") -> Agent:
+        """Build an agent with this persona's model and instructions."""
+        return Agent(name=name, instructions=self.system, model=self.model)
+
+
+async def run_agent(agent: Agent, query: str) -> str:
+    """Run an agent on a query and return its final answer.
+
+    Model calls run as activities of the workflow through the agents plugin.
+    """
+    result = await Runner.run(agent, query)
+    return result.final_output
+
+
+PERSONAS = {
+    "assistant": Persona(
+        model=DEFAULT_MODEL,
+        system="You are a helpful AI assistant powered by DeepSeek R1.",
+    ),
+    "code": Persona(
+        model=DEFAULT_MODEL,
+        system=(
+            "You are an expert programming assistant. "
+            "Provide clear code examples with explanations. "
+            "Focus on best practices and clean code."
+        ),
+    ),
+    "data": Persona(
+        model=DEFAULT_MODEL,
+        system=(
+            "You are a data analysis expert. "
+            "Provide insights, patterns, and recommendations. "
+            "Use clear explanations and suggest visualizations when relevant."
+        ),
+    ),
+}
+
+
+def resolve_persona(
+    name: Optional[str] = None,
+    model: Optional[str] = None,
+    system_prompt: Optional[str] = None,
+) -> Persona:
+    """
+    Look up a persona and apply overrides.
+
+    Args:
+        name: Persona in ``PERSONAS`` (default "assistant")
+        model: OpenRouter model ID overriding the persona's
+        system_prompt: System prompt overriding the persona's
+
+    Raises:
+        ApplicationError: If the persona is unknown (not retryable)
+    """
+    base = PERSONAS.get(name or "assistant")
+    if base is None:
+        raise ApplicationError(
+            f"Unknown persona {name!r}; known personas: {', '.join(sorted(PERSONAS))}",
+            non_retryable=True,
+        )
+    return Persona(model=model or base.model, system=system_prompt or base.system)
+
+
 @workflow.defn
 class SimpleAgentWorkflow:
     """Basic workflow using OpenRouter's free DeepSeek model."""
@@ -25,13 +105,10 @@ class SimpleAgentWorkflow:
         Returns:
             AI response
         """
-        agent = OpenAIAgent(
-            model=DEFAULT_MODEL,
-            system="You are a helpful AI assistant powered by DeepSeek R1.",
-        )
+        persona = PERSONAS["assistant"]
+        agent = persona.agent()
         
-        result = await agent.run(query)
-        return result
+        return await run_agent(agent, query)
 
 
 @workflow.defn
@@ -49,17 +126,10 @@ class CodeAssistantWorkflow:
         Returns:
             Code example and explanation
         """
-        agent = OpenAIAgent(
-            model=DEFAULT_MODEL,
-            system=(
-                "You are an expert programming assistant. "
-                "Provide clear code examples with explanations. "
-                "Focus on best practices and clean code."
-            ),
-        )
+        persona = PERSONAS["code"]
+        agent = persona.agent()
         
-        result = await agent.run(code_question)
-        return result
+        return await run_agent(agent, code_question)
 
 
 @workflow.defn
@@ -77,38 +147,172 @@ class DataAnalysisWorkflow:
         Returns:
             Analysis results and insights
         """
-        agent = OpenAIAgent(
-            model=DEFAULT_MODEL,
-            system=(
-                "You are a data analysis expert. "
-                "Provide insights, patterns, and recommendations. "
-                "Use clear explanations and suggest visualizations when relevant."
-            ),
-        )
+        persona = PERSONAS["data"]
+        agent = persona.agent()
         
-        result = await agent.run(analysis_request)
-        return result
+        return await run_agent(agent, analysis_request)
+
+
+# Turns of recent conversation included with each persona query
+MAX_CONTEXT_TURNS = 6
+# Queries answered per run before continuing as new, bounding history size
+MAX_QUERIES_PER_RUN = 500
+# A persona session with no queries for this long completes; the next
+# update-with-start call transparently starts a fresh one
+IDLE_TIMEOUT = timedelta(hours=1)
+# Error type of updates rejected because the session is completing or
+# continuing as new
+SESSION_DRAINING = "SessionDraining"
+
+
+@dataclass
+class ContextTurn:
+    query: str
+    answer: str
 
 
-def create_custom_workflow(model: str, system_prompt: str):
+@dataclass
+class PersonaSessionInput:
+    """Input of a persona session, carried across continue-as-new."""
+    persona: str
+    context: list[ContextTurn] = field(default_factory=list)
+    answered: int = 0
+
+
+@workflow.defn
+class PersonaAgentWorkflow:
     """
-    Factory function to create custom workflows.
-    
-    Args:
-        model: OpenRouter model ID
-        system_prompt: Custom system prompt
-        
-    Returns:
-        Workflow class configured with custom settings
+    Long-lived agent for one persona, answering queries sent as Updates.
+
+    Starting a workflow per query pays for a workflow start and a new
+    history every time. A persona session is started once (use
+    ``client.ask_persona``, which relies on update-with-start) and then
+    serves ``ask`` updates synchronously with a warm agent and the last
+    ``MAX_CONTEXT_TURNS`` turns of context. It continues as new after
+    ``MAX_QUERIES_PER_RUN`` queries or when the server suggests it, and
+    completes after ``IDLE_TIMEOUT`` without queries. Once either is due,
+    new queries are rejected with ``SESSION_DRAINING`` until the run ends.
     """
-    @workflow.defn
-    class CustomWorkflow:
-        @workflow.run
-        async def run(self, query: str) -> str:
-            agent = OpenAIAgent(
-                model=model,
-                system=system_prompt,
-            )
-            return await agent.run(query)
-    
-    return CustomWorkflow
\ No newline at end of file
+
+    @workflow.init
+    def __init__(self, session: PersonaSessionInput) -> None:
+        persona = resolve_persona(session.persona)
+        self._agent = persona.agent()
+        self._context = list(session.context)
+        self._answered = session.answered
+        self._answered_this_run = 0
+        self._queries_received = 0
+        self._draining = False
+
+    @workflow.run
+    async def run(self, session: PersonaSessionInput) -> int:
+        """
+        Serve queries until continue-as-new is due or the session is idle.
+
+        Args:
+            session: Persona name and context carried from the previous run
+
+        Returns:
+            Total number of queries answered by the session
+        """
+        while not self._should_continue_as_new():
+            seen = self._queries_received
+            try:
+                await workflow.wait_condition(
+                    lambda: self._queries_received != seen or self._should_continue_as_new(),
+                    timeout=IDLE_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                break
+
+        # Let in-flight queries finish before completing or continuing; new
+        # ones are rejected and retried by the client against the next run
+        self._draining = True
+        await workflow.wait_condition(workflow.all_handlers_finished)
+        if not self._should_continue_as_new():
+            return self._answered
+
+        workflow.continue_as_new(
+            PersonaSessionInput(session.persona, self._context, self._answered)
+        )
+
+    @workflow.update
+    async def ask(self, query: str) -> str:
+        """
+        Answer a query with the persona's agent and recent context.
+
+        Args:
+            query: User question or prompt
+
+        Returns:
+            AI response
+        """
+        self._queries_received += 1
+        answer = await run_agent(self._agent, self._with_context(query))
+
+        self._context = (self._context + [ContextTurn(query, answer)])[-MAX_CONTEXT_TURNS:]
+        self._answered += 1
+        self._answered_this_run += 1
+        return answer
+
+    @ask.validator
+    def validate_ask(self, query: str) -> None:
+        if not query.strip():
+            raise ValueError("Query must not be empty")
+        if self._draining or self._should_continue_as_new():
+            raise ApplicationError("Persona session is draining", type=SESSION_DRAINING)
+
+    @workflow.query
+    def answered(self) -> int:
+        """Number of queries answered by the session so far."""
+        return self._answered
+
+    def _with_context(self, query: str) -> str:
+        if not self._context:
+            return query
+        turns = "\n".join(f"User: {turn.query}\nAssistant: {turn.answer}" for turn in self._context)
+        return f"Previous conversation:\n{turns}\n\nUser: {query}"
+
+    def _should_continue_as_new(self) -> bool:
+        return (
+            self._answered_this_run >= MAX_QUERIES_PER_RUN
+            or workflow.info().is_continue_as_new_suggested()
+        )
+
+
+@dataclass
+class CustomAgentInput:
+    """
+    Input of ``CustomAgentWorkflow``.
+
+    Either name a persona from ``PERSONAS`` or give ``model`` and
+    ``system_prompt`` directly; explicit values override the persona's.
+    """
+    query: str
+    persona: Optional[str] = None
+    model: Optional[str] = None
+    system_prompt: Optional[str] = None
+
+
+@workflow.defn
+class CustomAgentWorkflow:
+    """
+    One workflow for any model and system prompt.
+
+    The configuration travels with the input, so a single registered
+    workflow serves every custom configuration without redeploying workers.
+    """
+
+    @workflow.run
+    async def run(self, request: CustomAgentInput) -> str:
+        """
+        Answer a query with a custom or named persona.
+
+        Args:
+            request: Query plus persona name and/or model and system prompt
+
+        Returns:
+            AI response
+        """
+        persona = resolve_persona(request.persona, request.model, request.system_prompt)
+        return await run_agent(persona.agent(), request.query)
@@ -1,8 +1,25 @@
 """Test configuration for pytest."""
 
+import importlib.util
 import sys
 from pathlib import Path
 
-# Add the examples directory to the path
+# Add the examples directory to the path (appended so that examples/openai
+# does not shadow the installed openai package)
 examples_dir = Path(__file__).parent.parent / "examples"
-sys.path.insert(0, str(examples_dir))
+sys.path.append(str(examples_dir))
+
+# Example folders use flat imports between their own modules
+sys.path.append(str(examples_dir / "integration"))
+sys.path.append(str(Path(__file__).parent.parent / "open-router"))
+
+# Shared LLM helpers, importable as after `pip install -e libs/llm_common`
+sys.path.append(str(Path(__file__).parent.parent / "libs" / "llm_common"))
+
+# examples/integration has a workflows module too, so the open-router one
+# is importable as openrouter_workflows
+_spec = importlib.util.spec_from_file_location(
+    "openrouter_workflows", Path(__file__).parent.parent / "open-router" / "workflows.py"
+)
+sys.modules[_spec.name] = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sys.modules[_spec.name])
@@ -0,0 +1,56 @@
+"""Tests for the autoscaler's scaling decisions."""
+
+from autoscaler import QueueSample, ScalingDecider, ScalingPolicy, worker_task_queues
+
+
+def _decider(**overrides):
+    policy = ScalingPolicy(min_workers=1, max_workers=4, target_backlog=10, up_after=2, down_after=3, cooldown=10)
+    for name, value in overrides.items():
+        setattr(policy, name, value)
+    return ScalingDecider(policy)
+
+
+def test_scales_up_after_consecutive_samples_and_respects_max():
+    decider = _decider()
+    busy = QueueSample(backlog=100, backlog_age=2.0)
+    assert decider.decide(1, busy, now=0) == 1
+    assert decider.decide(1, busy, now=1) == 4
+
+
+def test_old_backlog_scales_up_even_when_small():
+    decider = _decider()
+    stale = QueueSample(backlog=3, backlog_age=30.0)
+    decider.decide(1, stale, now=0)
+    assert decider.decide(1, stale, now=1) == 2
+
+
+def test_scales_down_one_at_a_time_with_cooldown():
+    decider = _decider()
+    idle = QueueSample(backlog=0, backlog_age=0.0)
+    assert [decider.decide(3, idle, now=t) for t in range(3)] == [3, 3, 2]
+    # Cooldown blocks the next step even though the votes are there again
+    assert [decider.decide(2, idle, now=t) for t in range(3, 6)] == [2, 2, 2]
+    assert decider.decide(2, idle, now=13) == 1
+    assert decider.decide(1, idle, now=100) == 1
+
+
+def test_noisy_backlog_does_not_flap():
+    decider = _decider()
+    busy = QueueSample(backlog=30, backlog_age=1.0)
+    idle = QueueSample(backlog=0, backlog_age=0.0)
+    sizes = [decider.decide(2, sample, now=t) for t, sample in enumerate([busy, idle] * 5)]
+    assert sizes == [2] * 10
+
+
+def test_samples_every_queue_the_workers_poll(monkeypatch):
+    monkeypatch.delenv("LANES", raising=False)
+    monkeypatch.delenv("LANE_BASE_QUEUE", raising=False)
+    assert worker_task_queues("worker.py") == [
+        "ai-content-task-queue-interactive",
+        "ai-content-task-queue-batch",
+        "ai-content-task-queue",
+    ]
+
+    monkeypatch.setenv("LANE_BASE_QUEUE", "0")
+    monkeypatch.setenv("LANES", "batch")
+    assert worker_task_queues("multi_step_chain_worker.py") == ["multi-step-ai-chain-queue-batch"]
@@ -0,0 +1,56 @@
+"""
+Tests for running cheap workflow steps as local or regular activities.
+"""
+
+import uuid
+
+import pytest
+from temporalio import activity
+from temporalio.api.enums.v1 import EventType
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from cheap_steps import StepMode
+from workflows import AIContentWorkflow, process_response
+
+
+@activity.defn(name="generate_text_with_openai")
+async def stub_generate_text(prompt: str) -> str:
+    return "Temporal keeps workflows durable."
+
+
+@pytest.mark.asyncio
+async def test_process_response_runs_in_every_step_mode():
+    try:
+        env = await WorkflowEnvironment.start_time_skipping()
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+
+    results, events = {}, {}
+    async with env:
+        async with Worker(
+            env.client,
+            task_queue="cheap-steps",
+            workflows=[AIContentWorkflow],
+            activities=[stub_generate_text, process_response],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            for mode in StepMode:
+                handle = await env.client.start_workflow(
+                    AIContentWorkflow.run,
+                    args=["What is Temporal?", mode],
+                    id=f"cheap-steps-{mode.value}-{uuid.uuid4().hex[:8]}",
+                    task_queue="cheap-steps",
+                )
+                results[mode] = await handle.result()
+                events[mode] = [event.event_type async for event in handle.fetch_history_events()]
+
+    expected = {"original_response": "Temporal keeps workflows durable.", "length": 33, "word_count": 4}
+    assert all(result == expected for result in results.values())
+
+    scheduled = {mode: events[mode].count(EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED) for mode in StepMode}
+    markers = {mode: events[mode].count(EventType.EVENT_TYPE_MARKER_RECORDED) for mode in StepMode}
+    # Only the activity mode schedules process_response through the task queue
+    assert scheduled == {StepMode.ACTIVITY: 2, StepMode.LOCAL: 1, StepMode.INLINE: 1}
+    # The local activity's result is recorded in a marker instead
+    assert markers == {StepMode.ACTIVITY: 0, StepMode.LOCAL: 1, StepMode.INLINE: 0}
@@ -0,0 +1,108 @@
+"""
+Tests for heartbeat checkpointing of streamed generations.
+"""
+
+import dataclasses
+from types import SimpleNamespace
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+import multi_step_chain
+from checkpointing import CONTINUE_PROMPT, Checkpoint, continuation_request, heartbeat_while, safe_prefix, stream_text
+from multi_step_chain import GeneratedContent, extract_key_points, generate_content
+
+
+def _chunk(content=None, usage=None):
+    choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    """Streaming client yielding scripted chunks, failing after ``fail_after`` of them."""
+
+    def __init__(self, pieces, fail_after=None, total_tokens=50):
+        self.pieces = pieces
+        self.fail_after = fail_after
+        self.total_tokens = total_tokens
+        self.requests = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self._stream()
+
+    async def _stream(self):
+        for index, piece in enumerate(self.pieces):
+            if index == self.fail_after:
+                raise ConnectionError("stream dropped")
+            yield _chunk(piece)
+        yield _chunk(usage=SimpleNamespace(total_tokens=self.total_tokens))
+
+
+def _env(heartbeats, details=()):
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, heartbeat_details=list(details))
+    env.on_heartbeat = lambda *args: heartbeats.append(args[0])
+    return env
+
+
+def test_checkpoints_end_at_a_boundary():
+    assert safe_prefix("Durable work") == "Durable "
+    assert safe_prefix("- one\n- tw", boundary="\n") == "- one\n"
+    assert safe_prefix("Dura") == ""
+
+    request = {"messages": [{"role": "user", "content": "Write"}], "max_tokens": 100}
+    assert continuation_request(request, Checkpoint()) is request
+    continued = continuation_request(request, Checkpoint("x" * 200, 60))
+    assert continued["messages"][-2:] == [
+        {"role": "assistant", "content": "x" * 200},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+    assert continued["max_tokens"] == 49
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_heartbeats_its_progress():
+    client = FakeStream(["Temporal keeps ", "workflows dur", "able."], fail_after=2)
+    progress = Checkpoint()
+    heartbeats = []
+
+    with pytest.raises(ConnectionError):
+        await _env(heartbeats).run(
+            heartbeat_while, stream_text(client, {"messages": []}, progress), progress
+        )
+
+    assert heartbeats[-1].text == "Temporal keeps workflows "
+    assert heartbeats[-1].tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_from_the_checkpoint(monkeypatch):
+    client = FakeStream([" workflows durable."], total_tokens=40)
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+    monkeypatch.setattr(multi_step_chain, "get_similarity_cache", lambda: None)
+    heartbeats = []
+
+    result = await _env(heartbeats, [{"text": "Temporal keeps ", "tokens": 30}]).run(
+        generate_content, "Temporal", "long"
+    )
+
+    assert result == GeneratedContent("Temporal keeps workflows durable.", 4, 70)
+    [request] = client.requests
+    assert request["messages"][-2]["content"] == "Temporal keeps "
+    assert request["max_tokens"] < 500
+    assert heartbeats[-1] == Checkpoint(result.content, 70)
+
+
+@pytest.mark.asyncio
+async def test_key_points_resume_after_the_last_full_line(monkeypatch):
+    client = FakeStream(["- Retries are automatic\n"])
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+
+    points = await _env([], [{"text": "- Workflows survive crashes\n", "tokens": 20}]).run(
+        extract_key_points, "text"
+    )
+
+    assert points.key_points == ["Workflows survive crashes", "Retries are automatic"]
+    assert points.tokens == 70
@@ -0,0 +1,96 @@
+"""Tests for the concurrent environment probe."""
+
+import asyncio
+
+import pytest
+
+import env_probe
+from env_probe import Probe, ProbeCache, ProbeResult
+
+
+def _probe(name, delay, ok=True, cacheable=False):
+    async def run():
+        await asyncio.sleep(delay)
+        return ProbeResult(name, ok, "done")
+
+    return Probe(name, run, cacheable)
+
+
+@pytest.mark.asyncio
+async def test_probes_run_concurrently_with_timeouts():
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await env_probe.run_probes(
+        [_probe("a", 0.2), _probe("b", 0.2), _probe("slow", 5)], timeout=0.5
+    )
+    assert loop.time() - started < 1.0
+    assert [r.name for r in results] == ["a", "b", "slow"]
+    assert results[0].ok and results[1].ok
+    assert not results[2].ok and "timed out" in results[2].detail
+
+
+@pytest.mark.asyncio
+async def test_cacheable_results_are_reused_per_fingerprint(tmp_path):
+    cache = ProbeCache(tmp_path / "cache.json", ttl=60)
+    calls = []
+
+    async def run():
+        calls.append(1)
+        return ProbeResult("package:x", True, "1.0")
+
+    probes = [Probe("package:x", run, cacheable=True), _probe("net", 0)]
+    await env_probe.run_probes(probes, cache=cache, fingerprint="f1")
+    await env_probe.run_probes(probes, cache=cache, fingerprint="f1")
+    assert len(calls) == 1
+
+    await env_probe.run_probes(probes, cache=cache, fingerprint="f2")
+    assert len(calls) == 2
+    assert [r.name for r in cache.load("f2").values()] == ["package:x"]
+
+
+def test_check_package_reports_missing_and_installed():
+    assert env_probe.check_package("pytest", "pytest").ok
+    missing = env_probe.check_package("no_such_module_xyz", "no-such-dist", required=False)
+    assert not missing.ok and not missing.required
+
+
+def test_only_template_values_count_as_placeholders(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    env_file = tmp_path / ".env"
+    for value, ok in [
+        ("<api-key-here>", False),
+        ("sk-your-api-key-here", False),
+        ("sk-proj-yourteam-Xy7", True),
+        ("sk-abc<def", True),
+    ]:
+        env_file.write_text(f"OPENAI_API_KEY={value}\n")
+        assert env_probe.check_env_key(env_file, "OPENAI_API_KEY").ok is ok, value
+
+
+def test_key_lists_and_pools_count_as_openai_keys(tmp_path, monkeypatch):
+    for name in env_probe.OPENAI_KEY_VARS:
+        monkeypatch.delenv(name, raising=False)
+    env_file = tmp_path / ".env"
+    env_file.write_text("OPENAI_API_KEY=<api-key-here>\n")
+    assert not env_probe.check_env_key(env_file, *env_probe.OPENAI_KEY_VARS).ok
+
+    monkeypatch.setenv("OPENAI_GATEWAY_POOL", '[{"key": "sk-pool"}]')
+    assert env_probe.check_env_key(env_file, *env_probe.OPENAI_KEY_VARS).ok
+    assert env_probe.first_openai_key({"OPENAI_API_KEYS": " sk-one, sk-two"}) == "sk-one"
+    assert env_probe.first_openai_key({"OPENAI_GATEWAY_POOL": "[]"}) is None
+
+
+@pytest.mark.asyncio
+async def test_key_check_times_out_its_request(monkeypatch):
+    timeouts = []
+
+    def urlopen(request, timeout=None):
+        timeouts.append(timeout)
+        raise TimeoutError("read timed out")
+
+    monkeypatch.setattr(env_probe.urllib.request, "urlopen", urlopen)
+    (probe,) = [p for p in env_probe.provider_probes("openai", "sk-test", timeout=0.5) if p.name == "openai:auth"]
+    result = await probe.run()
+
+    assert timeouts == [0.5]
+    assert not result.ok and "timed out" in result.detail
@@ -0,0 +1,97 @@
+"""Tests for the scripted fake model provider."""
+
+import uuid
+
+import pytest
+from agents import ModelSettings, ModelTracing, RunConfig, Runner
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+from fake_provider import FakeModelProvider, fake_plugin
+from openrouter_workflows import PERSONAS, SimpleAgentWorkflow
+
+
+@pytest.mark.asyncio
+async def test_scripted_and_templated_replies():
+    fake = FakeModelProvider(
+        replies=[
+            (r"(?i)what is (?P<topic>\w+)", "{topic} is covered by the {system!r} persona."),
+            (r"retry", "Use a RetryPolicy."),
+        ],
+        default="fallback for {model}",
+        completion_tokens=7,
+    )
+    model = fake.get_model("m")
+
+    response = await model.get_response(
+        "docs", "What is Temporal?", ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+    assert response.output[0].content[0].text == "Temporal is covered by the 'docs' persona."
+    assert response.usage.output_tokens == 7
+    assert response.usage.total_tokens == response.usage.input_tokens + 7
+
+    other = await model.get_response(
+        None, [{"role": "user", "content": "hello"}], ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+    assert other.output[0].content[0].text == "fallback for m"
+    assert fake.calls == 2
+    assert fake.requests == []
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_against_the_fake():
+    fake = FakeModelProvider(
+        replies=[(r"(?i)what is (?P<topic>\w+)", "{topic} for {model}.")], record_requests=True
+    )
+    agent = PERSONAS["assistant"].agent()
+
+    result = await Runner.run(
+        agent, "What is Temporal?", run_config=RunConfig(model_provider=fake, tracing_disabled=True)
+    )
+
+    assert result.final_output == f"Temporal for {PERSONAS['assistant'].model}."
+    assert fake.requests[0]["system"] == PERSONAS["assistant"].system
+
+
+@pytest.mark.asyncio
+async def test_streamed_runs_get_the_reply_in_one_event():
+    fake = FakeModelProvider(replies=[(r"retry", "Use a RetryPolicy.")], completion_tokens=5)
+    agent = PERSONAS["code"].agent()
+
+    result = Runner.run_streamed(
+        agent, "How do I retry?", run_config=RunConfig(model_provider=fake, tracing_disabled=True)
+    )
+    events = [event async for event in result.stream_events() if event.type == "raw_response_event"]
+
+    assert [event.data.type for event in events] == ["response.completed"]
+    assert result.final_output == "Use a RetryPolicy."
+    assert result.context_wrapper.usage.output_tokens == 5
+    assert fake.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_simple_agent_workflow_against_the_fake():
+    fake = FakeModelProvider(replies=[(r"(?i)what is (?P<topic>\w+)", "{topic} is a durable execution platform.")])
+    try:
+        env = await WorkflowEnvironment.start_time_skipping(plugins=[fake_plugin(fake)])
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+
+    async with env:
+        # The workflow module is not importable by its name, which the
+        # sandbox needs to re-import it
+        async with Worker(
+            env.client,
+            task_queue="fake-provider",
+            workflows=[SimpleAgentWorkflow],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            result = await env.client.execute_workflow(
+                SimpleAgentWorkflow.run,
+                "What is Temporal?",
+                id=f"fake-provider-{uuid.uuid4().hex[:8]}",
+                task_queue="fake-provider",
+            )
+
+    assert result == "Temporal is a durable execution platform."
+    assert fake.calls == 1
@@ -0,0 +1,82 @@
+"""
+Tests for the orjson payload converter and the typed chain payloads.
+"""
+
+import json
+
+import pytest
+from temporalio.converter import DataConverter
+
+import fast_converter
+from fast_converter import fast_data_converter, upgrade_legacy
+from multi_step_chain import ChainResult, ChainSummary, ContentAnalysis, GeneratedContent
+
+RESULT = ChainResult(
+    topic="Temporal",
+    generated_content="Temporal makes workflows durable. é",
+    content_word_count=5,
+    analysis="Sentiment: positive",
+    final_summary="Durable workflows.",
+    key_points=["Durable", "Retries"],
+    total_tokens=321,
+)
+
+
+def test_round_trips_chain_payloads():
+    converter = fast_data_converter().payload_converter
+    values = [GeneratedContent("text", 1, 5), ContentAnalysis("ok", 2), ChainSummary("sum", 10, 2, 3), RESULT]
+
+    payloads = converter.to_payloads(values)
+
+    assert converter.from_payloads(payloads, [type(value) for value in values]) == values
+
+
+def test_payloads_are_compatible_with_the_default_converter():
+    fast = fast_data_converter().payload_converter
+    default = DataConverter.default.payload_converter
+
+    payloads = fast.to_payloads([RESULT])
+    assert payloads[0].metadata["encoding"] == b"json/plain"
+    assert default.from_payloads(payloads, [ChainResult]) == [RESULT]
+    assert json.loads(payloads[0].data) == json.loads(default.to_payloads([RESULT])[0].data)
+    assert fast.from_payloads(default.to_payloads([RESULT]), [ChainResult]) == [RESULT]
+
+
+def test_decodes_legacy_stringified_results():
+    legacy = {
+        "topic": "Temporal",
+        "generated_content": "Temporal makes workflows durable. é",
+        "content_word_count": "5",
+        "analysis": "Sentiment: positive",
+        "final_summary": "Durable workflows.",
+        "key_points": "Durable; Retries",
+        "total_tokens": "321",
+    }
+    payloads = DataConverter.default.payload_converter.to_payloads([legacy, {"analysis": "ok"}])
+
+    decoded = fast_data_converter().payload_converter.from_payloads(payloads, [ChainResult, ContentAnalysis])
+
+    assert decoded == [RESULT, ContentAnalysis("ok", 0)]
+
+
+def test_upgrade_legacy_leaves_other_values_alone():
+    assert upgrade_legacy(dict, {"tokens": "5"}) == {"tokens": "5"}
+    assert upgrade_legacy(ContentAnalysis, {"analysis": "ok", "tokens": "many"}) == {"analysis": "ok", "tokens": "many"}
+
+
+def test_rejects_wrongly_typed_fields():
+    payloads = DataConverter.default.payload_converter.to_payloads([{"content": "x", "word_count": [1]}])
+
+    with pytest.raises(Exception):
+        fast_data_converter().payload_converter.from_payloads(payloads, [GeneratedContent])
+
+
+def test_decodes_legacy_results_without_orjson(monkeypatch):
+    monkeypatch.setattr(fast_converter, "orjson", None)
+    legacy = {"final_summary": "Durable.", "original_content_length": "42", "analysis_length": "7", "tokens": "3"}
+    payloads = DataConverter.default.payload_converter.to_payloads([legacy, RESULT])
+
+    converter = fast_data_converter().payload_converter
+
+    assert converter.from_payloads(payloads, [ChainSummary, ChainResult]) == [ChainSummary("Durable.", 42, 7, 3), RESULT]
+    assert json.loads(converter.to_payloads([RESULT])[0].data) == json.loads(payloads[1].data)
@@ -0,0 +1,175 @@
+"""
+Tests for the multi-key provider gateway.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from llm_common.gateway import Endpoint, ProviderGateway
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeCompletions:
+    def __init__(self, client: "FakeClient"):
+        self.client = client
+
+    async def create(self, **kwargs):
+        client = self.client
+        client.in_flight += 1
+        client.peak = max(client.peak, client.in_flight)
+        try:
+            await asyncio.sleep(client.delay)
+            if client.error is not None:
+                raise client.error
+            if kwargs.get("stream"):
+                return self._stream()
+            return {"key": client.endpoint.key}
+        finally:
+            client.in_flight -= 1
+
+
+    async def _stream(self):
+        for word in ("streamed", "reply"):
+            await asyncio.sleep(self.client.delay)
+            yield word
+
+
+class FakeClient:
+    def __init__(self, endpoint: Endpoint, delay: float = 0.01, error: Exception = None):
+        self.endpoint = endpoint
+        self.delay = delay
+        self.error = error
+        self.in_flight = 0
+        self.peak = 0
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = FakeCompletions(self)
+
+    async def close(self):
+        pass
+
+
+def fake_factory(errors: dict = None, delay: float = 0.01):
+    clients = {}
+
+    def factory(endpoint: Endpoint) -> FakeClient:
+        clients[endpoint.key] = FakeClient(endpoint, delay, (errors or {}).get(endpoint.key))
+        return clients[endpoint.key]
+
+    return factory, clients
+
+
+@pytest.mark.asyncio
+async def test_spreads_concurrent_calls_by_weight():
+    factory, _ = fake_factory()
+    gateway = ProviderGateway([Endpoint("key-a", weight=2), Endpoint("key-b")], client_factory=factory)
+
+    responses = await asyncio.gather(*(gateway.chat.completions.create(model="m") for _ in range(30)))
+
+    keys = [response["key"] for response in responses]
+    assert keys.count("key-a") == 20
+    assert keys.count("key-b") == 10
+    stats = gateway.stats()
+    assert stats["api.openai.com/...ey-a"]["share"] == pytest.approx(2 / 3)
+    assert stats["api.openai.com/...ey-b"]["outstanding"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_key_is_ejected_and_call_fails_over():
+    factory, _ = fake_factory({"key-a": FakeStatusError(429)})
+    gateway = ProviderGateway(
+        [Endpoint("key-a", name="a"), Endpoint("key-b", name="b")], client_factory=factory
+    )
+
+    assert await gateway.create(model="m") == {"key": "key-b"}
+    assert await gateway.create(model="m") == {"key": "key-b"}
+
+    stats = gateway.stats()
+    assert stats["a"]["rate_limited"] == 1
+    assert stats["a"]["ejected"] is True
+    assert stats["a"]["requests"] == 1
+    assert stats["b"]["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_other_errors_are_raised_without_failover():
+    factory, clients = fake_factory({"key-a": FakeStatusError(400), "key-b": FakeStatusError(400)})
+    gateway = ProviderGateway([Endpoint("key-a", name="a"), Endpoint("key-b", name="b")], client_factory=factory)
+
+    with pytest.raises(FakeStatusError):
+        await gateway.create(model="m")
+    assert len(clients) == 1
+    assert not any(stats["ejected"] for stats in gateway.stats().values())
+
+
+@pytest.mark.asyncio
+async def test_raises_when_every_key_is_unauthorized():
+    factory, _ = fake_factory({"key-a": FakeStatusError(401), "key-b": FakeStatusError(403)})
+    gateway = ProviderGateway([Endpoint("key-a", name="a"), Endpoint("key-b", name="b")], client_factory=factory)
+
+    with pytest.raises(FakeStatusError):
+        await gateway.create(model="m")
+    assert [stats["auth_failures"] for stats in gateway.stats().values()] == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_calls_wait_for_a_free_slot():
+    factory, clients = fake_factory()
+    gateway = ProviderGateway([Endpoint("key-a", max_concurrency=2)], client_factory=factory)
+
+    await asyncio.gather(*(gateway.create(model="m") for _ in range(6)))
+
+    assert clients["key-a"].peak == 2
+    assert gateway.stats()["api.openai.com/...ey-a"]["requests"] == 6
+
+
+@pytest.mark.asyncio
+async def test_streams_hold_their_slot_until_consumed():
+    factory, _ = fake_factory()
+    gateway = ProviderGateway([Endpoint("key-a", name="a", max_concurrency=1)], client_factory=factory)
+
+    stream = await gateway.create(model="m", stream=True)
+    assert gateway.stats()["a"]["outstanding"] == 1
+    waiting = asyncio.ensure_future(gateway.create(model="m"))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    assert [chunk async for chunk in stream] == ["streamed", "reply"]
+    assert await waiting == {"key": "key-a"}
+
+    # Closing a stream early frees the slot as well
+    async with await gateway.create(model="m", stream=True) as stream:
+        assert await stream.__anext__() == "streamed"
+    assert gateway.stats()["a"]["outstanding"] == 0
+
+
+def test_from_env_reads_pool(monkeypatch, tmp_path):
+    pool = [
+        {"key_env": "SECOND_KEY", "name": "second", "weight": 3, "requests_per_minute": 500},
+        {"key": "sk-first", "base_url": "https://example.com/v1"},
+    ]
+    path = tmp_path / "pool.json"
+    path.write_text(json.dumps(pool))
+    monkeypatch.setenv("SECOND_KEY", "sk-second")
+    monkeypatch.setenv("TEST_GATEWAY_POOL", f"@{path}")
+
+    gateway = ProviderGateway.from_env("TEST", base_url="https://default.example/v1")
+
+    assert list(gateway.stats()) == ["second", "example.com/...irst"]
+    assert gateway.stats()["second"]["weight"] == 3
+
+
+def test_from_env_falls_back_to_keys(monkeypatch):
+    monkeypatch.delenv("TEST_GATEWAY_POOL", raising=False)
+    monkeypatch.setenv("TEST_API_KEYS", "sk-one, sk-two")
+    assert len(ProviderGateway.from_env("TEST").stats()) == 2
+
+    monkeypatch.delenv("TEST_API_KEYS")
+    with pytest.raises(ValueError, match="TEST_API_KEY not found"):
+        ProviderGateway.from_env("TEST")
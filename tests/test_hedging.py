@@ -0,0 +1,75 @@
+"""
+Tests for hedged LLM requests.
+"""
+
+import asyncio
+
+import pytest
+
+from llm_common.hedging import Hedger
+
+
+def delayed(value: str, seconds: float, log: list):
+    async def call():
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            log.append(f"{value} cancelled")
+            raise
+        return value
+
+    return call
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_hedged():
+    hedger = Hedger(initial_delay=0.05)
+    log: list = []
+
+    result = await hedger.run(delayed("primary", 0, log), delayed("hedge", 0, log))
+
+    assert result == "primary"
+    assert hedger.stats()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    hedger = Hedger(initial_delay=0.01, cost_of=lambda result: 10)
+    log: list = []
+
+    result = await hedger.run(delayed("primary", 1, log), delayed("hedge", 0, log))
+
+    assert result == "hedge"
+    assert log == ["primary cancelled"]
+    stats = hedger.stats()
+    assert stats["hedge_rate"] == 1.0
+    assert stats["hedge_wins"] == 1
+    assert stats["extra_cost"] == 10
+
+
+@pytest.mark.asyncio
+async def test_hedge_survives_primary_failure():
+    hedger = Hedger(initial_delay=0.01)
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    result = await hedger.run(failing, delayed("hedge", 0.05, []))
+
+    assert result == "hedge"
+
+
+def test_delay_follows_observed_percentile():
+    hedger = Hedger(percentile=90, min_samples=10)
+    for latency in range(1, 11):
+        hedger.latencies.record(latency / 10)
+    assert hedger.delay() == pytest.approx(1.0)
+
+
+def test_from_env_is_opt_in(monkeypatch):
+    monkeypatch.delenv("LLM_HEDGING", raising=False)
+    assert Hedger.from_env() is None
+    monkeypatch.setenv("LLM_HEDGING", "1")
+    monkeypatch.setenv("LLM_HEDGE_PERCENTILE", "99")
+    assert Hedger.from_env().percentile == 99
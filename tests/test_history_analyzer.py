@@ -0,0 +1,76 @@
+"""
+Tests for the workflow history size analyzer.
+"""
+
+from temporalio.api.enums.v1 import EventType
+from temporalio.api.history.v1 import HistoryEvent
+from temporalio.client import WorkflowHistory
+from temporalio.converter import DataConverter
+
+from history_analyzer import analyze_history, summarize
+
+CONTENT = "Temporal makes workflows durable. " * 20
+
+
+def _payloads(*values):
+    return DataConverter.default.payload_converter.to_payloads(list(values))
+
+
+def chain_history(workflow_id: str) -> WorkflowHistory:
+    """A chain that passes the generated content to two more activities."""
+    started = HistoryEvent(event_id=1, event_type=EventType.EVENT_TYPE_WORKFLOW_EXECUTION_STARTED)
+    started.workflow_execution_started_event_attributes.workflow_type.name = "MultiStepAIChainWorkflow"
+    started.workflow_execution_started_event_attributes.input.payloads.extend(_payloads("Temporal", "short"))
+    events = [started]
+
+    def activity(event_id: int, name: str, inputs: list, result) -> None:
+        scheduled = HistoryEvent(event_id=event_id, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_SCHEDULED)
+        scheduled.activity_task_scheduled_event_attributes.activity_type.name = name
+        scheduled.activity_task_scheduled_event_attributes.input.payloads.extend(_payloads(*inputs))
+        completed = HistoryEvent(event_id=event_id + 1, event_type=EventType.EVENT_TYPE_ACTIVITY_TASK_COMPLETED)
+        completed.activity_task_completed_event_attributes.scheduled_event_id = event_id
+        completed.activity_task_completed_event_attributes.result.payloads.extend(_payloads(result))
+        events.extend([scheduled, completed])
+
+    activity(2, "generate_content", ["Temporal", "short"], {"content": CONTENT, "word_count": 100, "tokens": 150})
+    activity(4, "analyze_content", [CONTENT], {"analysis": "Positive.", "tokens": "40"})
+    activity(6, "summarize_analysis", [CONTENT, "Positive."], {"final_summary": "Durable.", "tokens": "30"})
+
+    completed = HistoryEvent(event_id=8, event_type=EventType.EVENT_TYPE_WORKFLOW_EXECUTION_COMPLETED)
+    completed.workflow_execution_completed_event_attributes.result.payloads.extend(
+        _payloads({"topic": "Temporal", "generated_content": CONTENT})
+    )
+    events.append(completed)
+    return WorkflowHistory(workflow_id, events)
+
+
+def test_breaks_down_payloads_and_fields():
+    report = analyze_history(chain_history("chain-1"))
+
+    assert report.workflow_type == "MultiStepAIChainWorkflow"
+    assert report.events == 8
+    assert report.event_types["ACTIVITY_TASK_SCHEDULED"] == 3
+    assert report.payload_bytes["generate_content result"] > report.payload_bytes["analyze_content result"]
+    assert report.field_bytes["generate_content result.content"] > len(CONTENT)
+    assert report.field_bytes["workflow result.generated_content"] > len(CONTENT)
+
+
+def test_flags_repeated_content():
+    report = analyze_history(chain_history("chain-1"))
+
+    [repeat] = report.repeated.values()
+    assert repeat["copies"] == 4
+    assert repeat["wasted_bytes"] == 3 * len(CONTENT)
+    assert "analyze_content input" in repeat["locations"]
+    assert "summarize_analysis input[0]" in repeat["locations"]
+
+
+def test_merges_runs_and_projects_limits():
+    reports = summarize([chain_history("chain-1"), chain_history("chain-2")])
+
+    report = reports["MultiStepAIChainWorkflow"]
+    assert report.runs == 2
+    assert report.events == 16
+    # 8 events per run: the event count limits runs, not the bytes
+    assert report.projection() == {"before_continue_as_new": 512, "before_history_limit": 6400}
+    assert report.to_dict()["repeated"][0]["copies"] == 8
@@ -0,0 +1,97 @@
+"""Tests for priority lane routing."""
+
+import dataclasses
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from lanes import (
+    DEFAULT_LANE_CONFIGS,
+    Lane,
+    LaneConfig,
+    LaneMetricsInterceptor,
+    lane_of,
+    lane_queues,
+    lane_task_queue,
+    lanes_from_env,
+)
+
+
+class FakeHistogram:
+    def __init__(self, name):
+        self.name = name
+        self.records = []
+
+    def record(self, value, additional_attributes=None):
+        self.records.append((value, additional_attributes))
+
+
+class FakeMeter:
+    def __init__(self):
+        self.histograms = []
+
+    def create_histogram_timedelta(self, name, description=None, unit=None):
+        self.histograms.append(FakeHistogram(name))
+        return self.histograms[-1]
+
+
+class Next:
+    async def execute_activity(self, input):
+        return "done"
+
+
+def test_lane_task_queues_round_trip():
+    for lane in Lane:
+        assert lane_of(lane_task_queue("ai-content-task-queue", lane)) is lane
+    assert lane_of("ai-content-task-queue") is None
+
+
+def test_lanes_from_env(monkeypatch):
+    monkeypatch.delenv("LANES", raising=False)
+    assert lanes_from_env() == [Lane.INTERACTIVE, Lane.BATCH]
+    monkeypatch.setenv("LANES", "batch")
+    assert lanes_from_env() == [Lane.BATCH]
+
+
+def test_lane_config_env_overrides(monkeypatch):
+    monkeypatch.setenv("LANE_BATCH_ACTIVITY_SLOTS", "3")
+    config = LaneConfig.from_env(Lane.BATCH)
+    assert config.activity_slots == 3
+    assert config.workflow_slots == DEFAULT_LANE_CONFIGS[Lane.BATCH].workflow_slots
+
+
+def test_base_queue_is_served_until_disabled(monkeypatch):
+    monkeypatch.delenv("LANES", raising=False)
+    monkeypatch.delenv("LANE_BASE_QUEUE", raising=False)
+    queues = dict(lane_queues("chain"))
+    assert list(queues) == ["chain-interactive", "chain-batch", "chain"]
+    assert queues["chain"] == LaneConfig.from_env(Lane.BATCH)
+
+    monkeypatch.setenv("LANE_BASE_QUEUE", "0")
+    assert [queue for queue, _ in lane_queues("chain")] == ["chain-interactive", "chain-batch"]
+    assert [queue for queue, _ in lane_queues("chain", [Lane.BATCH], base_queue_worker=True)] == [
+        "chain-batch",
+        "chain",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lane_metrics_create_histograms_once():
+    meter = FakeMeter()
+    interceptor = LaneMetricsInterceptor(meter)
+    assert [h.name for h in meter.histograms] == ["activity_schedule_to_start_latency"]
+
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(
+        env.info,
+        task_queue=lane_task_queue("chain", Lane.BATCH),
+        current_attempt_scheduled_time=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    for _ in range(3):
+        assert await env.run(interceptor.intercept_activity(Next()).execute_activity, None) == "done"
+
+    assert len(meter.histograms) == 1
+    records = meter.histograms[0].records
+    assert len(records) == 3
+    assert all(waited >= timedelta(seconds=1) and attributes["lane"] == "batch" for waited, attributes in records)
@@ -0,0 +1,51 @@
+"""Tests for the load generator's helpers and options."""
+
+import pytest
+
+from load_generator import DEFAULT_PROMPTS, load_prompts, parse_args, percentile
+
+
+def test_percentile_uses_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 99) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([0.7], 90) == 0.7
+
+
+def test_load_prompts_skips_blank_lines(tmp_path):
+    path = tmp_path / "prompts.txt"
+    path.write_text("First prompt\n\n   \n  Second prompt  \n")
+
+    assert load_prompts(str(path)) == ["First prompt", "Second prompt"]
+    assert load_prompts(None) == DEFAULT_PROMPTS
+
+    path.write_text("\n  \n")
+    with pytest.raises(ValueError):
+        load_prompts(str(path))
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["ai-content", "--rate", "0"],
+        ["ai-content", "--rate", "-2"],
+        ["ai-content", "--concurrency", "0"],
+        ["ai-content", "--rate", "5", "--duration", "0"],
+        ["ai-content", "--concurrency", "5", "--total", "-1"],
+    ],
+)
+def test_non_positive_options_are_rejected(argv, capsys):
+    with pytest.raises(SystemExit) as exited:
+        parse_args(argv)
+
+    assert exited.value.code == 2
+    assert "must be positive" in capsys.readouterr().err
+
+
+def test_valid_options_parse():
+    args = parse_args(["multi-step-chain", "--concurrency", "20", "--total", "500"])
+
+    assert args.concurrency == 20 and args.total == 500 and args.rate is None
@@ -0,0 +1,37 @@
+"""
+Tests for the event-loop lag monitor.
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from loop_monitor import LoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_stack(caplog):
+    monitor = LoopLagMonitor(threshold=0.1, interval=0.02)
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    with caplog.at_level(logging.WARNING, logger="loop_monitor"):
+        time.sleep(0.3)  # blocks the event loop
+        await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.stalls == 1
+    assert monitor.max_lag >= 0.25
+    assert "test_blocking_call_is_reported_with_stack" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_has_no_stalls():
+    monitor = LoopLagMonitor(threshold=0.1, interval=0.02)
+    monitor.start()
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    assert monitor.stalls == 0
@@ -0,0 +1,40 @@
+"""Tests for map-reduce chunking and reduce grouping."""
+
+from map_reduce import estimate_tokens, group_for_reduce, split_ranges
+
+
+def test_split_ranges_cover_file_on_word_boundaries(tmp_path):
+    path = tmp_path / "doc.txt"
+    text = "\n\n".join(f"Paragraph {i} über Temporal workflows and activities." for i in range(200))
+    path.write_text(text, encoding="utf-8")
+
+    ranges = split_ranges(str(path), chunk_bytes=500)
+
+    data = path.read_bytes()
+    assert ranges[0].start == 0 and ranges[-1].end == len(data)
+    assert all(a.end == b.start for a, b in zip(ranges, ranges[1:]))
+    assert all(0 < r.end - r.start <= 500 for r in ranges)
+    pieces = [data[r.start:r.end].decode("utf-8") for r in ranges]
+    assert "".join(pieces) == text
+    assert all(piece.endswith(("\n\n", " ")) for piece in pieces[:-1])
+
+
+def test_split_ranges_without_whitespace_keeps_utf8_intact(tmp_path):
+    path = tmp_path / "dense.txt"
+    path.write_text("ü" * 1000, encoding="utf-8")
+
+    ranges = split_ranges(str(path), chunk_bytes=301)
+
+    data = path.read_bytes()
+    assert "".join(data[r.start:r.end].decode("utf-8") for r in ranges) == "ü" * 1000
+
+
+def test_reduce_groups_respect_fan_in_and_token_budget():
+    summaries = ["x" * 400] * 10  # ~100 tokens each
+    groups = group_for_reduce(summaries, max_tokens=350, fan_in=8)
+    assert [len(g) for g in groups] == [3, 3, 3, 1]
+    assert all(sum(estimate_tokens(s) for s in g) <= 350 for g in groups)
+
+    assert [len(g) for g in group_for_reduce(summaries, max_tokens=10_000, fan_in=4)] == [4, 4, 2]
+    # Oversized summaries still pair up, so every level shrinks the list
+    assert [len(g) for g in group_for_reduce(["x" * 4000] * 3, max_tokens=100, fan_in=8)] == [2, 1]
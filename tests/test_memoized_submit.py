@@ -0,0 +1,47 @@
+"""
+Tests for input-derived workflow IDs.
+"""
+
+from datetime import timedelta
+
+from temporalio import workflow
+
+from memoized_submit import memoized_workflow_id, workflow_type_of
+
+
+@workflow.defn
+class EchoWorkflow:
+    @workflow.run
+    async def run(self, text: str) -> str:
+        return text
+
+
+@workflow.defn(name="echo-v2")
+class RenamedEchoWorkflow:
+    @workflow.run
+    async def run(self, text: str) -> str:
+        return text
+
+
+def test_identical_inputs_share_an_id():
+    first = memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal", "short"])
+    second = memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal", "short"])
+    assert first == second
+    assert first.startswith("MultiStepAIChainWorkflow-")
+
+
+def test_different_inputs_or_types_get_different_ids():
+    base = memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal", "short"])
+    assert base != memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal", "long"])
+    assert base != memoized_workflow_id("StructuredAIChainWorkflow", ["Temporal", "short"])
+
+
+def test_ttl_window_is_part_of_the_id():
+    plain = memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal"])
+    windowed = memoized_workflow_id("MultiStepAIChainWorkflow", ["Temporal"], ttl=timedelta(hours=1))
+    assert plain != windowed
+
+
+def test_workflow_type_comes_from_run_method():
+    assert workflow_type_of(EchoWorkflow.run) == "EchoWorkflow"
+    assert workflow_type_of(RenamedEchoWorkflow.run) == "echo-v2"
@@ -0,0 +1,178 @@
+"""
+Tests for the multi-step chain activities.
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from temporalio.client import WorkflowFailureError
+from temporalio.exceptions import ApplicationError
+from temporalio.testing import ActivityEnvironment, WorkflowEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+import multi_step_chain
+from multi_step_chain import (
+    StructuredAIChainWorkflow,
+    analyze_content_structured,
+    generate_content,
+    store_chain_result,
+    summarize_analysis,
+)
+from llm_common.similarity_cache import SimilarityCache
+from singleflight import SingleFlight
+
+
+class SlowStream:
+    """Streaming client answering every request with one chunk after a delay."""
+
+    def __init__(self, text="Temporal keeps workflows durable.", total_tokens=60):
+        self.text = text
+        self.total_tokens = total_tokens
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        self.requests += 1
+        return self._stream()
+
+    async def _stream(self):
+        await asyncio.sleep(0.05)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=self.text))], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=self.total_tokens))
+
+
+class StructuredReplies(SlowStream):
+    """Streams generated content and answers other calls with a scripted message."""
+
+    def __init__(self, content=None, refusal=None):
+        super().__init__()
+        self.message = SimpleNamespace(content=content, refusal=refusal)
+        self.structured_requests = 0
+
+    async def create(self, **kwargs):
+        if kwargs.get("stream"):
+            return await super().create(**kwargs)
+        self.structured_requests += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=self.message)], usage=SimpleNamespace(total_tokens=42)
+        )
+
+
+ANALYSIS = {"sentiment": "positive", "summary": "Temporal is durable.", "key_points": ["retries", "history"]}
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    client = SlowStream()
+    group = SingleFlight()
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+    monkeypatch.setattr(multi_step_chain, "get_similarity_cache", lambda: None)
+    monkeypatch.setattr(multi_step_chain, "get_single_flight", lambda: group)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_coalesced_calls_report_no_tokens(chain):
+    results = await asyncio.gather(
+        *(ActivityEnvironment().run(generate_content, "Temporal", "short") for _ in range(3))
+    )
+
+    assert chain.requests == 1
+    assert {result.content for result in results} == {chain.text}
+    assert sorted(result.tokens for result in results) == [0, 0, 60]
+
+
+@pytest.mark.asyncio
+async def test_coalesced_calls_heartbeat_the_shared_progress(chain):
+    heartbeats = []
+
+    def environment():
+        env = ActivityEnvironment()
+        env.on_heartbeat = lambda *details: heartbeats.append(details[0])
+        return env
+
+    await asyncio.gather(*(environment().run(generate_content, "Temporal", "short") for _ in range(3)))
+
+    assert len(heartbeats) == 3
+    assert {(beat.text, beat.tokens) for beat in heartbeats} == {(chain.text, 60)}
+    assert not multi_step_chain._generation_progress
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_report_no_tokens(chain, monkeypatch):
+    cache = SimilarityCache()
+    monkeypatch.setattr(multi_step_chain, "get_similarity_cache", lambda: cache)
+
+    first = await ActivityEnvironment().run(generate_content, "What is Temporal?", "short")
+    again = await ActivityEnvironment().run(generate_content, "what is temporal", "short")
+
+    assert chain.requests == 1
+    assert (first.tokens, again.tokens) == (60, 0)
+    assert again.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_structured_analysis_parses_schema_response(monkeypatch):
+    client = StructuredReplies(content=json.dumps(ANALYSIS))
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+
+    result = await ActivityEnvironment().run(analyze_content_structured, "Temporal keeps workflows durable.")
+
+    assert (result.sentiment, result.summary, result.key_points) == (
+        "positive", "Temporal is durable.", ["retries", "history"]
+    )
+    assert result.tokens == 42
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "reply, error_type",
+    [
+        ({"refusal": "I can't help with that."}, "AnalysisRefused"),
+        ({"content": None}, "InvalidAnalysis"),
+        ({"content": json.dumps({"sentiment": "neutral"})}, "InvalidAnalysis"),
+        ({"content": '{"sentiment": "neu'}, "InvalidAnalysis"),
+    ],
+)
+async def test_structured_analysis_failures_are_not_retryable(monkeypatch, reply, error_type):
+    client = StructuredReplies(**reply)
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+
+    with pytest.raises(ApplicationError) as raised:
+        await ActivityEnvironment().run(analyze_content_structured, "Temporal keeps workflows durable.")
+
+    assert raised.value.type == error_type
+    assert raised.value.non_retryable
+
+
+@pytest.mark.asyncio
+async def test_structured_chain_fails_once_on_refusal(chain, monkeypatch, tmp_path):
+    client = StructuredReplies(refusal="I can't help with that.")
+    monkeypatch.setattr(multi_step_chain, "get_gateway", lambda: client)
+    monkeypatch.setenv("RESULT_STORE_PATH", str(tmp_path / "results.db"))
+    try:
+        env = await WorkflowEnvironment.start_time_skipping()
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+
+    async with env:
+        async with Worker(
+            env.client,
+            task_queue="structured-chain",
+            workflows=[StructuredAIChainWorkflow],
+            activities=[generate_content, analyze_content_structured, summarize_analysis, store_chain_result],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            with pytest.raises(WorkflowFailureError) as failed:
+                await env.client.execute_workflow(
+                    StructuredAIChainWorkflow.run,
+                    args=["Temporal", "short"],
+                    id=f"structured-chain-{uuid.uuid4().hex[:8]}",
+                    task_queue="structured-chain",
+                )
+
+    assert failed.value.cause.cause.type == "AnalysisRefused"
+    assert client.structured_requests == 1
@@ -0,0 +1,110 @@
+"""Tests for the OpenRouter client wiring."""
+
+import asyncio
+
+import pytest
+from agents import Agent, OpenAIProvider, RunConfig, Runner
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage
+
+import client as openrouter
+from llm_common.gateway import Endpoint, ProviderGateway
+from router import ModelRouter, RoutedModelProvider
+
+
+class FakeCompletions:
+    def __init__(self, client):
+        self.client = client
+
+    async def create(self, **kwargs):
+        self.client.calls += 1
+        return ChatCompletion(
+            id="c",
+            created=0,
+            model=kwargs["model"],
+            object="chat.completion",
+            choices=[
+                Choice(
+                    index=0,
+                    finish_reason="stop",
+                    message=ChatCompletionMessage(role="assistant", content=f"answered by {kwargs['model']}"),
+                )
+            ],
+            usage=CompletionUsage(prompt_tokens=5, completion_tokens=3, total_tokens=8),
+        )
+
+
+class FakeOpenAI:
+    def __init__(self, endpoint):
+        self.base_url = endpoint.base_url
+        self.calls = 0
+        self.closed = False
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = FakeCompletions(self)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_agent_calls_reuse_one_client_per_key():
+    clients = []
+
+    def factory(endpoint):
+        clients.append(FakeOpenAI(endpoint))
+        return clients[-1]
+
+    gateway = ProviderGateway(
+        [Endpoint("key-a", "https://openrouter.ai/api/v1"), Endpoint("key-b", "https://openrouter.ai/api/v1")],
+        client_factory=factory,
+    )
+    provider = RoutedModelProvider(
+        OpenAIProvider(openai_client=gateway, use_responses=False), ModelRouter(["m"])
+    )
+    agent = Agent(name="Assistant", instructions="Be brief.", model="m")
+
+    for _ in range(4):
+        result = await Runner.run(
+            agent, "What is Temporal?", run_config=RunConfig(model_provider=provider, tracing_disabled=True)
+        )
+        assert result.final_output == "answered by m"
+
+    assert len(clients) == 2
+    assert sum(client.calls for client in clients) == 4
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    """Replace the Temporal and OpenRouter connection with counted fakes."""
+    connections = []
+
+    async def connect():
+        await asyncio.sleep(0.01)
+        connections.append((object(), FakeOpenAI(Endpoint("key", openrouter.OPENROUTER_BASE_URL))))
+        return connections[-1]
+
+    monkeypatch.setattr(openrouter, "_connect", connect)
+    monkeypatch.setattr(openrouter, "_client_loop", None)
+    return connections
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_client(fake_connect):
+    clients = await asyncio.gather(*(openrouter.get_openrouter_client() for _ in range(10)))
+    later = await openrouter.get_openrouter_client()
+
+    assert len(fake_connect) == 1
+    assert all(client is fake_connect[0][0] for client in [*clients, later])
+    await openrouter.close_openrouter_client()
+
+
+@pytest.mark.asyncio
+async def test_closing_releases_the_http_client_and_reconnects_later(fake_connect):
+    async with openrouter.openrouter_client() as client:
+        assert client is fake_connect[0][0]
+    assert fake_connect[0][1].closed
+
+    assert await openrouter.get_openrouter_client() is fake_connect[1][0]
+    await openrouter.close_openrouter_client()
+    assert fake_connect[1][1].closed
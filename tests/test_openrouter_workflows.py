@@ -0,0 +1,165 @@
+"""Tests for the OpenRouter persona session and custom agent workflows."""
+
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import pytest
+from temporalio.exceptions import ApplicationError
+from temporalio.testing import WorkflowEnvironment
+from temporalio.worker import UnsandboxedWorkflowRunner, Worker
+
+import openrouter_workflows
+from client import ask_persona
+from fake_provider import FakeModelProvider, fake_plugin
+from openrouter_workflows import (
+    PERSONAS,
+    SESSION_DRAINING,
+    CustomAgentInput,
+    CustomAgentWorkflow,
+    PersonaAgentWorkflow,
+    PersonaSessionInput,
+    resolve_persona,
+)
+
+TASK_QUEUE = "openrouter-workflows"
+
+
+@pytest.fixture(autouse=True)
+def openrouter_workflows_module(monkeypatch):
+    # ask_persona imports the workflows by their module name in open-router
+    monkeypatch.setitem(sys.modules, "workflows", openrouter_workflows)
+
+
+@asynccontextmanager
+async def persona_worker(fake):
+    # Update-with-start needs a dev server; the time-skipping server lacks it
+    try:
+        env = await WorkflowEnvironment.start_local(plugins=[fake_plugin(fake)])
+    except RuntimeError as e:
+        pytest.skip(f"Temporal dev server unavailable: {e}")
+
+    async with env:
+        # The workflow module is not importable by its name, which the
+        # sandbox needs to re-import it
+        async with Worker(
+            env.client,
+            task_queue=TASK_QUEUE,
+            workflows=[PersonaAgentWorkflow],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            yield env.client
+
+
+def test_ask_validator_rejects_empty_queries_and_draining_sessions():
+    session = PersonaAgentWorkflow(PersonaSessionInput("code"))
+
+    with pytest.raises(ValueError):
+        session.validate_ask("   ")
+
+    session._draining = True
+    with pytest.raises(ApplicationError) as rejected:
+        session.validate_ask("What is Temporal?")
+    assert rejected.value.type == SESSION_DRAINING
+
+
+@pytest.mark.asyncio
+async def test_persona_session_answers_updates_with_recent_context():
+    fake = FakeModelProvider(default="answer for {model}", record_requests=True)
+    session = f"s-{uuid.uuid4().hex[:8]}"
+
+    async with persona_worker(fake) as client:
+        first = await ask_persona("code", "What is Temporal?", session, TASK_QUEUE, client=client)
+        second = await ask_persona("code", "And retries?", session, TASK_QUEUE, client=client)
+        handle = client.get_workflow_handle(f"persona-code-{session}")
+        answered = await handle.query(PersonaAgentWorkflow.answered)
+
+    assert first == second == f"answer for {PERSONAS['code'].model}"
+    assert answered == 2
+    assert fake.calls == 2
+    assert "User: What is Temporal?" in str(fake.requests[1]["input"])
+    assert fake.requests[1]["system"] == PERSONAS["code"].system
+
+
+@pytest.mark.asyncio
+async def test_persona_session_continues_as_new_with_its_context(monkeypatch):
+    monkeypatch.setattr(openrouter_workflows, "MAX_QUERIES_PER_RUN", 2)
+    fake = FakeModelProvider(default="ok", record_requests=True)
+    session = f"s-{uuid.uuid4().hex[:8]}"
+
+    async with persona_worker(fake) as client:
+        handle = client.get_workflow_handle(f"persona-assistant-{session}")
+        await ask_persona("assistant", "Question 0", session, TASK_QUEUE, client=client)
+        first_run = (await handle.describe()).run_id
+        await ask_persona("assistant", "Question 1", session, TASK_QUEUE, client=client)
+
+        # Rejected while the first run drains, then served by the next one
+        await ask_persona("assistant", "Question 2", session, TASK_QUEUE, client=client)
+        second_run = (await handle.describe()).run_id
+        answered = await handle.query(PersonaAgentWorkflow.answered)
+
+    assert second_run != first_run
+    assert answered == 3
+    assert "User: Question 1" in str(fake.requests[2]["input"])
+
+
+@pytest.mark.asyncio
+async def test_idle_persona_session_completes_and_restarts(monkeypatch):
+    monkeypatch.setattr(openrouter_workflows, "IDLE_TIMEOUT", timedelta(seconds=1))
+    fake = FakeModelProvider(default="ok", record_requests=True)
+    session = f"s-{uuid.uuid4().hex[:8]}"
+
+    async with persona_worker(fake) as client:
+        await ask_persona("data", "Summarize Q3", session, TASK_QUEUE, client=client)
+        handle = client.get_workflow_handle(f"persona-data-{session}")
+        assert await handle.result() == 1
+
+        # The next query starts a fresh session without earlier context
+        await ask_persona("data", "Summarize Q4", session, TASK_QUEUE, client=client)
+        answered = await client.get_workflow_handle(handle.id).query(PersonaAgentWorkflow.answered)
+
+    assert answered == 1
+    assert "Previous conversation" not in str(fake.requests[1]["input"])
+
+
+def test_resolve_persona_applies_overrides_and_rejects_unknown_names():
+    assert resolve_persona() == PERSONAS["assistant"]
+    assert resolve_persona("data", model="openai/gpt-4-turbo").system == PERSONAS["data"].system
+    assert resolve_persona("data", model="openai/gpt-4-turbo").model == "openai/gpt-4-turbo"
+
+    with pytest.raises(ApplicationError) as unknown:
+        resolve_persona("poet")
+    assert unknown.value.non_retryable
+
+
+@pytest.mark.asyncio
+async def test_one_custom_agent_workflow_serves_every_configuration():
+    fake = FakeModelProvider(default="{model}: {system}")
+    try:
+        env = await WorkflowEnvironment.start_time_skipping(plugins=[fake_plugin(fake)])
+    except RuntimeError as e:
+        pytest.skip(f"Temporal test server unavailable: {e}")
+
+    requests = [
+        CustomAgentInput("Review this", model="deepseek/deepseek-r1", system_prompt="You are a code expert."),
+        CustomAgentInput("Summarize Q3", persona="data", model="openai/gpt-4-turbo"),
+    ]
+    async with env:
+        async with Worker(
+            env.client,
+            task_queue=TASK_QUEUE,
+            workflows=[CustomAgentWorkflow],
+            workflow_runner=UnsandboxedWorkflowRunner(),
+        ):
+            results = [
+                await env.client.execute_workflow(
+                    CustomAgentWorkflow.run, request, id=f"custom-{uuid.uuid4().hex[:8]}", task_queue=TASK_QUEUE
+                )
+                for request in requests
+            ]
+
+    assert results == [
+        "deepseek/deepseek-r1: You are a code expert.",
+        f"openai/gpt-4-turbo: {PERSONAS['data'].system}",
+    ]
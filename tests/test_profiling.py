@@ -0,0 +1,129 @@
+"""
+Tests for the on-demand worker profiler.
+"""
+
+import asyncio
+import dataclasses
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from temporalio.testing import ActivityEnvironment
+
+from profiling import WORKFLOW_THREAD_PREFIX, WorkerProfiler, _ProfiledActivityInbound
+
+
+def busy_loop_work(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(100))
+
+
+def _profiler_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "worker-profiler"]
+
+
+def _samples(path):
+    return {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in path.read_text().splitlines()}
+
+
+class BusyActivity:
+    """Next interceptor standing in for an activity that keeps the loop busy."""
+
+    async def execute_activity(self, input):
+        busy_loop_work(0.1)
+
+
+async def _run_activity(profiler, activity_type):
+    env = ActivityEnvironment()
+    env.info = dataclasses.replace(env.info, activity_type=activity_type)
+    inbound = _ProfiledActivityInbound(BusyActivity(), profiler)
+    await env.run(inbound.execute_activity, None)
+
+
+@pytest.fixture(autouse=True)
+def no_startup_window(monkeypatch):
+    monkeypatch.delenv("WORKER_PROFILE_SECONDS", raising=False)
+
+
+@pytest.mark.asyncio
+async def test_install_does_not_start_sampler_without_window(tmp_path):
+    profiler = WorkerProfiler(str(tmp_path))
+    profiler.install()
+
+    assert profiler._thread is None
+    assert not _profiler_threads()
+    assert profiler.stop() is None
+
+
+@pytest.mark.asyncio
+async def test_window_samples_loop_and_stops_when_over(tmp_path):
+    profiler = WorkerProfiler(str(tmp_path), window=0.2, interval=0.001)
+    profiler.install()
+
+    profiler.start_window()
+    assert len(_profiler_threads()) == 1
+    busy_loop_work(0.1)
+    await asyncio.sleep(0.3)
+
+    assert not _profiler_threads()
+    (path,) = tmp_path.glob("*.collapsed")
+    stacks = _samples(path)
+    assert any(stack.startswith("event-loop;") and "busy_loop_work" in stack for stack in stacks)
+
+    # A new window starts a new sampler
+    profiler.start_window(0.05)
+    assert len(_profiler_threads()) == 1
+    profiler.stop()
+    assert not _profiler_threads()
+
+
+@pytest.mark.asyncio
+async def test_activity_filter_only_keeps_selected_activities(tmp_path):
+    profiler = WorkerProfiler(str(tmp_path), activity_types=frozenset({"selected"}), interval=0.001)
+    profiler.install()
+    assert len(_profiler_threads()) == 1
+
+    await _run_activity(profiler, "other")
+    assert not profiler._stacks
+
+    await _run_activity(profiler, "selected")
+    path = profiler.stop()
+
+    assert path is not None
+    assert any("busy_loop_work" in stack for stack in _samples(path))
+    assert not _profiler_threads()
+
+
+@pytest.mark.asyncio
+async def test_samples_busy_workflow_task_threads(tmp_path):
+    profiler = WorkerProfiler(str(tmp_path), interval=0.001)
+    profiler.install()
+
+    with ThreadPoolExecutor(2, thread_name_prefix=WORKFLOW_THREAD_PREFIX) as pool:
+        # Start both threads; one of them stays idle
+        for done in [pool.submit(time.sleep, 0.05) for _ in range(2)]:
+            done.result()
+        profiler.start_window(5)
+        await asyncio.wrap_future(pool.submit(busy_loop_work, 0.1))
+    path = profiler.stop()
+
+    workflow_stacks = [stack for stack in _samples(path) if stack.startswith("workflow-task;")]
+    assert any("busy_loop_work" in stack for stack in workflow_stacks)
+    # The idle thread waiting for work is skipped
+    assert not any(stack.rsplit(";", 1)[-1].startswith("_worker (thread.py") for stack in workflow_stacks)
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_samples_once(tmp_path):
+    profiler = WorkerProfiler(str(tmp_path), interval=0.001)
+    profiler.install()
+
+    profiler.start_window(5)
+    busy_loop_work(0.05)
+    path = profiler.stop()
+
+    assert path is not None and sum(_samples(path).values()) > 0
+    assert profiler.stop() is None
+    assert list(tmp_path.glob("*.collapsed")) == [path]
@@ -0,0 +1,88 @@
+"""Tests for the batched SQLite result store."""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from result_store import ChainRecord, ResultStore
+
+
+def _record(i, topic="Temporal retries", content="Activities retry with backoff."):
+    return ChainRecord(
+        workflow_id=f"wf-{i}",
+        workflow_type="MultiStepAIChainWorkflow",
+        topic=topic,
+        content=content,
+        analysis="Sentiment: positive",
+        summary=f"Summary {i}",
+        key_points="a; b",
+        total_tokens=100 + i,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_batched_and_searchable(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    try:
+        await asyncio.gather(*(store.write(_record(i)) for i in range(500)))
+        await store.write(_record(999, topic="Kafka consumers", content="Partitions and offsets."))
+
+        assert store.rows == 501
+        assert store.batches < 50
+        assert store.get("wf-7")["total_tokens"] == 107
+        assert [row["workflow_id"] for row in store.search("kafka")] == ["wf-999"]
+        assert len(store.search("retries", limit=5)) == 5
+    finally:
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_rewrites_replace_the_stored_result(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    try:
+        await store.write(_record(1, content="first draft"))
+        await store.write(_record(1, content="final version"))
+        assert store.get("wf-1")["content"] == "final version"
+        assert store.search("draft") == []
+    finally:
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_search_treats_punctuation_as_text(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    try:
+        await store.write(_record(1, topic="What's new in C++", content="Temporal-retries explained."))
+        for query in ["temporal-retries", "what's new", "C++", "retries?", 'say "new"', "NEAR(", "*"]:
+            store.search(query)
+        assert [row["workflow_id"] for row in store.search("temporal-retries")] == ["wf-1"]
+        assert [row["workflow_id"] for row in store.search("what's new")] == ["wf-1"]
+        assert [row["workflow_id"] for row in store.search("retries?")] == ["wf-1"]
+        assert store.search("   ") == []
+    finally:
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_close_their_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = ResultStore._connect
+
+    def tracking_connect(self):
+        opened.append(connect(self))
+        return opened[-1]
+
+    monkeypatch.setattr(ResultStore, "_connect", tracking_connect)
+    store = ResultStore(tmp_path / "results.db")
+    try:
+        await store.write(_record(1))
+        store.get("wf-1")
+        store.search("retries")
+    finally:
+        store.close()
+
+    assert len(opened) == 4
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
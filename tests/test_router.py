@@ -0,0 +1,113 @@
+"""
+Tests for the OpenRouter model router.
+"""
+
+import pytest
+from agents import Agent, Model, ModelProvider, ModelSettings, ModelTracing, RunConfig, Runner
+from temporalio.contrib.openai_agents.testing import ResponseBuilders
+
+from router import ModelRouter, RoutedModelProvider
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _ask(model, prompt="What is Temporal?", system=None):
+    return model.get_response(system, prompt, ModelSettings(), [], None, [], ModelTracing.DISABLED)
+
+
+class FakeModel(Model):
+    def __init__(self, provider: "FakeProvider", name: str):
+        self.provider = provider
+        self.name = name
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        self.provider.calls.append(self.name)
+        if self.name in self.provider.failures:
+            raise self.provider.failures[self.name]
+        return ResponseBuilders.output_message(f"answered by {self.name}")
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+class FakeProvider(ModelProvider):
+    def __init__(self, failures: dict):
+        self.failures = failures
+        self.calls: list[str] = []
+
+    def get_model(self, model_name):
+        return FakeModel(self, model_name)
+
+
+def test_untried_models_are_explored_first():
+    router = ModelRouter(["slow", "fast", "new"])
+    router.record_success("slow", 5.0)
+    router.record_success("fast", 1.0)
+    assert router.candidates() == ["new", "fast", "slow"]
+
+
+def test_rate_limited_model_is_ranked_last():
+    router = ModelRouter(["a", "b"])
+    router.record_success("a", 0.5)
+    router.record_success("b", 2.0)
+    router.record_failure("a", FakeStatusError(429))
+    assert router.candidates() == ["b", "a"]
+    assert router.stats()["a"]["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_run_fails_over_on_rate_limit():
+    provider = FakeProvider({"a": FakeStatusError(429)})
+    routed = RoutedModelProvider(provider, ModelRouter(["a", "b"]))
+    agent = Agent(name="Assistant", instructions="Be brief.", model="a")
+
+    result = await Runner.run(
+        agent, "What is Temporal?", run_config=RunConfig(model_provider=routed, tracing_disabled=True)
+    )
+
+    assert result.final_output == "answered by b"
+    assert provider.calls == ["a", "b"]
+    assert routed.router.stats()["a"]["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    provider = FakeProvider({"a": FakeStatusError(400)})
+    routed = RoutedModelProvider(provider, ModelRouter(["a", "b"]))
+
+    with pytest.raises(FakeStatusError):
+        await _ask(routed.get_model("a"))
+    assert provider.calls == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_models_outside_pool_pass_through():
+    provider = FakeProvider({})
+    routed = RoutedModelProvider(provider, ModelRouter(["a"]))
+
+    model = routed.get_model("other")
+
+    assert isinstance(model, FakeModel)
+    assert (await _ask(model)).output[0].content[0].text == "answered by other"
+
+
+@pytest.mark.asyncio
+async def test_similarity_cache_answers_near_duplicate_prompts():
+    from llm_common.similarity_cache import SimilarityCache
+
+    provider = FakeProvider({})
+    routed = RoutedModelProvider(provider, ModelRouter(["a"]), cache=SimilarityCache())
+    model = routed.get_model("a")
+
+    first = await _ask(model, "What is Temporal?", system="Be brief.")
+    again = await _ask(model, "what is temporal", system="Be brief.")
+    other_system = await _ask(model, "What is Temporal?", system="Be verbose.")
+
+    assert again.output[0].content[0].text == first.output[0].content[0].text
+    assert again.usage.total_tokens == 0
+    assert other_system.output[0].content[0].text == first.output[0].content[0].text
+    assert provider.calls == ["a", "a"]
@@ -0,0 +1,83 @@
+"""Tests for the near-duplicate prompt cache."""
+
+import asyncio
+
+import pytest
+
+from llm_common.similarity_cache import SimilarityCache, namespace_key
+
+
+def test_near_duplicates_hit_and_unrelated_prompts_miss():
+    cache = SimilarityCache(threshold=0.85)
+    cache.put("What is Temporal and why is it useful?", "answer")
+
+    assert cache.get("  what is TEMPORAL, and why is it useful") == "answer"
+    assert cache.get("What is Temporal and why is it so useful?") == "answer"
+    assert cache.get("How do I parse JSON in Rust?") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_prompts_about_a_different_entity_miss():
+    cache = SimilarityCache(threshold=0.85)
+    cache.put("What is the capital of France?", "Paris")
+    cache.put("How do I sort a list in Python?", "sorted(items)")
+
+    assert cache.get("What is the capital of Germany?") is None
+    assert cache.get("How do I sort a list in Rust?") is None
+    assert cache.get("what is the capital of france") == "Paris"
+    assert cache.get("In Python, how do I sort a list?") == "sorted(items)"
+
+
+def test_namespaces_are_isolated():
+    cache = SimilarityCache()
+    cache.put("Temporal workflow orchestration", "short", namespace_key(length="short"))
+
+    assert cache.get("Temporal workflow orchestration", namespace_key(length="long")) is None
+    assert cache.get("Temporal workflow orchestration", namespace_key(length="short")) == "short"
+
+
+def test_entries_persist_and_evict_oldest(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SimilarityCache(max_entries=2, path=path)
+    cache.put("first prompt about queues", {"content": "1"})
+    cache.put("second prompt about workers", {"content": "2"})
+    cache.put("third prompt about activities", {"content": "3"})
+
+    reloaded = SimilarityCache(path=path)
+    assert reloaded.stats()["entries"] == 2
+    assert reloaded.get("first prompt about queues") is None
+    assert reloaded.get("third prompt about activities") == {"content": "3"}
+
+
+def test_prompts_in_other_scripts_are_not_confused():
+    cache = SimilarityCache()
+    cache.put("日本の首都はどこですか", "tokyo")
+    cache.put("?!", "punctuation only")
+
+    assert cache.get("フランスの首都はどこですか") is None
+    assert cache.get("日本の首都はどこですか") == "tokyo"
+    assert cache.get("...") is None
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_saves_are_batched_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "cache.json"
+    cache = SimilarityCache(path=path, save_interval=0.05)
+    writes = []
+    write = cache._write
+    monkeypatch.setattr(cache, "_write", lambda entries, version: writes.append(len(entries)) or write(entries, version))
+
+    for i in range(20):
+        cache.put(f"prompt number {i} about workers", str(i))
+    assert writes == []
+
+    await asyncio.sleep(0.2)
+    assert writes == [20]
+    assert SimilarityCache(path=path).stats()["entries"] == 20
+
+    cache.put("one more prompt about queues", "21")
+    cache.flush()
+    assert writes == [20, 21]
+    cache.flush()
+    assert writes == [20, 21]
@@ -0,0 +1,74 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, request_key
+
+
+def test_request_key_normalizes_whitespace():
+    assert request_key("  What is\nTemporal? ", length="short") == request_key(
+        "What is Temporal?", length="short"
+    )
+    assert request_key("What is Temporal?", length="short") != request_key(
+        "What is Temporal?", length="long"
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight()
+    calls = 0
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"content": "shared"}
+
+    results = await asyncio.gather(*(group.do("key", generate) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result == {"content": "shared"} for result in results)
+    assert group.stats()["coalesced"] == 4
+    assert group.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_remembered():
+    group = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        group.do("key", failing), group.do("key", failing), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def working():
+        return "ok"
+
+    assert await group.do("key", working) == "ok"
+    assert group.stats()["executions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers():
+    group = SingleFlight()
+
+    async def generate():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(group.do("key", generate))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(group.do("key", generate))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
@@ -0,0 +1,229 @@
+"""
+Concurrency stress and soak tests for the integration workers.
+
+These tests run thousands of AIContentWorkflow and MultiStepAIChainWorkflow
+executions against the time-skipping test server with stubbed activities,
+at several concurrency levels. While they run, worker RSS, open file
+descriptors, event-loop lag and asyncio task counts are sampled, and the
+test fails if any of them keeps growing after the warm-up phase.
+
+They are slow and therefore opt-in:
+
+    SOAK_TESTS=1 pytest tests/test_soak.py -v
+
+Tune the load with SOAK_WORKFLOWS (executions per test, default 2000) and
+SOAK_DURATION (maximum seconds per test, default 300).
+"""
+
+import asyncio
+import os
+import resource
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import pytest
+
+try:
+    from temporalio import activity
+    from temporalio.testing import WorkflowEnvironment
+    from temporalio.worker import Worker
+    from examples.integration.multi_step_chain import (
+        ChainResult,
+        ChainSummary,
+        ContentAnalysis,
+        GeneratedContent,
+        KeyPoints,
+        MultiStepAIChainWorkflow,
+    )
+    from examples.integration.workflows import AIContentWorkflow, process_response
+except ImportError:
+    pytest.skip("temporalio not installed", allow_module_level=True)
+
+
+soak = pytest.mark.skipif(not os.getenv("SOAK_TESTS"), reason="set SOAK_TESTS=1 to run soak tests")
+
+SOAK_WORKFLOWS = int(os.getenv("SOAK_WORKFLOWS", "2000"))
+SOAK_DURATION = float(os.getenv("SOAK_DURATION", "300"))
+SAMPLE_INTERVAL = 0.5
+
+
+# Stubbed activities registered under the real activity names
+
+@activity.defn(name="generate_text_with_openai")
+async def stub_generate_text(prompt: str) -> str:
+    await asyncio.sleep(0.001)
+    return f"Generated answer for: {prompt}"
+
+
+@activity.defn(name="generate_content")
+async def stub_generate_content(topic: str, length: str = "short") -> GeneratedContent:
+    await asyncio.sleep(0.001)
+    content = f"A {length} explanation about {topic}. " * 5
+    return GeneratedContent(content, len(content.split()))
+
+
+@activity.defn(name="analyze_content")
+async def stub_analyze_content(content: str) -> ContentAnalysis:
+    return ContentAnalysis("Sentiment: positive. Summary: fine. Insights: a, b, c")
+
+
+@activity.defn(name="summarize_analysis")
+async def stub_summarize_analysis(generated_content: str, analysis: str) -> ChainSummary:
+    return ChainSummary("A short summary.", len(generated_content), len(analysis))
+
+
+@activity.defn(name="extract_key_points")
+async def stub_extract_key_points(combined_text: str) -> KeyPoints:
+    return KeyPoints(["first point", "second point", "third point"], 30)
+
+
+@activity.defn(name="store_chain_result")
+async def stub_store_chain_result(result: ChainResult) -> None:
+    pass
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak RSS is the best portable fallback (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def open_fds() -> int:
+    """Number of open file descriptors of this process."""
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(fd_dir):
+            return len(os.listdir(fd_dir))
+    return 0
+
+
+@dataclass
+class ResourceSamples:
+    rss: list[int] = field(default_factory=list)
+    fds: list[int] = field(default_factory=list)
+    tasks: list[int] = field(default_factory=list)
+    loop_lag: list[float] = field(default_factory=list)
+
+
+async def sample_resources(samples: ResourceSamples, stop: asyncio.Event) -> None:
+    """Sample process resources until ``stop`` is set."""
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        samples.loop_lag.append(time.monotonic() - started - SAMPLE_INTERVAL)
+        samples.rss.append(rss_bytes())
+        samples.fds.append(open_fds())
+        samples.tasks.append(len(asyncio.all_tasks()))
+
+
+def assert_bounded(name: str, values: list, absolute: float, relative: float = 0.0) -> None:
+    """Fail if the last third of ``values`` grew beyond the middle third.
+
+    The first third is treated as warm-up (imports, caches, connection
+    pools). Growth is allowed up to ``absolute`` plus ``relative`` times the
+    middle-third median.
+    """
+    assert len(values) >= 6, f"not enough {name} samples to judge growth"
+    third = len(values) // 3
+    middle = statistics.median(values[third : 2 * third])
+    last = statistics.median(values[2 * third :])
+    allowed = middle + absolute + relative * middle
+    assert last <= allowed, f"{name} keeps growing: median {middle} -> {last} (allowed {allowed:.0f})"
+
+
+async def run_soak(env: WorkflowEnvironment, start_one, concurrency: int) -> ResourceSamples:
+    """Keep ``concurrency`` workflows in flight until the budget is used up."""
+    samples = ResourceSamples()
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_resources(samples, stop))
+    deadline = time.monotonic() + SOAK_DURATION
+    remaining = iter(range(SOAK_WORKFLOWS))
+
+    async def submitter() -> None:
+        while time.monotonic() < deadline and next(remaining, None) is not None:
+            await start_one(env.client, f"soak-{uuid.uuid4().hex}")
+
+    try:
+        await asyncio.gather(*(submitter() for _ in range(concurrency)))
+    finally:
+        stop.set()
+        await sampler
+    return samples
+
+
+def check_samples(samples: ResourceSamples) -> None:
+    assert_bounded("RSS", samples.rss, absolute=32 * 1024 * 1024, relative=0.2)
+    assert_bounded("open file descriptors", samples.fds, absolute=16)
+    assert_bounded("asyncio tasks", samples.tasks, absolute=50)
+    assert max(samples.loop_lag) < 1.0, f"event loop stalled for {max(samples.loop_lag):.2f}s"
+
+
+@soak
+@pytest.mark.soak
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [10, 50, 200])
+async def test_ai_content_workflow_soak(concurrency):
+    async def start_one(client, workflow_id):
+        result = await client.execute_workflow(
+            AIContentWorkflow.run,
+            "Soak test prompt",
+            id=workflow_id,
+            task_queue="soak-ai-content",
+        )
+        assert result["word_count"] > 0
+
+    async with await WorkflowEnvironment.start_time_skipping() as env:
+        async with Worker(
+            env.client,
+            task_queue="soak-ai-content",
+            workflows=[AIContentWorkflow],
+            activities=[stub_generate_text, process_response],
+            max_concurrent_workflow_tasks=concurrency,
+        ):
+            samples = await run_soak(env, start_one, concurrency)
+
+    check_samples(samples)
+
+
+@soak
+@pytest.mark.soak
+@pytest.mark.asyncio
+@pytest.mark.parametrize("concurrency", [10, 50, 200])
+async def test_multi_step_chain_workflow_soak(concurrency):
+    async def start_one(client, workflow_id):
+        result = await client.execute_workflow(
+            MultiStepAIChainWorkflow.run,
+            args=["Soak testing", "short"],
+            id=workflow_id,
+            task_queue="soak-multi-step-chain",
+        )
+        assert result.key_points
+
+    async with await WorkflowEnvironment.start_time_skipping() as env:
+        async with Worker(
+            env.client,
+            task_queue="soak-multi-step-chain",
+            workflows=[MultiStepAIChainWorkflow],
+            activities=[
+                stub_generate_content,
+                stub_analyze_content,
+                stub_summarize_analysis,
+                stub_extract_key_points,
+                stub_store_chain_result,
+            ],
+            max_concurrent_workflow_tasks=concurrency,
+        ):
+            samples = await run_soak(env, start_one, concurrency)
+
+    check_samples(samples)
+
+
+def test_assert_bounded_detects_growth():
+    assert_bounded("flat", [100, 104, 101, 102, 103, 101, 102, 103, 102], absolute=5)
+    with pytest.raises(AssertionError, match="keeps growing"):
+        assert_bounded("leak", [100, 110, 120, 130, 140, 150, 160, 170, 180], absolute=5)